@@ -0,0 +1,49 @@
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+
+from app.core.deps import get_answer_cache
+from app.infra.answer_cache import SemanticAnswerCache
+from app.schemas.admin import AnswerCacheEntryInfo, AnswerCacheFlushResponse, AnswerCacheInspection
+
+router = APIRouter()
+
+
+def _require_answer_cache(cache: Optional[SemanticAnswerCache]) -> SemanticAnswerCache:
+    if cache is None:
+        raise HTTPException(status_code=404, detail="The answer cache is disabled (ANSWER_CACHE_ENABLED=false)")
+    return cache
+
+
+@router.get("/answer-cache", response_model=AnswerCacheInspection)
+async def inspect_answer_cache(
+    limit: int = Query(50, ge=0, le=1000),
+    cache: Optional[SemanticAnswerCache] = Depends(get_answer_cache),
+) -> AnswerCacheInspection:
+    """
+    Show answer cache counters and the most recently used cached answers.
+    """
+    cache = _require_answer_cache(cache)
+    entries = [
+        AnswerCacheEntryInfo(
+            query=entry.query,
+            answer=entry.answer,
+            sources=[source if isinstance(source, dict) else {"source": str(source)} for source in entry.sources],
+            generation=entry.generation,
+            created_at=entry.created_at,
+            hits=entry.hits,
+        )
+        for entry in cache.entries()[:limit]
+    ]
+    return AnswerCacheInspection(stats=cache.stats(), entries=entries)
+
+
+@router.delete("/answer-cache", response_model=AnswerCacheFlushResponse)
+async def flush_answer_cache(
+    cache: Optional[SemanticAnswerCache] = Depends(get_answer_cache),
+) -> AnswerCacheFlushResponse:
+    """
+    Drop every cached answer, e.g. after changing the prompt or the LLM model.
+    """
+    cache = _require_answer_cache(cache)
+    return AnswerCacheFlushResponse(dropped=cache.clear())
@@ -1,10 +1,19 @@
 from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import StreamingResponse
+from typing import AsyncIterator
 from urllib.parse import quote
 
-from app.schemas.chat import ChatRequest, ChatResponse, SourceInfo
+from app.schemas.chat import (
+    ChatBatchRequest,
+    ChatBatchResult,
+    ChatBatchTimings,
+    ChatRequest,
+    ChatResponse,
+    SourceInfo,
+)
 from app.core.deps import get_rag_service, get_conversation_service
 from app.core.config import settings
-from app.services.rag_service import RAGService
+from app.services.rag_service import RAGBatchItem, RAGService
 from app.services.conversation_service import ConversationService
 from app.infra.llm import QuotaExceededError
 
@@ -86,3 +95,64 @@ async def chat(
         raise
     except Exception as exc:  # pragma: no cover - simple pass-through
         raise HTTPException(status_code=500, detail=str(exc))
+
+
+def _batch_error(exc: Exception) -> dict:
+    if isinstance(exc, QuotaExceededError):
+        return {
+            "error": "quota_exceeded",
+            "message": exc.message,
+            "retry_after": exc.retry_after,
+            "quota_limit": exc.quota_limit,
+        }
+    return {"error": "generation_failed", "message": str(exc)}
+
+
+@router.post("/batch")
+async def chat_batch(
+    payload: ChatBatchRequest,
+    request: Request,
+    rag_service: RAGService = Depends(get_rag_service),
+) -> StreamingResponse:
+    """
+    Answer many standalone questions in one request.
+
+    Questions are embedded and retrieved together, answers are generated with
+    bounded concurrency, and each result is streamed back as one NDJSON line
+    as soon as it completes (so lines arrive out of input order; use `index`
+    or `id` to match them). Failures are reported per question.
+    """
+    if len(payload.questions) > settings.CHAT_BATCH_MAX_QUESTIONS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"At most {settings.CHAT_BATCH_MAX_QUESTIONS} questions per batch",
+        )
+
+    base_url = str(request.base_url).rstrip('/')
+    api_base_url = base_url or f"http://{settings.API_HOST}:{settings.API_PORT}"
+    questions = payload.questions
+
+    async def stream() -> AsyncIterator[str]:
+        items = rag_service.answer_many(
+            [question.message for question in questions],
+            api_base_url=api_base_url,
+            max_concurrency=payload.max_concurrency,
+        )
+        async for item in items:
+            yield _batch_line(item, questions[item.index].id) + "\n"
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+
+def _batch_line(item: RAGBatchItem, question_id: str | None) -> str:
+    result = ChatBatchResult(
+        index=item.index,
+        id=question_id,
+        timings=ChatBatchTimings(**item.timings),
+    )
+    if item.result is not None:
+        result.response = item.result.text
+        result.sources = [SourceInfo(**source) for source in item.result.sources if isinstance(source, dict)]
+    else:
+        result.error = _batch_error(item.error)
+    return result.model_dump_json()
@@ -1,6 +1,6 @@
-from typing import List
+from typing import List, Optional
 
-from fastapi import APIRouter, Depends, File, HTTPException, UploadFile, Request
+from fastapi import APIRouter, Depends, File, HTTPException, Query, UploadFile, Request
 from fastapi.responses import Response
 from urllib.parse import unquote
 
@@ -71,13 +71,30 @@ async def index_document(
 
 @router.get("/indexed", response_model=List[IndexedDocumentInfo])
 async def list_indexed_documents(
+    request: Request,
+    response: Response,
+    offset: int = Query(0, ge=0),
+    limit: Optional[int] = Query(None, ge=1, le=1000),
     service: DocumentService = Depends(get_document_service),
 ) -> List[IndexedDocumentInfo]:
     """
     List documents that have been indexed into the vector store.
+
+    Supports pagination via `offset`/`limit`. The catalog version is returned as
+    an ETag; clients sending it back in `If-None-Match` get 304 when nothing changed.
     """
     try:
-        return service.list_indexed_documents()
+        version = service.catalog_version
+        etag = f'W/"catalog-{version}"' if version is not None else None
+        if etag and request.headers.get("if-none-match") == etag:
+            return Response(status_code=304, headers={"ETag": etag})
+
+        items, total = service.list_indexed_documents(offset=offset, limit=limit)
+        response.headers["X-Total-Count"] = str(total)
+        if etag:
+            response.headers["ETag"] = etag
+            response.headers["X-Catalog-Version"] = str(version)
+        return items
     except Exception as exc:  # pragma: no cover
         raise HTTPException(
             status_code=500,
@@ -21,14 +21,69 @@ class Settings(BaseSettings):
     ANTHROPIC_MODEL: str = "claude-3-sonnet-20240229"
     OLLAMA_MODEL: str = "llama2"
     EMBEDDING_MODEL: str = "all-MiniLM-L6-v2"
+    EMBEDDING_BACKEND: str = "torch"
+    EMBEDDING_ONNX_QUANTIZE: bool = False
+    EMBEDDING_ONNX_PATH: Optional[str] = None
+    EMBEDDING_NUM_THREADS: int = 0
+    EMBEDDING_WORKERS: int = 0
+    EMBEDDING_WORKER_THREADS: int = 1
+    EMBEDDING_WORKER_SHARD_SIZE: int = 256
+    EMBEDDING_LENGTH_BUCKETS: str = "128:128,320:64,640:32"
+    QUERY_EMBEDDING_CACHE_SIZE: int = 1024
+    QUERY_EMBEDDING_CACHE_TTL: float = 3600.0
     VECTOR_DB_PATH: str = "./vector_db"
+    VECTOR_DB_MODE: str = "persistent"
+    VECTOR_SERVER_HOST: str = "localhost"
+    VECTOR_SERVER_PORT: int = 8001
+    VECTOR_SERVER_SSL: bool = False
+    VECTOR_SERVER_TIMEOUT: float = 10.0
+    VECTOR_SERVER_RETRIES: int = 3
+    VECTOR_SERVER_POOL_SIZE: int = 32
+    VECTOR_INDEX_BACKEND: str = "chroma"
+    MATRIX_INDEX_SEARCH: str = "exact"
+    VECTOR_HNSW_SPACE: str = "cosine"
+    VECTOR_HNSW_M: int = 16
+    VECTOR_HNSW_CONSTRUCTION_EF: int = 200
+    VECTOR_HNSW_SEARCH_EF: int = 64
+    VECTOR_HNSW_MIGRATE: bool = False
+    VECTOR_SHARDS: int = 1
+    VECTOR_SHARD_KEY: str = "source"
+    VECTOR_COMPRESSION: str = "none"
+    VECTOR_STORAGE_DIM: int = 128
+    VECTOR_RESCORE_FACTOR: int = 4
+    VECTOR_WRITE_BATCH_SIZE: int = 256
+    EMBEDDING_CACHE_ENABLED: bool = True
+    EMBEDDING_CACHE_PATH: str = "./embedding_cache/embeddings.sqlite"
     CHUNK_SIZE: int = 500
     CHUNK_OVERLAP: int = 200
     TOP_K_RETRIEVAL: int = 12
+    QUERY_BATCHING_ENABLED: bool = True
+    QUERY_BATCH_WINDOW_MS: float = 5.0
+    QUERY_BATCH_MAX_SIZE: int = 32
+    HYBRID_SEARCH_ENABLED: bool = False
+    HYBRID_CANDIDATE_FACTOR: int = 2
+    HYBRID_RRF_K: int = 60
+    MMR_ENABLED: bool = False
+    MMR_LAMBDA: float = 0.7
+    MMR_FETCH_FACTOR: int = 3
+    RETRIEVAL_CACHE_SIZE: int = 2048
+    ANSWER_CACHE_ENABLED: bool = False
+    ANSWER_CACHE_SIZE: int = 1024
+    ANSWER_CACHE_THRESHOLD: float = 0.92
+    ANSWER_CACHE_TTL: float = 86400.0
+    RERANK_ENABLED: bool = False
+    RERANK_MODEL: str = "cross-encoder/ms-marco-MiniLM-L-6-v2"
+    RERANK_CANDIDATES: int = 24
+    RERANK_TOP_N: int = 5
+    RERANK_BATCH_SIZE: int = 32
+    RERANK_CACHE_SIZE: int = 4096
+    CHAT_BATCH_MAX_QUESTIONS: int = 256
+    CHAT_BATCH_MAX_CONCURRENCY: int = 4
     LLM_TEMPERATURE: float = 0.7
     API_HOST: str = "0.0.0.0"
     API_PORT: int = 8000
     API_RELOAD: bool = False
+    WARMUP_ENABLED: bool = True
     CORS_ORIGINS: str = "*"
     UPLOAD_DIR: str = "./uploads"
 
@@ -1,30 +1,210 @@
+import threading
 from functools import lru_cache
+from pathlib import Path
+from typing import Optional
 
 from app.core.config import settings
 from app.infra.llm import initialize_llm
-from app.infra.vector_store import initialize_vector_store
-from app.infra.embeddings import initialize_embedding_model
+from app.infra.answer_cache import SemanticAnswerCache
+from app.infra.vector_store import (
+    initialize_vector_store,
+    sync_catalog_from_collection,
+    sync_keyword_index_from_collection,
+)
+from app.infra.bm25 import BM25Index
+from app.infra.reranker import CrossEncoderReranker, initialize_reranker
+from app.infra.retrieval_cache import RetrievalResultCache
+from app.infra.document_catalog import DocumentCatalog
+from app.infra.embeddings import initialize_embedding_model, embedding_model_id
+from app.infra.embedding_cache import ChunkEmbeddingCache, QueryEmbeddingCache
+from app.infra.embedding_pool import EmbeddingWorkerPool
+from app.infra.query_batcher import QueryBatcher
 from app.services.rag_service import RAGService
 from app.services.storage_service import StorageService
 from app.services.document_service import DocumentService
 from app.services.conversation_service import ConversationService
 
 
+_vector_store_lock = threading.Lock()
+
+
 @lru_cache
 def get_vector_store_collection():
     """
-    Lazily initialize and cache the ChromaDB collection.
+    Lazily initialize and cache the vector index (Chroma or in-process matrix).
+
+    `lru_cache` does not serialize concurrent first calls, and two embedded
+    Chroma clients must never open `VECTOR_DB_PATH` at once, so opening the
+    index is guarded by a lock.
     """
-    client, collection = initialize_vector_store(persist_directory=settings.VECTOR_DB_PATH)
+    with _vector_store_lock:
+        return _open_vector_store()
+
+
+@lru_cache
+def _open_vector_store():
+    client, collection = initialize_vector_store(
+        persist_directory=settings.VECTOR_DB_PATH,
+        compression=settings.VECTOR_COMPRESSION,
+        storage_dim=settings.VECTOR_STORAGE_DIM,
+        rescore_factor=settings.VECTOR_RESCORE_FACTOR,
+        backend=settings.VECTOR_INDEX_BACKEND,
+        matrix_search=settings.MATRIX_INDEX_SEARCH,
+        space=settings.VECTOR_HNSW_SPACE,
+        hnsw_m=settings.VECTOR_HNSW_M,
+        hnsw_construction_ef=settings.VECTOR_HNSW_CONSTRUCTION_EF,
+        hnsw_search_ef=settings.VECTOR_HNSW_SEARCH_EF,
+        migrate=settings.VECTOR_HNSW_MIGRATE,
+        shards=settings.VECTOR_SHARDS,
+        shard_key=settings.VECTOR_SHARD_KEY,
+        mode=settings.VECTOR_DB_MODE,
+        server_host=settings.VECTOR_SERVER_HOST,
+        server_port=settings.VECTOR_SERVER_PORT,
+        server_ssl=settings.VECTOR_SERVER_SSL,
+        server_timeout=settings.VECTOR_SERVER_TIMEOUT,
+        server_retries=settings.VECTOR_SERVER_RETRIES,
+        server_pool_size=settings.VECTOR_SERVER_POOL_SIZE,
+    )
     return collection
 
 
+@lru_cache
+def get_document_catalog() -> DocumentCatalog:
+    """
+    Provide the persistent catalog of indexed documents stored next to the vector database.
+    """
+    catalog = DocumentCatalog(path=str(Path(settings.VECTOR_DB_PATH) / "catalog.sqlite"))
+    sync_catalog_from_collection(catalog, get_vector_store_collection())
+    return catalog
+
+
+@lru_cache
+def get_keyword_index() -> Optional[BM25Index]:
+    """
+    Provide the BM25 keyword index stored next to the vector database, or None when hybrid search is disabled.
+    """
+    if not settings.HYBRID_SEARCH_ENABLED:
+        return None
+    keyword_index = BM25Index(path=str(Path(settings.VECTOR_DB_PATH) / "bm25.sqlite"))
+    sync_keyword_index_from_collection(keyword_index, get_vector_store_collection())
+    return keyword_index
+
+
 @lru_cache
 def get_embedding_model():
     """
     Lazily initialize and cache the embedding model.
     """
-    return initialize_embedding_model(model_name=settings.EMBEDDING_MODEL)
+    return initialize_embedding_model(
+        model_name=settings.EMBEDDING_MODEL,
+        backend=settings.EMBEDDING_BACKEND,
+        quantize=settings.EMBEDDING_ONNX_QUANTIZE,
+        onnx_path=settings.EMBEDDING_ONNX_PATH,
+        num_threads=settings.EMBEDDING_NUM_THREADS,
+    )
+
+
+@lru_cache
+def get_ingestion_embedding_model():
+    """
+    Provide the encoder used for document ingestion.
+
+    With EMBEDDING_WORKERS > 0 this is a multi-process pool; otherwise the shared model.
+    """
+    if settings.EMBEDDING_WORKERS <= 0:
+        return get_embedding_model()
+    return EmbeddingWorkerPool(
+        model_name=settings.EMBEDDING_MODEL,
+        num_workers=settings.EMBEDDING_WORKERS,
+        backend=settings.EMBEDDING_BACKEND,
+        quantize=settings.EMBEDDING_ONNX_QUANTIZE,
+        onnx_path=settings.EMBEDDING_ONNX_PATH,
+        threads_per_worker=settings.EMBEDDING_WORKER_THREADS,
+        shard_size=settings.EMBEDDING_WORKER_SHARD_SIZE,
+    )
+
+
+def get_embedding_model_id() -> str:
+    """
+    Identify the configured model + backend variant without loading the model.
+    """
+    return embedding_model_id(
+        settings.EMBEDDING_MODEL,
+        settings.EMBEDDING_BACKEND,
+        settings.EMBEDDING_ONNX_QUANTIZE,
+    )
+
+
+@lru_cache
+def get_query_embedding_cache() -> Optional[QueryEmbeddingCache]:
+    """
+    Provide a shared LRU cache of query embeddings, or None when disabled.
+    """
+    if settings.QUERY_EMBEDDING_CACHE_SIZE <= 0:
+        return None
+    return QueryEmbeddingCache(
+        model_name=get_embedding_model_id(),
+        max_size=settings.QUERY_EMBEDDING_CACHE_SIZE,
+        ttl_seconds=settings.QUERY_EMBEDDING_CACHE_TTL,
+    )
+
+
+@lru_cache
+def get_chunk_embedding_cache() -> Optional[ChunkEmbeddingCache]:
+    """
+    Provide the persistent content-hash cache of chunk embeddings, or None when disabled.
+    """
+    if not settings.EMBEDDING_CACHE_ENABLED:
+        return None
+    return ChunkEmbeddingCache(
+        path=settings.EMBEDDING_CACHE_PATH,
+        model_name=get_embedding_model_id(),
+    )
+
+
+@lru_cache
+def get_reranker() -> Optional[CrossEncoderReranker]:
+    """
+    Lazily load the cross-encoder reranker, or None when reranking is disabled.
+    """
+    if not settings.RERANK_ENABLED:
+        return None
+    return initialize_reranker(
+        model_name=settings.RERANK_MODEL,
+        batch_size=settings.RERANK_BATCH_SIZE,
+        cache_size=settings.RERANK_CACHE_SIZE,
+    )
+
+
+@lru_cache
+def get_retrieval_cache() -> Optional[RetrievalResultCache]:
+    """
+    Provide the shared retrieval result cache, or None when disabled.
+
+    Entries are tagged with the document catalog version, which every committed vector write bumps.
+    """
+    if settings.RETRIEVAL_CACHE_SIZE <= 0:
+        return None
+    catalog = get_document_catalog()
+    return RetrievalResultCache(generation=lambda: catalog.version, max_size=settings.RETRIEVAL_CACHE_SIZE)
+
+
+@lru_cache
+def get_answer_cache() -> Optional[SemanticAnswerCache]:
+    """
+    Provide the semantic answer cache for standalone questions, or None when disabled.
+
+    Like the retrieval cache, entries are only served at the catalog version they were generated at.
+    """
+    if not settings.ANSWER_CACHE_ENABLED or settings.ANSWER_CACHE_SIZE <= 0:
+        return None
+    catalog = get_document_catalog()
+    return SemanticAnswerCache(
+        generation=lambda: catalog.version,
+        threshold=settings.ANSWER_CACHE_THRESHOLD,
+        max_size=settings.ANSWER_CACHE_SIZE,
+        ttl_seconds=settings.ANSWER_CACHE_TTL,
+    )
 
 
 @lru_cache
@@ -35,6 +215,27 @@ def get_llm_client():
     return initialize_llm()
 
 
+@lru_cache
+def get_query_batcher() -> Optional[QueryBatcher]:
+    """
+    Provide the shared retrieval micro-batcher, or None when batching is disabled.
+    """
+    if not settings.QUERY_BATCHING_ENABLED:
+        return None
+    return QueryBatcher(
+        collection=get_vector_store_collection(),
+        embedding_model=get_embedding_model(),
+        window_ms=settings.QUERY_BATCH_WINDOW_MS,
+        max_batch_size=settings.QUERY_BATCH_MAX_SIZE,
+        query_cache=get_query_embedding_cache(),
+        keyword_index=get_keyword_index(),
+        candidate_factor=settings.HYBRID_CANDIDATE_FACTOR,
+        rrf_k=settings.HYBRID_RRF_K,
+        mmr_lambda=settings.MMR_LAMBDA if settings.MMR_ENABLED else None,
+        mmr_fetch_factor=settings.MMR_FETCH_FACTOR,
+    )
+
+
 @lru_cache
 def get_rag_service() -> RAGService:
     """
@@ -46,6 +247,14 @@ def get_rag_service() -> RAGService:
         llm_client=get_llm_client(),
         top_k=settings.TOP_K_RETRIEVAL,
         temperature=settings.LLM_TEMPERATURE,
+        query_cache=get_query_embedding_cache(),
+        query_batcher=get_query_batcher(),
+        keyword_index=get_keyword_index(),
+        reranker=get_reranker(),
+        rerank_candidates=settings.RERANK_CANDIDATES,
+        rerank_top_n=settings.RERANK_TOP_N,
+        retrieval_cache=get_retrieval_cache(),
+        answer_cache=get_answer_cache(),
     )
 
 
@@ -65,7 +274,10 @@ def get_document_service() -> DocumentService:
     return DocumentService(
         storage=get_storage_service(),
         collection=get_vector_store_collection(),
-        embedding_model=get_embedding_model(),
+        embedding_model=get_ingestion_embedding_model(),
+        embedding_cache=get_chunk_embedding_cache(),
+        catalog=get_document_catalog(),
+        keyword_index=get_keyword_index(),
     )
 
 
@@ -0,0 +1,166 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from dataclasses import asdict, dataclass
+from typing import Any, Callable, Dict, Optional
+
+from fastapi import FastAPI
+
+from app.core.config import settings
+from app.core.deps import (
+    get_chunk_embedding_cache,
+    get_document_catalog,
+    get_embedding_model,
+    get_ingestion_embedding_model,
+    get_keyword_index,
+    get_reranker,
+    get_llm_client,
+    get_query_batcher,
+    get_rag_service,
+    get_retrieval_cache,
+    get_vector_store_collection,
+)
+from app.infra.embedding_pool import EmbeddingWorkerPool
+from app.infra.vector_store import search_similar_documents
+
+
+@dataclass
+class ComponentStatus:
+    """Initialization state of one warmed-up component."""
+
+    state: str = "pending"  # pending | ready | failed
+    init_seconds: Optional[float] = None
+    error: Optional[str] = None
+
+
+class ReadinessRegistry:
+    """Thread-safe record of which components have finished initializing."""
+
+    def __init__(self) -> None:
+        self._components: Dict[str, ComponentStatus] = {}
+        self._lock = threading.Lock()
+
+    def register(self, name: str) -> None:
+        with self._lock:
+            self._components.setdefault(name, ComponentStatus())
+
+    def record(self, name: str, init_seconds: float, error: Optional[str] = None) -> None:
+        with self._lock:
+            self._components[name] = ComponentStatus(
+                state="failed" if error else "ready",
+                init_seconds=round(init_seconds, 4),
+                error=error,
+            )
+
+    def is_ready(self) -> bool:
+        with self._lock:
+            return bool(self._components) and all(
+                c.state == "ready" for c in self._components.values()
+            )
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            components = {name: asdict(status) for name, status in self._components.items()}
+        if components and all(c["state"] == "ready" for c in components.values()):
+            status = "ready"
+        elif any(c["state"] == "failed" for c in components.values()):
+            status = "failed"
+        else:
+            status = "starting"
+        return {"status": status, "components": components}
+
+
+readiness = ReadinessRegistry()
+
+
+def _timed(name: str, init: Callable[[], Any]) -> Any:
+    started = time.perf_counter()
+    try:
+        result = init()
+    except Exception as exc:
+        readiness.record(name, time.perf_counter() - started, error=str(exc))
+        return None
+    readiness.record(name, time.perf_counter() - started)
+    return result
+
+
+def _warm_up_query(collection: Any, embedding_model: Any) -> None:
+    """Run a dummy encode and query to load the HNSW index and warm encoder code paths."""
+    search_similar_documents("warm-up query", collection, embedding_model, top_k=1)
+
+
+def warm_up_components() -> None:
+    """
+    Initialize the models, vector store, catalog, keyword index, caches, LLM
+    client and RAG service, then run a dummy query.
+
+    Independent components start in parallel. Components that read the vector
+    store (the catalog and keyword index backfills, and the retrieval cache
+    and RAG service built on them) start only once it is open, so no two
+    threads ever open `VECTOR_DB_PATH` at the same time and the first request
+    pays for no backfill.
+    """
+    components: Dict[str, Callable[[], Any]] = {
+        "embedding_model": get_embedding_model,
+        "vector_store": get_vector_store_collection,
+        "llm_client": get_llm_client,
+        "chunk_embedding_cache": get_chunk_embedding_cache,
+    }
+    if settings.RERANK_ENABLED:
+        components["reranker"] = get_reranker
+    if settings.EMBEDDING_WORKERS > 0:
+        components["ingestion_pool"] = lambda: get_ingestion_embedding_model().get_sentence_embedding_dimension()
+    # Run in order once the vector store is open; the catalog and keyword index backfill from it on first run.
+    dependents: Dict[str, Callable[[], Any]] = {"document_catalog": get_document_catalog}
+    if settings.HYBRID_SEARCH_ENABLED:
+        dependents["keyword_index"] = get_keyword_index
+    dependents["retrieval_cache"] = get_retrieval_cache
+    dependents["rag_service"] = get_rag_service
+
+    for name in [*components, *dependents, "warmup_query"]:
+        readiness.register(name)
+
+    with ThreadPoolExecutor(max_workers=len(components)) as executor:
+        futures = {
+            name: executor.submit(_timed, name, init)
+            for name, init in components.items()
+        }
+        results = {name: future.result() for name, future in futures.items()}
+
+    embedding_model = results["embedding_model"]
+    collection = results["vector_store"]
+    for name, init in dependents.items():
+        if collection is None:
+            readiness.record(name, 0.0, error="vector store failed to initialize")
+        else:
+            _timed(name, init)
+    if embedding_model is None or collection is None:
+        readiness.record("warmup_query", 0.0, error="embedding model or vector store failed to initialize")
+        return
+    _timed("warmup_query", lambda: _warm_up_query(collection, embedding_model))
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Start warm-up in the background so /health answers immediately while /ready
+    reports 503 until every component has initialized.
+    """
+    warmup_task = None
+    if settings.WARMUP_ENABLED:
+        warmup_task = asyncio.create_task(asyncio.to_thread(warm_up_components))
+    yield
+    if warmup_task is not None and not warmup_task.done():
+        await asyncio.wait([warmup_task], timeout=5)
+    if get_query_batcher.cache_info().currsize:
+        query_batcher = get_query_batcher()
+        if query_batcher is not None:
+            await query_batcher.close()
+    if get_vector_store_collection.cache_info().currsize:
+        get_vector_store_collection().flush()
+    if get_ingestion_embedding_model.cache_info().currsize:
+        ingestion_model = get_ingestion_embedding_model()
+        if isinstance(ingestion_model, EmbeddingWorkerPool):
+            ingestion_model.shutdown()
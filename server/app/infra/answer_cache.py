@@ -0,0 +1,168 @@
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.infra.metrics import metrics
+
+
+@dataclass
+class CachedAnswer:
+    """A generated answer and the standalone question it was generated for."""
+
+    query: str
+    answer: str
+    sources: List[Any]
+    api_base_url: str
+    generation: int
+    created_at: datetime
+    hits: int = 0
+
+
+class SemanticAnswerCache:
+    """
+    Thread-safe cache of LLM answers looked up by query-embedding similarity.
+
+    Query embeddings live in one preallocated float32 matrix, so a lookup is a
+    single matrix-vector product over the occupied slots. A stored answer is
+    served for a new question whose cosine similarity to the original is at
+    least `threshold`, as long as the index generation has not changed since
+    the answer was generated; the first lookup at a new generation drops every
+    entry. Entries also expire after `ttl_seconds` when a TTL is configured.
+    When full, the least recently used slot is reused.
+    """
+
+    def __init__(
+        self,
+        generation: Callable[[], int],
+        threshold: float = 0.92,
+        max_size: int = 1024,
+        ttl_seconds: Optional[float] = None,
+    ) -> None:
+        self._generation = generation
+        self._threshold = float(threshold)
+        self._max_size = max(int(max_size), 1)
+        self._ttl_seconds = ttl_seconds if ttl_seconds and ttl_seconds > 0 else None
+        self._lock = threading.Lock()
+        self._vectors: Optional[np.ndarray] = None
+        self._entries: List[Optional[CachedAnswer]] = [None] * self._max_size
+        self._stored_at = np.zeros(self._max_size, dtype=np.float64)
+        self._last_used = np.zeros(self._max_size, dtype=np.float64)
+        self._occupied = np.zeros(self._max_size, dtype=bool)
+        self._current_generation: Optional[int] = None
+        self._hits = 0
+        self._misses = 0
+        self._invalidations = 0
+
+    def generation(self) -> int:
+        """Return the current index generation; read it before generating an answer to `put`."""
+        return int(self._generation())
+
+    def _sync_generation(self, generation: int) -> None:
+        if self._current_generation is not None and generation != self._current_generation:
+            if self._occupied.any():
+                self._invalidations += 1
+            self._clear_locked()
+        self._current_generation = generation
+
+    def _clear_locked(self) -> None:
+        self._entries = [None] * self._max_size
+        self._occupied[:] = False
+
+    @staticmethod
+    def _normalize(embedding: Any) -> np.ndarray:
+        vector = np.asarray(embedding, dtype=np.float32).reshape(-1)
+        return vector / max(float(np.linalg.norm(vector)), 1e-12)
+
+    def get(self, query_embedding: Any, api_base_url: str, generation: int) -> Optional[Tuple[CachedAnswer, float]]:
+        """Return the most similar cached answer and its similarity, or None when none is close enough."""
+        vector = self._normalize(query_embedding)
+        now = time.monotonic()
+        with self._lock:
+            self._sync_generation(generation)
+            match: Optional[Tuple[CachedAnswer, float]] = None
+            if self._vectors is not None and self._vectors.shape[1] == vector.shape[0]:
+                live = self._occupied.copy()
+                if self._ttl_seconds is not None:
+                    live &= (now - self._stored_at) <= self._ttl_seconds
+                if live.any():
+                    similarities = np.where(live, self._vectors @ vector, -np.inf)
+                    slot = int(np.argmax(similarities))
+                    entry = self._entries[slot]
+                    if similarities[slot] >= self._threshold and entry is not None and entry.api_base_url == api_base_url:
+                        entry.hits += 1
+                        self._last_used[slot] = now
+                        match = (entry, float(similarities[slot]))
+            if match is None:
+                self._misses += 1
+            else:
+                self._hits += 1
+        metrics.counter("answer_cache_hits" if match is not None else "answer_cache_misses").inc()
+        return match
+
+    def put(
+        self,
+        query: str,
+        query_embedding: Any,
+        answer: str,
+        sources: List[Any],
+        api_base_url: str,
+        generation: int,
+    ) -> None:
+        """Store an answer generated at `generation`, reusing the least recently used slot when full."""
+        if generation != self.generation():
+            # The index changed while generating; the answer may cite removed chunks.
+            return
+        vector = self._normalize(query_embedding)
+        now = time.monotonic()
+        with self._lock:
+            self._sync_generation(generation)
+            if self._vectors is None or self._vectors.shape[1] != vector.shape[0]:
+                self._vectors = np.zeros((self._max_size, vector.shape[0]), dtype=np.float32)
+                self._clear_locked()
+            free = np.flatnonzero(~self._occupied)
+            slot = int(free[0]) if free.size else int(np.argmin(self._last_used))
+            self._vectors[slot] = vector
+            self._entries[slot] = CachedAnswer(
+                query=query,
+                answer=answer,
+                sources=list(sources),
+                api_base_url=api_base_url,
+                generation=generation,
+                created_at=datetime.now(timezone.utc),
+            )
+            self._stored_at[slot] = now
+            self._last_used[slot] = now
+            self._occupied[slot] = True
+
+    def entries(self) -> List[CachedAnswer]:
+        """Return the cached answers, most recently used first."""
+        with self._lock:
+            slots = sorted(np.flatnonzero(self._occupied).tolist(), key=lambda s: -self._last_used[s])
+            return [self._entries[slot] for slot in slots if self._entries[slot] is not None]
+
+    def clear(self) -> int:
+        """Drop every cached answer and return how many were dropped."""
+        with self._lock:
+            dropped = int(self._occupied.sum())
+            self._clear_locked()
+            return dropped
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters, invalidations and current occupancy."""
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "size": int(self._occupied.sum()),
+                "max_size": self._max_size,
+                "threshold": self._threshold,
+                "ttl_seconds": self._ttl_seconds,
+                "generation": self._current_generation,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_ratio": (self._hits / lookups) if lookups else 0.0,
+                "generation_invalidations": self._invalidations,
+            }
@@ -0,0 +1,229 @@
+import math
+import re
+import sqlite3
+import threading
+import unicodedata
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+
+_TOKEN_PATTERN = re.compile(r"\w+")
+
+# Function words carry no signal for BM25 and dominate posting list sizes.
+STOPWORDS = frozenset(
+    "a an and are as at be by for from had has have he her his in is it its of on or "
+    "that the their there this to was were which with".split()
+)
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Split text into BM25 terms.
+
+    Text is NFKD-normalized, stripped of diacritics and case-folded, so archaic
+    or accented spellings ("Menelik", "Menilek", "Ménélik") share terms with
+    their plain forms where they differ only in marks. Numbers are kept as
+    terms, so dates and regnal years are matchable.
+    """
+    decomposed = unicodedata.normalize("NFKD", text)
+    stripped = "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+    return [
+        token
+        for token in _TOKEN_PATTERN.findall(stripped.casefold())
+        if token not in STOPWORDS and (len(token) > 1 or token.isdigit())
+    ]
+
+
+class BM25Index:
+    """
+    Persistent inverted index (SQLite) scored with Okapi BM25.
+
+    Postings are keyed by chunk ID, the same IDs used by the vector index, and
+    are maintained alongside it during ingestion and deletion. Only term
+    frequencies and chunk lengths are stored; chunk text stays in the vector index.
+    The chunk count and total length used for idf and average length live in
+    `bm25_meta`, updated in the same transaction as the postings, so workers
+    sharing the file score with the same totals.
+    """
+
+    _LOOKUP_BATCH = 500
+
+    def __init__(self, path: str, k1: float = 1.5, b: float = 0.75) -> None:
+        self._path = Path(path)
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        self._k1 = k1
+        self._b = b
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self._path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        with self._conn:
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS postings (
+                    term TEXT NOT NULL,
+                    chunk_id TEXT NOT NULL,
+                    tf INTEGER NOT NULL,
+                    PRIMARY KEY (term, chunk_id)
+                ) WITHOUT ROWID
+                """
+            )
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS chunks (
+                    chunk_id TEXT PRIMARY KEY,
+                    source TEXT,
+                    length INTEGER NOT NULL,
+                    terms TEXT NOT NULL
+                )
+                """
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS chunks_source ON chunks (source)")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS bm25_meta (key TEXT PRIMARY KEY, value INTEGER NOT NULL)"
+            )
+            # Indexes created before the totals were stored get them computed once.
+            self._conn.execute(
+                "INSERT OR IGNORE INTO bm25_meta (key, value) SELECT 'doc_count', COUNT(*) FROM chunks"
+            )
+            self._conn.execute(
+                "INSERT OR IGNORE INTO bm25_meta (key, value) "
+                "SELECT 'total_length', COALESCE(SUM(length), 0) FROM chunks"
+            )
+
+    def _totals(self) -> Tuple[int, int]:
+        """Current (chunk count, total chunk length), as committed by any process."""
+        totals = dict(self._conn.execute(
+            "SELECT key, value FROM bm25_meta WHERE key IN ('doc_count', 'total_length')"
+        ).fetchall())
+        return int(totals.get("doc_count", 0)), int(totals.get("total_length", 0))
+
+    def _add_totals(self, doc_count: int, total_length: int) -> None:
+        self._conn.executemany(
+            "UPDATE bm25_meta SET value = value + ? WHERE key = ?",
+            [(doc_count, "doc_count"), (total_length, "total_length")],
+        )
+
+    def is_backfilled(self) -> bool:
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM bm25_meta WHERE key = 'backfilled'").fetchone()
+            return bool(row and row[0])
+
+    def mark_backfilled(self) -> None:
+        with self._lock:
+            with self._conn:
+                self._conn.execute("INSERT OR REPLACE INTO bm25_meta (key, value) VALUES ('backfilled', 1)")
+
+    def count(self) -> int:
+        with self._lock:
+            return self._totals()[0]
+
+    def add(self, ids: Sequence[str], texts: Sequence[str], sources: Optional[Sequence[Optional[str]]] = None) -> None:
+        """Index (or re-index) chunks by ID in a single transaction."""
+        if not ids:
+            return
+        sources = sources if sources is not None else [None] * len(ids)
+        chunk_rows: List[Tuple[str, Optional[str], int, str]] = []
+        posting_rows: List[Tuple[str, str, int]] = []
+        for chunk_id, text, source in zip(ids, texts, sources):
+            counts = Counter(tokenize(text or ""))
+            chunk_rows.append((chunk_id, source, sum(counts.values()), " ".join(counts)))
+            posting_rows.extend((term, chunk_id, tf) for term, tf in counts.items())
+
+        with self._lock:
+            with self._conn:
+                self._delete_locked(ids)
+                self._conn.executemany(
+                    "INSERT INTO chunks (chunk_id, source, length, terms) VALUES (?, ?, ?, ?)", chunk_rows
+                )
+                self._conn.executemany("INSERT INTO postings (term, chunk_id, tf) VALUES (?, ?, ?)", posting_rows)
+                self._add_totals(len(chunk_rows), sum(row[2] for row in chunk_rows))
+
+    def delete(self, ids: Sequence[str]) -> None:
+        """Remove chunks by ID."""
+        if not ids:
+            return
+        with self._lock:
+            with self._conn:
+                self._delete_locked(ids)
+
+    def delete_source(self, source: str) -> int:
+        """Remove every chunk of a source and return how many were removed."""
+        with self._lock:
+            ids = [chunk_id for (chunk_id,) in self._conn.execute(
+                "SELECT chunk_id FROM chunks WHERE source = ?", (source,)
+            )]
+            with self._conn:
+                self._delete_locked(ids)
+        return len(ids)
+
+    def _delete_locked(self, ids: Sequence[str]) -> None:
+        ids = list(dict.fromkeys(ids))
+        for start in range(0, len(ids), self._LOOKUP_BATCH):
+            batch = ids[start:start + self._LOOKUP_BATCH]
+            placeholders = ",".join("?" * len(batch))
+            rows = self._conn.execute(
+                f"SELECT chunk_id, length, terms FROM chunks WHERE chunk_id IN ({placeholders})", batch
+            ).fetchall()
+            if not rows:
+                continue
+            self._conn.executemany(
+                "DELETE FROM postings WHERE term = ? AND chunk_id = ?",
+                [(term, chunk_id) for chunk_id, _, terms in rows for term in terms.split()],
+            )
+            self._conn.executemany("DELETE FROM chunks WHERE chunk_id = ?", [(chunk_id,) for chunk_id, _, _ in rows])
+            self._add_totals(-len(rows), -sum(length for _, length, _ in rows))
+
+    def search(self, query: str, top_k: int = 10) -> List[Tuple[str, float]]:
+        """Return up to `top_k` (chunk_id, score) pairs ranked by BM25 score."""
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms or top_k <= 0:
+            return []
+
+        with self._lock:
+            doc_count, total_length = self._totals()
+            if not doc_count:
+                return []
+            avg_length = total_length / doc_count
+            placeholders = ",".join("?" * len(terms))
+            rows = self._conn.execute(
+                f"""
+                SELECT p.term, p.chunk_id, p.tf, c.length
+                FROM postings p JOIN chunks c ON c.chunk_id = p.chunk_id
+                WHERE p.term IN ({placeholders})
+                """,
+                terms,
+            ).fetchall()
+
+        document_frequency = Counter(term for term, _, _, _ in rows)
+        idf = {
+            term: math.log(1.0 + (doc_count - df + 0.5) / (df + 0.5))
+            for term, df in document_frequency.items()
+        }
+        scores: Dict[str, float] = {}
+        for term, chunk_id, tf, length in rows:
+            norm = self._k1 * (1.0 - self._b + self._b * length / avg_length)
+            scores[chunk_id] = scores.get(chunk_id, 0.0) + idf[term] * tf * (self._k1 + 1.0) / (tf + norm)
+
+        return sorted(scores.items(), key=lambda item: item[1], reverse=True)[:top_k]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            doc_count, total_length = self._totals()
+            return {
+                "chunks": doc_count,
+                "avg_chunk_terms": round(total_length / doc_count, 2) if doc_count else 0.0,
+                "path": str(self._path),
+            }
+
+    def rebuild(self, chunks: Iterable[Tuple[str, str, Optional[str]]], batch_size: int = 1000) -> None:
+        """Index (chunk_id, text, source) triples from an existing collection and mark the index backfilled."""
+        batch: List[Tuple[str, str, Optional[str]]] = []
+        for chunk in chunks:
+            batch.append(chunk)
+            if len(batch) >= batch_size:
+                self.add(*zip(*batch))
+                batch = []
+        if batch:
+            self.add(*zip(*batch))
+        self.mark_backfilled()
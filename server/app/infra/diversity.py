@@ -0,0 +1,42 @@
+from typing import List
+
+import numpy as np
+
+
+def mmr_select(
+    relevance: np.ndarray,
+    embeddings: np.ndarray,
+    k: int,
+    lambda_mult: float = 0.7,
+) -> List[int]:
+    """
+    Greedy maximal marginal relevance over `n` candidates.
+
+    Each step picks the candidate maximizing
+    `lambda_mult * relevance - (1 - lambda_mult) * max cosine to the already picked ones`.
+    The pairwise cosine matrix is computed once and the running maximum is
+    updated with one vectorized row per step, so selection is O(n^2 + k * n).
+    `lambda_mult=1` reproduces the relevance order; lower values favour diversity.
+    Returns candidate indexes in selection order.
+    """
+    relevance = np.asarray(relevance, dtype=np.float32)
+    n = relevance.shape[0]
+    k = min(int(k), n)
+    if k <= 0:
+        return []
+
+    vectors = np.asarray(embeddings, dtype=np.float32)
+    vectors = vectors / np.clip(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12, None)
+    pairwise = vectors @ vectors.T
+
+    redundancy = np.zeros(n, dtype=np.float32)
+    available = np.ones(n, dtype=bool)
+    picked: List[int] = []
+    for _ in range(k):
+        scores = lambda_mult * relevance - (1.0 - lambda_mult) * redundancy
+        scores[~available] = -np.inf
+        choice = int(np.argmax(scores))
+        picked.append(choice)
+        available[choice] = False
+        redundancy = np.maximum(redundancy, pairwise[choice])
+    return picked
@@ -0,0 +1,115 @@
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+
+class DocumentCatalog:
+    """
+    Persistent per-source catalog of indexed documents (SQLite).
+
+    Chunk counts and last-indexed timestamps are updated incrementally on every
+    add and delete, so listing indexed documents never reads chunk metadata.
+    A version counter is bumped by every change and can be used as an ETag; it
+    is also bumped by every committed vector write (see `bump_version`), which
+    makes it the index generation for the retrieval result cache.
+    """
+
+    def __init__(self, path: str) -> None:
+        self._path = Path(path)
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self._path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        with self._conn:
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS documents (
+                    source TEXT PRIMARY KEY,
+                    chunks_count INTEGER NOT NULL,
+                    last_indexed_at TEXT
+                )
+                """
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS catalog_meta (key TEXT PRIMARY KEY, value INTEGER NOT NULL)"
+            )
+            self._conn.execute("INSERT OR IGNORE INTO catalog_meta (key, value) VALUES ('version', 0)")
+
+    def _bump_version(self) -> None:
+        self._conn.execute("UPDATE catalog_meta SET value = value + 1 WHERE key = 'version'")
+
+    @property
+    def version(self) -> int:
+        with self._lock:
+            (value,) = self._conn.execute(
+                "SELECT value FROM catalog_meta WHERE key = 'version'"
+            ).fetchone()
+            return int(value)
+
+    def bump_version(self) -> None:
+        """Record that indexed content changed (e.g. one committed write batch) without touching counts."""
+        with self._lock:
+            with self._conn:
+                self._bump_version()
+
+    def is_backfilled(self) -> bool:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM catalog_meta WHERE key = 'backfilled'"
+            ).fetchone()
+            return bool(row and row[0])
+
+    def record_indexed(self, chunk_counts: Dict[str, int], indexed_at: str) -> None:
+        """Set the current chunk count of each (re-)indexed source in a single transaction."""
+        if not chunk_counts:
+            return
+        with self._lock:
+            with self._conn:
+                self._conn.executemany(
+                    """
+                    INSERT INTO documents (source, chunks_count, last_indexed_at) VALUES (?, ?, ?)
+                    ON CONFLICT(source) DO UPDATE SET
+                        chunks_count = excluded.chunks_count,
+                        last_indexed_at = excluded.last_indexed_at
+                    """,
+                    [(source, count, indexed_at) for source, count in chunk_counts.items()],
+                )
+                self._bump_version()
+
+    def record_deleted(self, source: str) -> None:
+        """Remove a source whose chunks have all been deleted."""
+        with self._lock:
+            with self._conn:
+                cursor = self._conn.execute("DELETE FROM documents WHERE source = ?", (source,))
+                if cursor.rowcount:
+                    self._bump_version()
+
+    def rebuild(self, items: Iterable[Dict[str, Any]]) -> None:
+        """Replace the catalog contents (used once to backfill from an existing collection)."""
+        with self._lock:
+            with self._conn:
+                self._conn.execute("DELETE FROM documents")
+                self._conn.executemany(
+                    "INSERT INTO documents (source, chunks_count, last_indexed_at) VALUES (?, ?, ?)",
+                    [(i["source"], i["chunks_count"], i.get("last_indexed_at")) for i in items],
+                )
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO catalog_meta (key, value) VALUES ('backfilled', 1)"
+                )
+                self._bump_version()
+
+    def list(self, offset: int = 0, limit: Optional[int] = None) -> Tuple[List[Dict[str, Any]], int]:
+        """Return one page of documents ordered by source, plus the total document count."""
+        with self._lock:
+            (total,) = self._conn.execute("SELECT COUNT(*) FROM documents").fetchone()
+            rows = self._conn.execute(
+                "SELECT source, chunks_count, last_indexed_at FROM documents "
+                "ORDER BY source LIMIT ? OFFSET ?",
+                (limit if limit is not None else -1, offset),
+            ).fetchall()
+        items = [
+            {"source": source, "chunks_count": count, "last_indexed_at": indexed_at}
+            for source, count, indexed_at in rows
+        ]
+        return items, int(total)
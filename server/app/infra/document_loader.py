@@ -1,4 +1,4 @@
-from typing import List, Dict, Optional, Tuple, Any
+from typing import List, Dict, Iterator, Optional, Tuple, Any
 from pathlib import Path
 from io import BytesIO
 import re
@@ -75,8 +75,16 @@ def process_uploaded_file(
     chunk_overlap: int = 200,
 ) -> List[Dict[str, Any]]:
     """Process an uploaded file's text content into chunks with metadata."""
-    chunks: List[Dict[str, Any]] = []
-    
+    return list(iter_uploaded_file_chunks(file_content, filename, chunk_size, chunk_overlap))
+
+
+def iter_uploaded_file_chunks(
+    file_content: str | List[Dict[str, Any]],
+    filename: str,
+    chunk_size: int = 1000,
+    chunk_overlap: int = 200,
+) -> Iterator[Dict[str, Any]]:
+    """Lazily yield an uploaded file's chunks with metadata, page by page."""
     if isinstance(file_content, list):
         for page_data in file_content:
             page_text = page_data.get("text", "")
@@ -84,32 +92,27 @@ def process_uploaded_file(
             pdf_page_index = page_data.get("pdf_page_index", page_num)  # Physical PDF page for URL
             page_chunks = split_text_into_chunks(page_text, chunk_size, chunk_overlap)
             for idx, chunk in enumerate(page_chunks):
-                chunks.append(
-                    {
-                        "content": chunk,
-                        "metadata": {
-                            "source": filename,
-                            "page": page_num,  # Logical page number (from footer) - used for citations
-                            "pdf_page_index": pdf_page_index,  # Physical PDF page - used for URL fragments
-                            "chunk_index": idx,
-                            "upload_type": "file_upload",
-                        },
-                    }
-                )
-    else:
-        doc_chunks = split_text_into_chunks(file_content, chunk_size, chunk_overlap)
-        for idx, chunk in enumerate(doc_chunks):
-            chunks.append(
-                {
+                yield {
                     "content": chunk,
                     "metadata": {
                         "source": filename,
+                        "page": page_num,  # Logical page number (from footer) - used for citations
+                        "pdf_page_index": pdf_page_index,  # Physical PDF page - used for URL fragments
                         "chunk_index": idx,
                         "upload_type": "file_upload",
                     },
                 }
-            )
-    return chunks
+    else:
+        doc_chunks = split_text_into_chunks(file_content, chunk_size, chunk_overlap)
+        for idx, chunk in enumerate(doc_chunks):
+            yield {
+                "content": chunk,
+                "metadata": {
+                    "source": filename,
+                    "chunk_index": idx,
+                    "upload_type": "file_upload",
+                },
+            }
 
 
 def _extract_page_number_from_text(text: str) -> Optional[int]:
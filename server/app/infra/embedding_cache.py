@@ -0,0 +1,166 @@
+import hashlib
+import sqlite3
+import threading
+import time
+import unicodedata
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.infra.lru import LRUCache
+
+
+def normalize_query(text: str) -> str:
+    """Normalize query text so trivially different spellings share a cache entry."""
+    text = unicodedata.normalize("NFKC", text)
+    return " ".join(text.split())
+
+
+class QueryEmbeddingCache:
+    """
+    Thread-safe LRU cache of query embeddings.
+
+    Entries are keyed by (embedding model name, normalized query text) and
+    expire after `ttl_seconds` when a TTL is configured.
+    """
+
+    def __init__(
+        self,
+        model_name: str,
+        max_size: int = 1024,
+        ttl_seconds: Optional[float] = None,
+    ) -> None:
+        self._model_name = model_name
+        self._ttl_seconds = ttl_seconds if ttl_seconds and ttl_seconds > 0 else None
+        self._entries = LRUCache(max_size)
+
+    def _key(self, text: str) -> Tuple[str, str]:
+        return (self._model_name, normalize_query(text))
+
+    def _is_fresh(self, entry: Tuple[float, np.ndarray]) -> bool:
+        return self._ttl_seconds is None or time.monotonic() - entry[0] <= self._ttl_seconds
+
+    def get(self, text: str) -> Optional[np.ndarray]:
+        """Return the cached embedding for a query, or None on a miss."""
+        entry = self._entries.get(self._key(text), is_valid=self._is_fresh)
+        return entry[1] if entry is not None else None
+
+    def put(self, text: str, embedding: np.ndarray) -> None:
+        """Store an embedding, evicting the least recently used entry when full."""
+        # Cached vectors are shared between callers, so freeze a private copy.
+        embedding = np.array(embedding, dtype=np.float32)
+        embedding.flags.writeable = False
+        self._entries.put(self._key(text), (time.monotonic(), embedding))
+
+    def clear(self) -> None:
+        """Drop all cached embeddings and reset the counters."""
+        self._entries.clear(reset_counters=True)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters and current occupancy."""
+        return {
+            "model_name": self._model_name,
+            **self._entries.stats(),
+            "ttl_seconds": self._ttl_seconds,
+            "expired": self._entries.invalidated,
+        }
+
+
+def content_hash(text: str) -> str:
+    """Return the sha256 hex digest of a chunk's text."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class ChunkEmbeddingCache:
+    """
+    Persistent SQLite cache of chunk embeddings.
+
+    Vectors are stored as raw float32 blobs keyed by (sha256 of chunk text,
+    embedding model name), so identical chunks are only ever encoded once per model.
+    """
+
+    _LOOKUP_BATCH = 500
+
+    def __init__(self, path: str, model_name: str) -> None:
+        self._path = Path(path)
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        self._model_name = model_name
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self._path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS chunk_embeddings (
+                content_hash TEXT NOT NULL,
+                model_name TEXT NOT NULL,
+                dim INTEGER NOT NULL,
+                vector BLOB NOT NULL,
+                PRIMARY KEY (content_hash, model_name)
+            )
+            """
+        )
+        self._conn.commit()
+        self._hits = 0
+        self._misses = 0
+
+    @property
+    def model_name(self) -> str:
+        return self._model_name
+
+    def get_many(self, hashes: Sequence[str]) -> Dict[str, np.ndarray]:
+        """Return the cached embeddings (read-only float32 views) for the hashes that are present."""
+        found: Dict[str, np.ndarray] = {}
+        unique_hashes = list(dict.fromkeys(hashes))
+        with self._lock:
+            for start in range(0, len(unique_hashes), self._LOOKUP_BATCH):
+                batch = unique_hashes[start:start + self._LOOKUP_BATCH]
+                placeholders = ",".join("?" * len(batch))
+                rows = self._conn.execute(
+                    f"SELECT content_hash, vector FROM chunk_embeddings "
+                    f"WHERE model_name = ? AND content_hash IN ({placeholders})",
+                    [self._model_name, *batch],
+                ).fetchall()
+                for digest, blob in rows:
+                    found[digest] = np.frombuffer(blob, dtype=np.float32)
+            self._hits += len(found)
+            self._misses += len(unique_hashes) - len(found)
+        return found
+
+    def put_many(self, items: Iterable[Tuple[str, np.ndarray]]) -> None:
+        """Store embeddings keyed by content hash."""
+        rows = []
+        for digest, embedding in items:
+            vector = np.asarray(embedding, dtype=np.float32)
+            rows.append((digest, self._model_name, int(vector.shape[0]), vector.tobytes()))
+        if not rows:
+            return
+        with self._lock:
+            with self._conn:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO chunk_embeddings "
+                    "(content_hash, model_name, dim, vector) VALUES (?, ?, ?, ?)",
+                    rows,
+                )
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters and the number of stored vectors for this model."""
+        with self._lock:
+            (stored,) = self._conn.execute(
+                "SELECT COUNT(*) FROM chunk_embeddings WHERE model_name = ?",
+                (self._model_name,),
+            ).fetchone()
+            lookups = self._hits + self._misses
+            return {
+                "model_name": self._model_name,
+                "path": str(self._path),
+                "stored": stored,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_ratio": (self._hits / lookups) if lookups else 0.0,
+            }
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
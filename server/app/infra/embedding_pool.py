@@ -0,0 +1,96 @@
+import math
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from typing import List, Optional
+
+import numpy as np
+
+from app.infra.embeddings import EmbeddingBackend, embedding_model_id, initialize_embedding_model
+
+
+# Per-process model, loaded once by the pool initializer.
+_worker_model: Optional[EmbeddingBackend] = None
+
+
+def _init_worker(
+    model_name: str,
+    backend: str,
+    quantize: bool,
+    onnx_path: Optional[str],
+    num_threads: int,
+) -> None:
+    global _worker_model
+    _worker_model = initialize_embedding_model(
+        model_name=model_name,
+        backend=backend,
+        quantize=quantize,
+        onnx_path=onnx_path,
+        num_threads=num_threads,
+    )
+
+
+def _encode_shard(texts: List[str], batch_size: int) -> np.ndarray:
+    return np.asarray(_worker_model.encode(texts, batch_size=batch_size), dtype=np.float32)
+
+
+class EmbeddingWorkerPool(EmbeddingBackend):
+    """
+    Embedding backend that shards texts across worker processes.
+
+    Each worker loads its own copy of the model and is limited to
+    `threads_per_worker` intra-op threads, so N workers use roughly N cores.
+    A call is split into one shard per worker, capped at `shard_size` texts,
+    so a single write batch keeps every worker busy. Shards are reassembled in
+    input order.
+    """
+
+    def __init__(
+        self,
+        model_name: str,
+        num_workers: int,
+        backend: str = "torch",
+        quantize: bool = False,
+        onnx_path: Optional[str] = None,
+        threads_per_worker: int = 1,
+        shard_size: int = 256,
+    ) -> None:
+        super().__init__(model_name)
+        self._backend = backend
+        self._quantize = quantize
+        self._shard_size = max(int(shard_size), 1)
+        self._num_workers = max(int(num_workers), 1)
+        self._dimension: Optional[int] = None
+        # "spawn" avoids forking a parent that may already hold torch/ONNX thread pools.
+        self._executor = ProcessPoolExecutor(
+            max_workers=self._num_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(model_name, backend, quantize, onnx_path, max(int(threads_per_worker), 1)),
+        )
+
+    @property
+    def name(self) -> str:
+        return embedding_model_id(self.model_name, self._backend, self._quantize)
+
+    def encode(self, texts: List[str], batch_size: int = 32) -> np.ndarray:
+        if not texts:
+            return np.zeros((0, self.get_sentence_embedding_dimension()), dtype=np.float32)
+
+        shard_size = min(self._shard_size, math.ceil(len(texts) / self._num_workers))
+        shards = [
+            texts[start:start + shard_size]
+            for start in range(0, len(texts), shard_size)
+        ]
+        # Executor.map yields results in submission order, which keeps vectors aligned with texts.
+        return np.concatenate(list(self._executor.map(_encode_shard, shards, repeat(batch_size))))
+
+    def get_sentence_embedding_dimension(self) -> int:
+        if self._dimension is None:
+            probe = self._executor.submit(_encode_shard, ["dimension probe"], 1).result()
+            self._dimension = int(probe.shape[1])
+        return self._dimension
+
+    def shutdown(self) -> None:
+        """Stop the worker processes."""
+        self._executor.shutdown(wait=True, cancel_futures=True)
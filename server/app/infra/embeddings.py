@@ -1,22 +1,340 @@
-from typing import List
+import json
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
 from sentence_transformers import SentenceTransformer
 
+from app.infra.embedding_cache import ChunkEmbeddingCache, QueryEmbeddingCache, content_hash
+
+try:
+    import onnxruntime as ort
+    ONNX_SUPPORT = True
+except ImportError:
+    ONNX_SUPPORT = False
+    ort = None
+
+
+EMBEDDING_BACKENDS = {"torch", "onnx"}
+
+
+def embedding_model_id(model_name: str, backend: str = "torch", quantize: bool = False) -> str:
+    """
+    Identify a model + backend variant.
+
+    Vectors from different variants are not interchangeable, so caches key on this id.
+    """
+    backend = backend.lower()
+    if backend == "torch":
+        return model_name
+    return f"{model_name}@{backend}{'-int8' if quantize else ''}"
+
+
+class EmbeddingBackend(ABC):
+    """Abstract base class for embedding backends."""
+
+    def __init__(self, model_name: str) -> None:
+        self.model_name = model_name
+
+    @property
+    @abstractmethod
+    def name(self) -> str:
+        """Model + backend identifier, see `embedding_model_id`."""
+        pass
+
+    @abstractmethod
+    def encode(self, texts: List[str], batch_size: int = 32) -> np.ndarray:
+        """Encode texts into a (len(texts), dim) float32 array of L2-normalized rows."""
+        pass
+
+    @abstractmethod
+    def get_sentence_embedding_dimension(self) -> int:
+        """Return the embedding dimension."""
+        pass
+
+
+class SentenceTransformerBackend(EmbeddingBackend):
+    """PyTorch SentenceTransformer running on CPU."""
+
+    def __init__(self, model_name: str, num_threads: int = 0) -> None:
+        super().__init__(model_name)
+        if num_threads > 0:
+            import torch
+            torch.set_num_threads(num_threads)
+        device = 'cpu'
+        self._model = SentenceTransformer(model_name, device=device)
+        self._model = self._model.to(device)
+
+    @property
+    def name(self) -> str:
+        return embedding_model_id(self.model_name, "torch")
+
+    def encode(self, texts: List[str], batch_size: int = 32) -> np.ndarray:
+        return self._model.encode(
+            texts,
+            batch_size=batch_size,
+            convert_to_numpy=True,
+            normalize_embeddings=True,
+        )
+
+    def get_sentence_embedding_dimension(self) -> int:
+        return self._model.get_sentence_embedding_dimension()
+
+
+class OnnxEmbeddingBackend(EmbeddingBackend):
+    """
+    ONNX Runtime encoder for mean-pooling sentence-transformer models (e.g. MiniLM).
+
+    Loads the `onnx/model.onnx` export published with the model on the Hugging Face
+    Hub (or `onnx_path` when given) and optionally quantizes its weights to int8
+    with ONNX Runtime dynamic quantization. Output vectors are mean-pooled over the
+    attention mask and L2-normalized, matching the torch path.
+    """
+
+    def __init__(
+        self,
+        model_name: str,
+        quantize: bool = False,
+        onnx_path: Optional[str] = None,
+        num_threads: int = 0,
+    ) -> None:
+        super().__init__(model_name)
+        if not ONNX_SUPPORT or ort is None:
+            raise ImportError("onnxruntime is not installed. Install it with: pip install onnxruntime")
+
+        from transformers import AutoTokenizer
+
+        self.quantize = quantize
+        repo_id = model_name if "/" in model_name else f"sentence-transformers/{model_name}"
+        model_path = Path(onnx_path) if onnx_path else Path(self._download(repo_id, "onnx/model.onnx"))
+        if quantize:
+            model_path = self._quantize(model_path)
+
+        self._tokenizer = AutoTokenizer.from_pretrained(repo_id)
+        self._max_seq_length = self._read_max_seq_length(repo_id)
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if num_threads > 0:
+            options.intra_op_num_threads = num_threads
+        self._session = ort.InferenceSession(
+            str(model_path), sess_options=options, providers=["CPUExecutionProvider"]
+        )
+        self._input_names = {i.name for i in self._session.get_inputs()}
+        self._dimension: Optional[int] = None
+
+    @staticmethod
+    def _download(repo_id: str, filename: str) -> str:
+        from huggingface_hub import hf_hub_download
+
+        return hf_hub_download(repo_id=repo_id, filename=filename)
+
+    @staticmethod
+    def _quantize(model_path: Path) -> Path:
+        """Dynamically quantize weights to int8, caching the result next to the source model."""
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+
+        quantized_path = model_path.with_name(f"{model_path.stem}_qint8{model_path.suffix}")
+        if not quantized_path.exists():
+            quantize_dynamic(str(model_path), str(quantized_path), weight_type=QuantType.QInt8)
+        return quantized_path
+
+    def _read_max_seq_length(self, repo_id: str) -> int:
+        try:
+            config_path = self._download(repo_id, "sentence_bert_config.json")
+            return int(json.loads(Path(config_path).read_text())["max_seq_length"])
+        except Exception:
+            return min(int(self._tokenizer.model_max_length), 512)
+
+    @property
+    def name(self) -> str:
+        return embedding_model_id(self.model_name, "onnx", self.quantize)
+
+    def encode(self, texts: List[str], batch_size: int = 32) -> np.ndarray:
+        if not texts:
+            return np.zeros((0, self.get_sentence_embedding_dimension()), dtype=np.float32)
+
+        # Encode longest-first so each batch pads to a similar length, then restore order.
+        order = np.argsort([-len(text) for text in texts], kind="stable")
+        outputs: List[np.ndarray] = []
+        for start in range(0, len(texts), batch_size):
+            batch = [texts[idx] for idx in order[start:start + batch_size]]
+            outputs.append(self._encode_batch(batch))
+
+        embeddings = np.empty((len(texts), outputs[0].shape[1]), dtype=np.float32)
+        embeddings[order] = np.concatenate(outputs)
+        return embeddings
+
+    def _encode_batch(self, texts: List[str]) -> np.ndarray:
+        encoded = self._tokenizer(
+            texts,
+            padding=True,
+            truncation=True,
+            max_length=self._max_seq_length,
+            return_tensors="np",
+        )
+        feeds = {
+            name: encoded[name].astype(np.int64)
+            for name in ("input_ids", "attention_mask", "token_type_ids")
+            if name in self._input_names and name in encoded
+        }
+        if "token_type_ids" in self._input_names and "token_type_ids" not in feeds:
+            feeds["token_type_ids"] = np.zeros_like(feeds["input_ids"])
+
+        token_embeddings = self._session.run(None, feeds)[0]
+        mask = encoded["attention_mask"][..., None].astype(np.float32)
+        pooled = (token_embeddings * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+        norms = np.linalg.norm(pooled, axis=1, keepdims=True)
+        return (pooled / np.clip(norms, 1e-12, None)).astype(np.float32)
+
+    def get_sentence_embedding_dimension(self) -> int:
+        if self._dimension is None:
+            self._dimension = int(self._encode_batch(["dimension probe"]).shape[1])
+        return self._dimension
+
+
+def initialize_embedding_model(
+    model_name: str = "all-MiniLM-L6-v2",
+    backend: str = "torch",
+    quantize: bool = False,
+    onnx_path: Optional[str] = None,
+    num_threads: int = 0,
+) -> EmbeddingBackend:
+    """Initialize the embedding model on the configured backend ("torch" or "onnx")."""
+    backend = backend.lower()
+    if backend not in EMBEDDING_BACKENDS:
+        raise ValueError(
+            f"Unsupported embedding backend: {backend}. "
+            f"Supported backends: {', '.join(sorted(EMBEDDING_BACKENDS))}"
+        )
 
-def initialize_embedding_model(model_name: str = "all-MiniLM-L6-v2"):
-    """Initialize the embedding model."""
-    device = 'cpu'
     try:
-        model = SentenceTransformer(model_name, device=device)
-        model = model.to(device)
-        return model
+        if backend == "onnx":
+            return OnnxEmbeddingBackend(
+                model_name,
+                quantize=quantize,
+                onnx_path=onnx_path,
+                num_threads=num_threads,
+            )
+        return SentenceTransformerBackend(model_name, num_threads=num_threads)
+    except ImportError:
+        raise
     except Exception as e:
         raise RuntimeError(f"Failed to load embedding model: {e}. Try clearing cache: rm -rf ~/.cache/huggingface/")
 
-def generate_embeddings(texts: List[str], model) -> List[List[float]]:
-    """Generate embeddings for a list of texts."""
-    return model.encode(texts).tolist()
 
+def parse_length_buckets(spec: str) -> List[Tuple[int, int]]:
+    """
+    Parse a "max_chars:batch_size,..." bucket spec (e.g. "128:128,256:64,512:32").
+
+    Buckets are returned sorted by their upper length bound; an empty spec disables bucketing.
+    """
+    buckets: List[Tuple[int, int]] = []
+    for part in spec.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        try:
+            max_chars, batch_size = (int(value) for value in part.split(":"))
+        except ValueError:
+            raise ValueError(f"Invalid length bucket '{part}'. Expected 'max_chars:batch_size'.")
+        if max_chars <= 0 or batch_size <= 0:
+            raise ValueError(f"Invalid length bucket '{part}'. Values must be positive.")
+        buckets.append((max_chars, batch_size))
+    return sorted(buckets)
+
+
+def generate_embeddings(
+    texts: List[str],
+    model,
+    length_buckets: Optional[Sequence[Tuple[int, int]]] = None,
+) -> np.ndarray:
+    """
+    Generate embeddings for a list of texts.
+
+    Returns a C-contiguous (len(texts), dim) float32 array of L2-normalized rows,
+    which is handed to the vector store as-is rather than as nested Python lists.
+
+    With `length_buckets` ((max_chars, batch_size) pairs), texts are grouped by
+    character length and each group is encoded with its own batch size, so short
+    tail chunks run in large batches and long chunks are never padded alongside
+    them. Texts longer than the last bound fall into the last bucket.
+    """
+    if not length_buckets or len(texts) <= 1:
+        return np.ascontiguousarray(model.encode(texts), dtype=np.float32)
+
+    bounds = [max_chars for max_chars, _ in length_buckets]
+    groups: List[List[int]] = [[] for _ in length_buckets]
+    for idx, text in enumerate(texts):
+        bucket = min(int(np.searchsorted(bounds, len(text))), len(bounds) - 1)
+        groups[bucket].append(idx)
+
+    embeddings: Optional[np.ndarray] = None
+    for (_, batch_size), indices in zip(length_buckets, groups):
+        if not indices:
+            continue
+        indices.sort(key=lambda i: len(texts[i]))
+        encoded = np.asarray(
+            model.encode([texts[i] for i in indices], batch_size=batch_size),
+            dtype=np.float32,
+        )
+        if embeddings is None:
+            embeddings = np.empty((len(texts), encoded.shape[1]), dtype=np.float32)
+        embeddings[indices] = encoded
+    return embeddings
+
+
+def generate_embeddings_cached(
+    texts: List[str],
+    model,
+    cache: Optional[ChunkEmbeddingCache] = None,
+    length_buckets: Optional[Sequence[Tuple[int, int]]] = None,
+) -> np.ndarray:
+    """
+    Generate embeddings for a list of texts, only encoding chunks missing from the cache.
+
+    Duplicate texts within the batch are encoded once.
+    """
+    if cache is None:
+        return generate_embeddings(texts, model, length_buckets=length_buckets)
+
+    hashes = [content_hash(text) for text in texts]
+    cached = cache.get_many(hashes)
+
+    missing: dict = {}
+    for digest, text in zip(hashes, texts):
+        if digest not in cached and digest not in missing:
+            missing[digest] = text
+
+    if missing:
+        new_embeddings = generate_embeddings(list(missing.values()), model, length_buckets=length_buckets)
+        encoded = dict(zip(missing.keys(), new_embeddings))
+        cache.put_many(encoded.items())
+        cached.update(encoded)
+
+    if not hashes:
+        return np.zeros((0, model.get_sentence_embedding_dimension()), dtype=np.float32)
+
+    embeddings = np.empty((len(hashes), len(cached[hashes[0]])), dtype=np.float32)
+    for row, digest in enumerate(hashes):
+        embeddings[row] = cached[digest]
+    return embeddings
+
+
+def generate_embedding(
+    text: str,
+    model,
+    cache: Optional[QueryEmbeddingCache] = None,
+) -> np.ndarray:
+    """Generate embedding for a single text, consulting the query cache first when given."""
+    if cache is not None:
+        cached = cache.get(text)
+        if cached is not None:
+            return cached
+
+    embedding = generate_embeddings([text], model)[0]
 
-def generate_embedding(text: str, model) -> List[float]:
-    """Generate embedding for a single text."""
-    return generate_embeddings([text], model)[0]
+    if cache is not None:
+        cache.put(text, embedding)
+    return embedding
@@ -0,0 +1,83 @@
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional, Sequence, Tuple
+
+
+class LRUCache:
+    """
+    Thread-safe least-recently-used map with hit/miss counters.
+
+    `get` takes an optional `is_valid` check; an entry that fails it (expired,
+    or computed against an older index) is dropped and counted as a miss and
+    as invalidated. The shared base of the query embedding, rerank score and
+    retrieval result caches.
+    """
+
+    def __init__(self, max_size: int) -> None:
+        self.max_size = max(int(max_size), 1)
+        self._entries: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidated = 0
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def _get_locked(self, key: Hashable, is_valid: Optional[Callable[[Any], bool]]) -> Optional[Any]:
+        value = self._entries.get(key)
+        if value is not None and is_valid is not None and not is_valid(value):
+            del self._entries[key]
+            self.invalidated += 1
+            value = None
+        if value is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def get(self, key: Hashable, is_valid: Optional[Callable[[Any], bool]] = None) -> Optional[Any]:
+        """Return the value for `key`, or None on a miss."""
+        with self._lock:
+            return self._get_locked(key, is_valid)
+
+    def get_many(self, keys: Sequence[Hashable]) -> List[Optional[Any]]:
+        """Return the value for each key, or None where missing."""
+        with self._lock:
+            return [self._get_locked(key, None) for key in keys]
+
+    def put(self, key: Hashable, value: Any) -> None:
+        """Store a value, evicting the least recently used entry when full."""
+        self.put_many([(key, value)])
+
+    def put_many(self, items: Iterable[Tuple[Hashable, Any]]) -> None:
+        """Store values, evicting the least recently used entries when full."""
+        with self._lock:
+            for key, value in items:
+                self._entries[key] = value
+                self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self, reset_counters: bool = False) -> None:
+        """Drop every entry, and the counters with them when `reset_counters` is set."""
+        with self._lock:
+            self._entries.clear()
+            if reset_counters:
+                self.hits = 0
+                self.misses = 0
+                self.invalidated = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Return occupancy and hit/miss counters."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": (self.hits / lookups) if lookups else 0.0,
+            }
@@ -0,0 +1,101 @@
+import bisect
+import threading
+from typing import Any, Dict, Optional, Sequence
+
+
+DEFAULT_LATENCY_BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+DEFAULT_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128)
+
+
+class Histogram:
+    """
+    Thread-safe histogram with fixed upper bucket bounds.
+
+    Snapshots report cumulative bucket counts, as Prometheus does: `le_<bound>`
+    is the number of observations less than or equal to the bound, and
+    `le_inf` equals the total count.
+    """
+
+    def __init__(self, buckets: Sequence[float]) -> None:
+        self._bounds = sorted(float(b) for b in buckets)
+        self._counts = [0] * (len(self._bounds) + 1)
+        self._count = 0
+        self._sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        """Record a single observation."""
+        idx = bisect.bisect_left(self._bounds, value)
+        with self._lock:
+            self._counts[idx] += 1
+            self._count += 1
+            self._sum += value
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return the observation count, sum, mean and cumulative bucket counts."""
+        with self._lock:
+            buckets: Dict[str, int] = {}
+            cumulative = 0
+            for bound, count in zip(self._bounds, self._counts):
+                cumulative += count
+                buckets[f"le_{bound:g}"] = cumulative
+            buckets["le_inf"] = cumulative + self._counts[-1]
+            return {
+                "count": self._count,
+                "sum": self._sum,
+                "mean": (self._sum / self._count) if self._count else 0.0,
+                "buckets": buckets,
+            }
+
+
+class Counter:
+    """Thread-safe monotonically increasing counter."""
+
+    def __init__(self) -> None:
+        self._value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self._value += amount
+
+    @property
+    def value(self) -> float:
+        with self._lock:
+            return self._value
+
+
+class MetricsRegistry:
+    """Process-wide registry of named histograms and counters."""
+
+    def __init__(self) -> None:
+        self._histograms: Dict[str, Histogram] = {}
+        self._counters: Dict[str, Counter] = {}
+        self._lock = threading.Lock()
+
+    def histogram(self, name: str, buckets: Optional[Sequence[float]] = None) -> Histogram:
+        """Return the histogram registered under `name`, creating it on first use."""
+        with self._lock:
+            if name not in self._histograms:
+                self._histograms[name] = Histogram(buckets or DEFAULT_LATENCY_BUCKETS_MS)
+            return self._histograms[name]
+
+    def counter(self, name: str) -> Counter:
+        """Return the counter registered under `name`, creating it on first use."""
+        with self._lock:
+            if name not in self._counters:
+                self._counters[name] = Counter()
+            return self._counters[name]
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return the current value of every registered metric."""
+        with self._lock:
+            histograms = dict(self._histograms)
+            counters = dict(self._counters)
+        return {
+            "histograms": {name: h.snapshot() for name, h in sorted(histograms.items())},
+            "counters": {name: c.value for name, c in sorted(counters.items())},
+        }
+
+
+metrics = MetricsRegistry()
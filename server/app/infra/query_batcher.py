@@ -0,0 +1,161 @@
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Set
+
+from app.infra.bm25 import BM25Index
+from app.infra.embedding_cache import QueryEmbeddingCache
+from app.infra.metrics import DEFAULT_SIZE_BUCKETS, metrics
+from app.infra.vector_store import hybrid_search_batch, search_similar_documents_batch
+
+
+@dataclass
+class _PendingQuery:
+    query: str
+    top_k: int
+    future: asyncio.Future
+    enqueued_at: float = field(default_factory=time.perf_counter)
+
+
+class QueryBatcher:
+    """
+    Coalesces concurrent retrieval requests into batched encode + query calls.
+
+    Queries arriving within `window_ms` of the first pending query (or until
+    `max_batch_size` queries are waiting) are encoded in one `encode` call and
+    answered by one multi-embedding `collection.query`, which runs in a worker
+    thread so the event loop stays free. With a keyword index, each batch is
+    answered by hybrid dense + BM25 retrieval instead. With `mmr_lambda` set,
+    results are diversified by maximal marginal relevance. Call `close` on
+    shutdown to answer the queued queries and wait for in-flight batches.
+    """
+
+    def __init__(
+        self,
+        collection: Any,
+        embedding_model: Any,
+        window_ms: float = 5.0,
+        max_batch_size: int = 32,
+        query_cache: Optional[QueryEmbeddingCache] = None,
+        keyword_index: Optional[BM25Index] = None,
+        candidate_factor: int = 2,
+        rrf_k: int = 60,
+        mmr_lambda: Optional[float] = None,
+        mmr_fetch_factor: int = 3,
+    ) -> None:
+        self._collection = collection
+        self._embedding_model = embedding_model
+        self._window_seconds = max(window_ms, 0.0) / 1000.0
+        self._max_batch_size = max(int(max_batch_size), 1)
+        self._query_cache = query_cache
+        self._keyword_index = keyword_index
+        self._candidate_factor = candidate_factor
+        self._rrf_k = rrf_k
+        self._mmr_lambda = mmr_lambda
+        self._mmr_fetch_factor = mmr_fetch_factor
+        self._pending: List[_PendingQuery] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        # Strong references to in-flight batches; the event loop only keeps weak ones.
+        self._tasks: Set[asyncio.Task] = set()
+        self._closed = False
+        self._batch_size_hist = metrics.histogram("query_batch_size", DEFAULT_SIZE_BUCKETS)
+        self._queue_wait_hist = metrics.histogram("query_batch_queue_wait_ms")
+        self._batch_latency_hist = metrics.histogram("query_batch_latency_ms")
+
+    async def search(self, query: str, top_k: int) -> List[Dict[str, Any]]:
+        """Queue a query for the next batch and wait for its formatted results."""
+        if self._closed:
+            raise RuntimeError("Query batcher is closed")
+        loop = asyncio.get_running_loop()
+        pending = _PendingQuery(query=query, top_k=top_k, future=loop.create_future())
+        self._pending.append(pending)
+
+        if len(self._pending) >= self._max_batch_size:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self._window_seconds, self._flush)
+
+        return await pending.future
+
+    def _flush(self) -> None:
+        """Take up to `max_batch_size` pending queries and dispatch them as one batch."""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+
+        batch = self._pending[:self._max_batch_size]
+        self._pending = self._pending[self._max_batch_size:]
+        if self._pending and not self._closed:
+            loop = asyncio.get_running_loop()
+            self._flush_handle = loop.call_later(self._window_seconds, self._flush)
+        if batch:
+            task = asyncio.get_running_loop().create_task(self._run_batch(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def close(self, timeout: float = 5.0) -> None:
+        """Stop accepting queries, dispatch the queued ones and wait up to `timeout` seconds for in-flight batches."""
+        self._closed = True
+        while self._pending:
+            self._flush()
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        if not self._tasks:
+            return
+        _, unfinished = await asyncio.wait(set(self._tasks), timeout=timeout)
+        for task in unfinished:
+            task.cancel()
+        if unfinished:
+            await asyncio.wait(unfinished)
+
+    async def _run_batch(self, batch: List[_PendingQuery]) -> None:
+        started_at = time.perf_counter()
+        self._batch_size_hist.observe(len(batch))
+        for pending in batch:
+            self._queue_wait_hist.observe((started_at - pending.enqueued_at) * 1000.0)
+
+        # One query with the largest top_k serves every caller; each is truncated to its own k.
+        max_top_k = max(pending.top_k for pending in batch)
+        queries = [pending.query for pending in batch]
+        try:
+            if self._keyword_index is not None:
+                results = await asyncio.to_thread(
+                    hybrid_search_batch,
+                    queries,
+                    self._collection,
+                    self._embedding_model,
+                    self._keyword_index,
+                    max_top_k,
+                    self._query_cache,
+                    self._candidate_factor,
+                    self._rrf_k,
+                    self._mmr_lambda,
+                    self._mmr_fetch_factor,
+                )
+            else:
+                results = await asyncio.to_thread(
+                    search_similar_documents_batch,
+                    queries,
+                    self._collection,
+                    self._embedding_model,
+                    max_top_k,
+                    self._query_cache,
+                    self._mmr_lambda,
+                    self._mmr_fetch_factor,
+                )
+        except asyncio.CancelledError:
+            for pending in batch:
+                pending.future.cancel()
+            raise
+        except Exception as exc:
+            for pending in batch:
+                if not pending.future.done():
+                    pending.future.set_exception(exc)
+            return
+        finally:
+            self._batch_latency_hist.observe((time.perf_counter() - started_at) * 1000.0)
+
+        for pending, chunks in zip(batch, results):
+            if not pending.future.done():
+                pending.future.set_result(chunks[:pending.top_k])
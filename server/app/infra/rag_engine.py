@@ -1,9 +1,15 @@
+import time
 from typing import List, Dict, Optional, Any
 from urllib.parse import quote
 
+from app.core.config import settings
+from app.infra.bm25 import BM25Index
+from app.infra.embedding_cache import QueryEmbeddingCache
 from app.infra.llm import LLMClient
+from app.infra.metrics import metrics
 from app.infra.prompts import format_prompt_with_context
-from app.infra.vector_store import search_similar_documents
+from app.infra.reranker import CrossEncoderReranker
+from app.infra.vector_store import hybrid_search_batch, search_similar_documents_batch
 
 
 def retrieve_relevant_context(
@@ -11,9 +17,66 @@ def retrieve_relevant_context(
     vector_store_collection: Any,
     embedding_model: Any,
     top_k: int = 3,
+    query_cache: Optional[QueryEmbeddingCache] = None,
+    keyword_index: Optional[BM25Index] = None,
 ) -> List[Dict[str, Any]]:
-    """Retrieve relevant document chunks for a query from the vector store."""
-    return search_similar_documents(query, vector_store_collection, embedding_model, top_k)
+    """
+    Retrieve relevant document chunks for a query from the vector store.
+
+    With a keyword index, dense and BM25 results are merged by reciprocal rank
+    fusion; with MMR enabled, a diverse top_k is picked from over-fetched candidates.
+    """
+    return retrieve_relevant_context_batch(
+        [query], vector_store_collection, embedding_model, top_k, query_cache, keyword_index
+    )[0]
+
+
+def retrieve_relevant_context_batch(
+    queries: List[str],
+    vector_store_collection: Any,
+    embedding_model: Any,
+    top_k: int = 3,
+    query_cache: Optional[QueryEmbeddingCache] = None,
+    keyword_index: Optional[BM25Index] = None,
+) -> List[List[Dict[str, Any]]]:
+    """Retrieve context for several queries with one encode call and one multi-query search."""
+    mmr_lambda = settings.MMR_LAMBDA if settings.MMR_ENABLED else None
+    if keyword_index is not None:
+        return hybrid_search_batch(
+            queries,
+            vector_store_collection,
+            embedding_model,
+            keyword_index,
+            top_k,
+            query_cache=query_cache,
+            candidate_factor=settings.HYBRID_CANDIDATE_FACTOR,
+            rrf_k=settings.HYBRID_RRF_K,
+            mmr_lambda=mmr_lambda,
+            mmr_fetch_factor=settings.MMR_FETCH_FACTOR,
+        )
+    return search_similar_documents_batch(
+        queries,
+        vector_store_collection,
+        embedding_model,
+        top_k,
+        query_cache=query_cache,
+        mmr_lambda=mmr_lambda,
+        mmr_fetch_factor=settings.MMR_FETCH_FACTOR,
+    )
+
+
+def rerank_context(
+    query: str,
+    context_chunks: List[Dict[str, Any]],
+    reranker: CrossEncoderReranker,
+    top_n: int,
+) -> List[Dict[str, Any]]:
+    """Keep the `top_n` retrieved chunks the cross-encoder scores as most relevant."""
+    started = time.perf_counter()
+    reranked = reranker.rerank(query, context_chunks, top_n)
+    metrics.histogram("rerank_latency_ms").observe((time.perf_counter() - started) * 1000.0)
+    return reranked
+
 
 def generate_response(
     prompt_messages: List[Dict[str, str]],
@@ -38,6 +101,11 @@ def rag_pipeline(
     conversation_history: Optional[List[Dict[str, str]]] = None,
     return_context: bool = False,
     api_base_url: str = "http://localhost:8000",
+    query_cache: Optional[QueryEmbeddingCache] = None,
+    context_chunks: Optional[List[Dict[str, Any]]] = None,
+    keyword_index: Optional[BM25Index] = None,
+    reranker: Optional[CrossEncoderReranker] = None,
+    rerank_top_n: Optional[int] = None,
 ) -> Dict[str, Any]:
     """
     Complete RAG pipeline: retrieve context, build prompt, generate answer.
@@ -45,10 +113,23 @@ def rag_pipeline(
     Args:
         return_context: If True, includes context_chunks in return dict for evaluation
         api_base_url: Base URL for generating source document links
+        query_cache: Optional query embedding cache consulted before encoding the query
+        context_chunks: Already-retrieved chunks (e.g. from the query batcher); skips retrieval
+        keyword_index: Optional BM25 index fused with dense retrieval
+        reranker: Optional cross-encoder; `top_k` candidates are retrieved and only
+            the best `rerank_top_n` are put in the prompt
     """
-    context_chunks = retrieve_relevant_context(
-        query, vector_store_collection, embedding_model, top_k
-    )
+    if context_chunks is None:
+        context_chunks = retrieve_relevant_context(
+            query,
+            vector_store_collection,
+            embedding_model,
+            top_k,
+            query_cache=query_cache,
+            keyword_index=keyword_index,
+        )
+    if reranker is not None:
+        context_chunks = rerank_context(query, context_chunks, reranker, rerank_top_n or top_k)
     prompt_messages = format_prompt_with_context(query, context_chunks, conversation_history)
     answer = generate_response(prompt_messages, llm_client, temperature)
 
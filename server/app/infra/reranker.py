@@ -0,0 +1,104 @@
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sentence_transformers import CrossEncoder
+
+from app.infra.embedding_cache import content_hash, normalize_query
+from app.infra.lru import LRUCache
+
+
+class RerankScoreCache:
+    """
+    Thread-safe LRU cache of cross-encoder scores.
+
+    Entries are keyed by (model name, normalized query, chunk content hash), so
+    repeated and rephrased-identical questions skip the cross-encoder for
+    chunks they have already scored.
+    """
+
+    def __init__(self, model_name: str, max_size: int = 4096) -> None:
+        self._model_name = model_name
+        self._entries = LRUCache(max_size)
+
+    def _key(self, query: str, text: str) -> Tuple[str, str, str]:
+        return (self._model_name, normalize_query(query), content_hash(text))
+
+    def get_many(self, query: str, texts: Sequence[str]) -> List[Optional[float]]:
+        """Return the cached score for each text, or None where missing."""
+        return self._entries.get_many([self._key(query, text) for text in texts])
+
+    def put_many(self, query: str, texts: Sequence[str], scores: Sequence[float]) -> None:
+        """Store scores, evicting the least recently used entries when full."""
+        self._entries.put_many([(self._key(query, text), float(score)) for text, score in zip(texts, scores)])
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters and current occupancy."""
+        return {"model_name": self._model_name, **self._entries.stats()}
+
+
+class CrossEncoderReranker:
+    """
+    Scores (query, chunk) pairs with a small CPU cross-encoder and keeps the best chunks.
+
+    Only pairs missing from the score cache are sent to the model, in batches
+    of `batch_size`.
+    """
+
+    def __init__(
+        self,
+        model_name: str,
+        batch_size: int = 32,
+        max_length: int = 512,
+        cache: Optional[RerankScoreCache] = None,
+    ) -> None:
+        self.model_name = model_name
+        self._batch_size = max(int(batch_size), 1)
+        self._model = CrossEncoder(model_name, max_length=max_length, device="cpu")
+        self._cache = cache
+
+    @property
+    def cache(self) -> Optional[RerankScoreCache]:
+        return self._cache
+
+    def score(self, query: str, texts: Sequence[str]) -> np.ndarray:
+        """Return one relevance score per text (higher is more relevant)."""
+        if not texts:
+            return np.zeros(0, dtype=np.float32)
+
+        cached = self._cache.get_many(query, texts) if self._cache is not None else [None] * len(texts)
+        missing = [idx for idx, score in enumerate(cached) if score is None]
+        scores = np.array([score if score is not None else 0.0 for score in cached], dtype=np.float32)
+        if missing:
+            missing_texts = [texts[idx] for idx in missing]
+            predicted = np.asarray(
+                self._model.predict(
+                    [(query, text) for text in missing_texts],
+                    batch_size=self._batch_size,
+                    show_progress_bar=False,
+                ),
+                dtype=np.float32,
+            ).reshape(-1)
+            scores[missing] = predicted
+            if self._cache is not None:
+                self._cache.put_many(query, missing_texts, predicted.tolist())
+        return scores
+
+    def rerank(self, query: str, chunks: List[Dict[str, Any]], top_n: int) -> List[Dict[str, Any]]:
+        """Return the `top_n` chunks by cross-encoder score, each annotated with `rerank_score`."""
+        if not chunks:
+            return []
+        scores = self.score(query, [chunk.get("content") or chunk.get("text") or "" for chunk in chunks])
+        # Stable sort keeps retrieval order among equal scores.
+        order = np.argsort(-scores, kind="stable")[:top_n]
+        return [{**chunks[idx], "rerank_score": float(scores[idx])} for idx in order]
+
+
+def initialize_reranker(
+    model_name: str = "cross-encoder/ms-marco-MiniLM-L-6-v2",
+    batch_size: int = 32,
+    max_length: int = 512,
+    cache_size: int = 4096,
+) -> CrossEncoderReranker:
+    """Load the cross-encoder, with a score cache unless `cache_size` is 0."""
+    cache = RerankScoreCache(model_name, max_size=cache_size) if cache_size > 0 else None
+    return CrossEncoderReranker(model_name, batch_size=batch_size, max_length=max_length, cache=cache)
@@ -0,0 +1,78 @@
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from app.infra.embedding_cache import normalize_query
+from app.infra.lru import LRUCache
+from app.infra.metrics import metrics
+
+
+class RetrievalResultCache:
+    """
+    Thread-safe LRU cache of ranked retrieval results.
+
+    Entries are keyed by (normalized query text, top_k) and tagged with the
+    index generation read *before* the retrieval ran. Every committed add,
+    upsert and delete bumps the generation (see `DocumentCatalog.bump_version`),
+    and an entry is only served while its tag equals the current generation, so
+    results computed against an older index state are never returned. Hits
+    record the retrieval time they saved.
+    """
+
+    def __init__(self, generation: Callable[[], int], max_size: int = 2048) -> None:
+        self._generation = generation
+        # (generation, retrieval ms, chunks) per (normalized query, top_k).
+        self._entries = LRUCache(max_size)
+        self._saved_lock = threading.Lock()
+        self._saved_ms = 0.0
+
+    def generation(self) -> int:
+        """Return the current index generation; read it before retrieving a result to `put`."""
+        return int(self._generation())
+
+    @staticmethod
+    def _key(query: str, top_k: int) -> Tuple[str, int]:
+        return (normalize_query(query), int(top_k))
+
+    def get(self, query: str, top_k: int, generation: int) -> Optional[List[Dict[str, Any]]]:
+        """Return the cached chunks for `query` at `generation`, or None on a miss."""
+        entry = self._entries.get(self._key(query, top_k), is_valid=lambda cached: cached[0] == generation)
+        if entry is None:
+            metrics.counter("retrieval_cache_misses").inc()
+            return None
+        with self._saved_lock:
+            self._saved_ms += entry[1]
+        metrics.counter("retrieval_cache_hits").inc()
+        metrics.counter("retrieval_cache_saved_ms").inc(entry[1])
+        # Callers may annotate chunks (e.g. rerank scores), so hand out copies.
+        return [dict(chunk) for chunk in entry[2]]
+
+    def put(
+        self,
+        query: str,
+        top_k: int,
+        generation: int,
+        chunks: List[Dict[str, Any]],
+        elapsed_ms: float,
+    ) -> None:
+        """Store the chunks retrieved at `generation`, evicting the least recently used entry when full."""
+        if generation != self.generation():
+            # The index changed while retrieving, so the entry could never be served.
+            return
+        self._entries.put(
+            self._key(query, top_k),
+            (int(generation), float(elapsed_ms), [dict(chunk) for chunk in chunks]),
+        )
+
+    def clear(self) -> None:
+        """Drop all cached results."""
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters, saved retrieval time and current occupancy."""
+        with self._saved_lock:
+            saved_ms = self._saved_ms
+        return {
+            **self._entries.stats(),
+            "stale_evictions": self._entries.invalidated,
+            "saved_ms": round(saved_ms, 2),
+        }
@@ -0,0 +1,289 @@
+"""
+Compact snapshots of the vector index for bringing up new replicas.
+
+A snapshot is a directory holding:
+
+- `embeddings.npy`: float32 matrix, one row per chunk
+- `records.parquet` (or `records.jsonl` without pyarrow): id, document and
+  JSON metadata per chunk, in the same order as the matrix rows
+- `manifest.json`: format version, row count, dimension, distance space and
+  embedding model id (model, backend and quantization, see `embedding_model_id`)
+
+Usage (from the `server` directory, with the server stopped):
+    python -m app.infra.snapshot export ./snapshots/2024-06-01
+    python -m app.infra.snapshot import ./snapshots/2024-06-01
+
+Import bulk-loads the rows into the configured (empty) index and rebuilds the
+document catalog and BM25 sidecars from them, so no chunk is re-embedded.
+"""
+import argparse
+import json
+import time
+from datetime import datetime, timezone
+from itertools import islice
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from app.infra.bm25 import BM25Index
+from app.infra.document_catalog import DocumentCatalog
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    PARQUET_SUPPORT = True
+except ImportError:
+    pa = None
+    pq = None
+    PARQUET_SUPPORT = False
+
+
+SNAPSHOT_FORMAT = "archive-qa-vector-snapshot"
+SNAPSHOT_VERSION = 1
+MANIFEST_FILE = "manifest.json"
+EMBEDDINGS_FILE = "embeddings.npy"
+
+
+def _leaf_indexes(index: Any) -> List[Any]:
+    """Page through each shard separately; a sharded `get` with offsets re-reads every shard."""
+    return list(getattr(index, "shards", None) or [index])
+
+
+def _iter_index_pages(index: Any, batch_size: int) -> Iterator[Dict[str, Any]]:
+    for leaf in _leaf_indexes(index):
+        offset = 0
+        while True:
+            page = leaf.get(include=["embeddings", "documents", "metadatas"], limit=batch_size, offset=offset)
+            ids = page.get("ids") or []
+            if not ids:
+                break
+            yield page
+            offset += len(ids)
+
+
+class _RecordsWriter:
+    """Append-only writer for the records file (Parquet when pyarrow is installed, else JSON lines)."""
+
+    def __init__(self, directory: Path) -> None:
+        self.file_name = "records.parquet" if PARQUET_SUPPORT else "records.jsonl"
+        self._path = directory / self.file_name
+        self._parquet = None
+        self._jsonl = None
+        if PARQUET_SUPPORT:
+            schema = pa.schema([("id", pa.string()), ("document", pa.string()), ("metadata", pa.string())])
+            self._parquet = pq.ParquetWriter(str(self._path), schema, compression="zstd")
+            self._schema = schema
+        else:
+            self._jsonl = open(self._path, "w", encoding="utf-8")
+
+    def write(self, ids: List[str], documents: List[Optional[str]], metadatas: List[Dict[str, Any]]) -> None:
+        encoded = [json.dumps(metadata or {}, ensure_ascii=False) for metadata in metadatas]
+        if self._parquet is not None:
+            self._parquet.write_table(
+                pa.Table.from_arrays(
+                    [pa.array(ids), pa.array(documents, type=pa.string()), pa.array(encoded)],
+                    schema=self._schema,
+                )
+            )
+            return
+        for chunk_id, document, metadata in zip(ids, documents, encoded):
+            self._jsonl.write(json.dumps({"id": chunk_id, "document": document, "metadata": metadata}, ensure_ascii=False))
+            self._jsonl.write("\n")
+
+    def close(self) -> None:
+        if self._parquet is not None:
+            self._parquet.close()
+        if self._jsonl is not None:
+            self._jsonl.close()
+
+
+def _iter_records(path: Path, batch_size: int) -> Iterator[Tuple[List[str], List[Optional[str]], List[Dict[str, Any]]]]:
+    if path.suffix == ".parquet":
+        if not PARQUET_SUPPORT:
+            raise RuntimeError(f"{path.name} needs pyarrow; install it with `pip install pyarrow`")
+        for batch in pq.ParquetFile(str(path)).iter_batches(batch_size=batch_size):
+            columns = batch.to_pydict()
+            yield columns["id"], columns["document"], [json.loads(m) for m in columns["metadata"]]
+        return
+    with open(path, encoding="utf-8") as handle:
+        while True:
+            lines = list(islice(handle, batch_size))
+            if not lines:
+                return
+            rows = [json.loads(line) for line in lines]
+            yield [r["id"] for r in rows], [r["document"] for r in rows], [json.loads(r["metadata"]) for r in rows]
+
+
+def read_manifest(path: str) -> Dict[str, Any]:
+    """Load and validate a snapshot manifest."""
+    manifest_path = Path(path) / MANIFEST_FILE
+    if not manifest_path.exists():
+        raise FileNotFoundError(f"No snapshot manifest at {manifest_path}")
+    manifest = json.loads(manifest_path.read_text())
+    if manifest.get("format") != SNAPSHOT_FORMAT:
+        raise ValueError(f"{manifest_path} is not a vector index snapshot")
+    if int(manifest.get("version", 0)) > SNAPSHOT_VERSION:
+        raise ValueError(
+            f"Snapshot version {manifest['version']} is newer than the supported version {SNAPSHOT_VERSION}"
+        )
+    return manifest
+
+
+def export_snapshot(
+    index: Any,
+    path: str,
+    embedding_model_id: Optional[str] = None,
+    batch_size: int = 2000,
+) -> Dict[str, Any]:
+    """
+    Write every chunk of `index` to a snapshot directory and return its manifest.
+
+    Rows are streamed page by page into a pre-sized `.npy` memmap, so memory
+    stays bounded by `batch_size`. Chunks written while the export runs may or
+    may not be included; export from a quiesced node.
+    """
+    directory = Path(path)
+    directory.mkdir(parents=True, exist_ok=True)
+    started = time.perf_counter()
+    expected = index.count()
+
+    writer = _RecordsWriter(directory)
+    matrix: Optional[np.ndarray] = None
+    written = 0
+    try:
+        for page in _iter_index_pages(index, batch_size):
+            embeddings = np.asarray(page["embeddings"], dtype=np.float32)
+            if matrix is None:
+                matrix = np.lib.format.open_memmap(
+                    str(directory / EMBEDDINGS_FILE),
+                    mode="w+",
+                    dtype=np.float32,
+                    shape=(max(expected, len(embeddings)), embeddings.shape[1]),
+                )
+            if written + len(embeddings) > matrix.shape[0]:
+                raise RuntimeError(
+                    f"The index grew past {matrix.shape[0]} chunks during export; stop writers and retry"
+                )
+            matrix[written:written + len(embeddings)] = embeddings
+            writer.write(list(page["ids"]), list(page["documents"]), list(page["metadatas"]))
+            written += len(embeddings)
+    finally:
+        writer.close()
+    if matrix is not None:
+        matrix.flush()
+
+    manifest = {
+        "format": SNAPSHOT_FORMAT,
+        "version": SNAPSHOT_VERSION,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "count": written,
+        "dim": int(matrix.shape[1]) if matrix is not None else 0,
+        "space": index.space,
+        "embedding_model_id": embedding_model_id,
+        "embeddings": EMBEDDINGS_FILE if matrix is not None else None,
+        "records": writer.file_name,
+    }
+    (directory / MANIFEST_FILE).write_text(json.dumps(manifest, indent=2))
+    print(f"Exported {written} chunks to {directory} in {time.perf_counter() - started:.1f}s")
+    return manifest
+
+
+def import_snapshot(
+    path: str,
+    index: Any,
+    embedding_model_id: Optional[str] = None,
+    catalog: Optional[DocumentCatalog] = None,
+    keyword_index: Optional[BM25Index] = None,
+    batch_size: int = 4096,
+) -> Dict[str, Any]:
+    """
+    Bulk-load a snapshot into an empty index and return its manifest.
+
+    Embeddings are read from a memory map in `batch_size` slices and written
+    with one `add` per slice. When given, the catalog and keyword index are
+    rebuilt from the imported rows. Refuses snapshots taken with a different
+    embedding model id, since their vectors would not match encoded queries:
+    the same model under another backend or quantization drifts too.
+    """
+    manifest = read_manifest(path)
+    directory = Path(path)
+    snapshot_model_id = manifest.get("embedding_model_id")
+    if embedding_model_id and snapshot_model_id and snapshot_model_id != embedding_model_id:
+        raise ValueError(
+            f"Snapshot was taken with embedding model {snapshot_model_id!r}, "
+            f"but the server is configured for {embedding_model_id!r}"
+        )
+    existing = index.count()
+    if existing:
+        raise ValueError(f"Target index '{index.name}' already holds {existing} chunks; import needs an empty index")
+    if manifest.get("space") and manifest["space"] != index.space:
+        print(
+            f"Snapshot was exported from a '{manifest['space']}' index and is imported into a "
+            f"'{index.space}' index; vectors are copied unchanged"
+        )
+
+    count = int(manifest["count"])
+    started = time.perf_counter()
+    matrix = np.load(str(directory / manifest["embeddings"]), mmap_mode="r") if count else None
+    chunk_counts: Dict[str, Dict[str, Any]] = {}
+    loaded = 0
+    for ids, documents, metadatas in _iter_records(directory / manifest["records"], batch_size):
+        embeddings = np.ascontiguousarray(matrix[loaded:loaded + len(ids)])
+        index.add(ids=ids, embeddings=embeddings, documents=documents, metadatas=metadatas)
+        if keyword_index is not None:
+            keyword_index.add(ids, [document or "" for document in documents], [md.get("source") for md in metadatas])
+        for metadata in metadatas:
+            source = metadata.get("source")
+            if not source:
+                continue
+            entry = chunk_counts.setdefault(source, {"source": source, "chunks_count": 0, "last_indexed_at": None})
+            entry["chunks_count"] += 1
+            # Same rule as scan_indexed_documents: the latest indexed_at of the source's chunks.
+            indexed_at = metadata.get("indexed_at")
+            if indexed_at and (not entry["last_indexed_at"] or indexed_at > entry["last_indexed_at"]):
+                entry["last_indexed_at"] = indexed_at
+        loaded += len(ids)
+
+    index.flush()
+    if loaded != count:
+        raise RuntimeError(f"Snapshot manifest lists {count} chunks but its records hold {loaded}")
+    if catalog is not None:
+        catalog.rebuild(chunk_counts.values())
+    if keyword_index is not None:
+        keyword_index.mark_backfilled()
+    seconds = time.perf_counter() - started
+    print(f"Imported {loaded} chunks from {directory} in {seconds:.1f}s ({loaded / max(seconds, 1e-9):.0f} chunks/s)")
+    return manifest
+
+
+def main() -> None:
+    from app.core.config import settings
+    from app.core.deps import get_embedding_model_id, get_vector_store_collection
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("command", choices=["export", "import"])
+    parser.add_argument("path", help="snapshot directory")
+    parser.add_argument("--batch-size", type=int, default=None)
+    args = parser.parse_args()
+
+    index = get_vector_store_collection()
+    if args.command == "export":
+        export_snapshot(index, args.path, embedding_model_id=get_embedding_model_id(), batch_size=args.batch_size or 2000)
+        return
+
+    # The sidecars are opened directly: the deps getters would backfill them from the still-empty index.
+    vector_db = Path(settings.VECTOR_DB_PATH)
+    import_snapshot(
+        args.path,
+        index,
+        embedding_model_id=get_embedding_model_id(),
+        catalog=DocumentCatalog(path=str(vector_db / "catalog.sqlite")),
+        keyword_index=BM25Index(path=str(vector_db / "bm25.sqlite")) if settings.HYBRID_SEARCH_ENABLED else None,
+        batch_size=args.batch_size or 4096,
+    )
+
+
+if __name__ == "__main__":
+    main()
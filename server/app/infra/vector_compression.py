@@ -0,0 +1,363 @@
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from app.infra.vector_index import collection_space, cosine_to_distance
+
+
+COMPRESSION_MODES = {"none", "truncate", "pca"}
+# PCA is fitted once the archive holds this many vectors per stored dimension.
+PCA_FIT_SAMPLES_PER_DIM = 4
+PCA_FIT_MAX_SAMPLES = 20000
+
+_pca_fit_lock = threading.Lock()
+
+
+def _normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return (vectors / np.clip(norms, 1e-12, None)).astype(np.float32)
+
+
+class VectorProjector(ABC):
+    """Maps full embeddings to a lower-dimensional, L2-normalized space."""
+
+    def __init__(self, dim: int) -> None:
+        self.dim = dim
+
+    @property
+    def is_fitted(self) -> bool:
+        return True
+
+    def fit(self, vectors: np.ndarray) -> None:
+        """Learn the projection from sample vectors (no-op for fixed projections)."""
+
+    @abstractmethod
+    def project(self, vectors: np.ndarray) -> np.ndarray:
+        pass
+
+
+class TruncationProjector(VectorProjector):
+    """Keep the first `dim` components and re-normalize."""
+
+    def project(self, vectors: np.ndarray) -> np.ndarray:
+        return _normalize_rows(np.asarray(vectors, dtype=np.float32)[:, :self.dim])
+
+
+class PCAProjector(VectorProjector):
+    """Project onto the top `dim` principal components of a sample and re-normalize."""
+
+    def __init__(self, dim: int) -> None:
+        super().__init__(dim)
+        self.mean: Optional[np.ndarray] = None
+        self.components: Optional[np.ndarray] = None
+
+    @property
+    def is_fitted(self) -> bool:
+        return self.components is not None
+
+    def fit(self, vectors: np.ndarray) -> None:
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if vectors.shape[0] < self.dim:
+            raise ValueError(
+                f"PCA projection to {self.dim} dimensions needs at least {self.dim} vectors "
+                f"to fit, got {vectors.shape[0]}. Index a larger document first or use "
+                f"VECTOR_COMPRESSION=truncate."
+            )
+        self.mean = vectors.mean(axis=0)
+        _, _, vt = np.linalg.svd(vectors - self.mean, full_matrices=False)
+        self.components = np.ascontiguousarray(vt[:self.dim], dtype=np.float32)
+
+    def project(self, vectors: np.ndarray) -> np.ndarray:
+        if not self.is_fitted:
+            raise RuntimeError("PCA projector has not been fitted")
+        vectors = np.asarray(vectors, dtype=np.float32)
+        return _normalize_rows((vectors - self.mean) @ self.components.T)
+
+    def save(self, path: Path) -> None:
+        np.savez(path, mean=self.mean, components=self.components)
+
+    @classmethod
+    def load(cls, path: Path) -> "PCAProjector":
+        data = np.load(path)
+        projector = cls(int(data["components"].shape[0]))
+        projector.mean = data["mean"]
+        projector.components = data["components"]
+        return projector
+
+
+class FullVectorStore:
+    """SQLite sidecar holding full-precision float32 vectors by chunk id, used for re-scoring."""
+
+    _LOOKUP_BATCH = 500
+
+    def __init__(self, path: str) -> None:
+        self._path = Path(path)
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self._path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS full_vectors (id TEXT PRIMARY KEY, vector BLOB NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS projections (collection TEXT PRIMARY KEY, projection TEXT NOT NULL)"
+        )
+        self._conn.commit()
+
+    def count(self) -> int:
+        with self._lock:
+            (value,) = self._conn.execute("SELECT COUNT(*) FROM full_vectors").fetchone()
+            return int(value)
+
+    def sample(self, limit: int) -> np.ndarray:
+        """Return up to `limit` stored vectors chosen at random."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT vector FROM full_vectors ORDER BY RANDOM() LIMIT ?", (int(limit),)
+            ).fetchall()
+        return np.vstack([np.frombuffer(blob, dtype=np.float32) for (blob,) in rows]) if rows else np.zeros((0, 0), np.float32)
+
+    def projection_of(self, collection: str) -> Optional[str]:
+        """Return the projection the collection's stored vectors were written with, if recorded."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT projection FROM projections WHERE collection = ?", (collection,)
+            ).fetchone()
+            return row[0] if row else None
+
+    def set_projection(self, collection: str, projection: str) -> None:
+        with self._lock:
+            with self._conn:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO projections (collection, projection) VALUES (?, ?)",
+                    (collection, projection),
+                )
+
+    def put_many(self, ids: Sequence[str], vectors: np.ndarray) -> None:
+        vectors = np.asarray(vectors, dtype=np.float32)
+        rows = [(chunk_id, vectors[i].tobytes()) for i, chunk_id in enumerate(ids)]
+        with self._lock:
+            with self._conn:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO full_vectors (id, vector) VALUES (?, ?)", rows
+                )
+
+    def get_many(self, ids: Sequence[str]) -> Dict[str, np.ndarray]:
+        found: Dict[str, np.ndarray] = {}
+        ids = list(dict.fromkeys(ids))
+        with self._lock:
+            for start in range(0, len(ids), self._LOOKUP_BATCH):
+                batch = ids[start:start + self._LOOKUP_BATCH]
+                placeholders = ",".join("?" * len(batch))
+                rows = self._conn.execute(
+                    f"SELECT id, vector FROM full_vectors WHERE id IN ({placeholders})", batch
+                ).fetchall()
+                for chunk_id, blob in rows:
+                    found[chunk_id] = np.frombuffer(blob, dtype=np.float32)
+        return found
+
+    def delete_many(self, ids: Sequence[str]) -> None:
+        with self._lock:
+            with self._conn:
+                self._conn.executemany(
+                    "DELETE FROM full_vectors WHERE id = ?", [(chunk_id,) for chunk_id in ids]
+                )
+
+
+class CompressedCollection:
+    """
+    Chroma collection wrapper that stores projected (reduced-dimension) vectors
+    and re-scores the top candidates against full vectors kept on disk.
+
+    It exposes the subset of the Chroma collection API used by the vector store
+    functions, so it can be passed anywhere a collection is expected. Distances
+    are computed from the full vectors and reported in the wrapped collection's
+    space.
+
+    A PCA projection is only fitted once the full-vector store holds
+    `PCA_FIT_SAMPLES_PER_DIM * dim` vectors, on a random sample of them. Until
+    then vectors are stored truncated and every query re-scores all matching
+    chunks, so search stays exact. After the fit, each collection re-projects
+    its truncated backlog before its next read or write (shards share the
+    projector and the full-vector store).
+    """
+
+    def __init__(
+        self,
+        collection: Any,
+        projector: VectorProjector,
+        full_vectors: FullVectorStore,
+        rescore_factor: int = 4,
+        projector_path: Optional[Path] = None,
+    ) -> None:
+        self._collection = collection
+        self._projector = projector
+        self._full_vectors = full_vectors
+        self._rescore_factor = max(int(rescore_factor), 1)
+        self._projector_path = projector_path
+        self._fallback = TruncationProjector(projector.dim)
+        self._sync_lock = threading.Lock()
+        self._synced = False
+
+    @property
+    def name(self) -> str:
+        return self._collection.name
+
+    @property
+    def space(self) -> str:
+        return collection_space(self._collection)
+
+    @property
+    def metadata(self) -> Optional[Dict[str, Any]]:
+        return self._collection.metadata
+
+    def count(self) -> int:
+        return self._collection.count()
+
+    def _maybe_fit(self) -> None:
+        if self._projector.is_fitted:
+            return
+        min_samples = PCA_FIT_SAMPLES_PER_DIM * self._projector.dim
+        if self._full_vectors.count() < min_samples:
+            return
+        with _pca_fit_lock:
+            if self._projector.is_fitted:
+                return
+            self._projector.fit(self._full_vectors.sample(PCA_FIT_MAX_SAMPLES))
+            if self._projector_path is not None and isinstance(self._projector, PCAProjector):
+                self._projector.save(self._projector_path)
+            print(f"Fitted PCA projection to {self._projector.dim} dimensions")
+
+    def _is_projected(self) -> bool:
+        """Whether this collection's stored vectors use the fitted projection (re-projecting the backlog if needed)."""
+        if self._synced:
+            return True
+        if not self._projector.is_fitted:
+            return False
+        with self._sync_lock:
+            if self._synced:
+                return True
+            if self._full_vectors.projection_of(self.name) == "truncate":
+                self._reproject_backlog()
+            self._synced = True
+            return True
+
+    def _reproject_backlog(self, batch_size: int = 1000) -> None:
+        offset = 0
+        while True:
+            ids = self._collection.get(include=[], limit=batch_size, offset=offset).get("ids") or []
+            if not ids:
+                break
+            full = self._full_vectors.get_many(ids)
+            present = [chunk_id for chunk_id in ids if chunk_id in full]
+            if present:
+                self._collection.update(
+                    ids=present,
+                    embeddings=self._projector.project(np.vstack([full[chunk_id] for chunk_id in present])),
+                )
+            offset += len(ids)
+        self._full_vectors.set_projection(self.name, "pca")
+        print(f"Re-projected {offset} stored vectors of collection '{self.name}'")
+
+    def add(self, ids, embeddings, documents=None, metadatas=None) -> None:
+        self._write(self._collection.add, ids, embeddings, documents, metadatas)
+
+    def upsert(self, ids, embeddings, documents=None, metadatas=None) -> None:
+        self._write(self._collection.upsert, ids, embeddings, documents, metadatas)
+
+    def _write(self, write, ids, embeddings, documents, metadatas) -> None:
+        embeddings = np.asarray(embeddings, dtype=np.float32)
+        self._full_vectors.put_many(ids, embeddings)
+        self._maybe_fit()
+        if not self._is_projected():
+            # Held so a concurrent fit re-projects this batch only after it has landed.
+            with self._sync_lock:
+                if not self._projector.is_fitted:
+                    self._full_vectors.set_projection(self.name, "truncate")
+                    write(ids=ids, embeddings=self._fallback.project(embeddings), documents=documents, metadatas=metadatas)
+                    return
+            self._is_projected()
+        write(ids=ids, embeddings=self._projector.project(embeddings), documents=documents, metadatas=metadatas)
+
+    def get(self, *args, **kwargs) -> Dict[str, Any]:
+        """Chroma `get`; requested embeddings are the full vectors, not the stored projections."""
+        results = self._collection.get(*args, **kwargs)
+        if "embeddings" in (kwargs.get("include") or []) and results.get("ids"):
+            full = self._full_vectors.get_many(results["ids"])
+            results["embeddings"] = [
+                full[chunk_id] if chunk_id in full else stored
+                for chunk_id, stored in zip(results["ids"], results["embeddings"])
+            ]
+        return results
+
+    def delete(self, ids=None, where=None) -> None:
+        if ids is None and where is not None:
+            ids = self._collection.get(where=where, include=[]).get("ids") or []
+        if ids:
+            self._collection.delete(ids=ids)
+            self._full_vectors.delete_many(ids)
+
+    def query(self, query_embeddings, n_results: int = 10, where=None, include=None) -> Dict[str, Any]:
+        queries = np.atleast_2d(np.asarray(query_embeddings, dtype=np.float32))
+        include = list(include or ["documents", "metadatas", "distances"])
+        inner_include = [field for field in include if field != "distances"]
+        if self._is_projected():
+            projected, n_candidates = self._projector.project(queries), n_results * self._rescore_factor
+        else:
+            # Too few vectors to fit PCA yet: re-score every stored chunk, which keeps search exact.
+            projected, n_candidates = self._fallback.project(queries), max(n_results, self._collection.count())
+        candidates = self._collection.query(
+            query_embeddings=projected,
+            n_results=max(n_candidates, 1),
+            where=where,
+            include=inner_include,
+        )
+
+        space = self.space
+        merged: Dict[str, List[Any]] = {"ids": []}
+        for field in include:
+            merged[field] = []
+
+        for q_idx, query in enumerate(queries):
+            candidate_ids = candidates["ids"][q_idx]
+            full = self._full_vectors.get_many(candidate_ids)
+            scored = []
+            for c_idx, chunk_id in enumerate(candidate_ids):
+                vector = full.get(chunk_id)
+                if vector is not None:
+                    scored.append((cosine_to_distance(float(np.dot(query, vector)), space), c_idx))
+            scored.sort()
+            top = scored[:n_results]
+
+            merged["ids"].append([candidate_ids[c_idx] for _, c_idx in top])
+            for field in include:
+                if field == "distances":
+                    merged[field].append([distance for distance, _ in top])
+                elif candidates.get(field) is not None:
+                    merged[field].append([candidates[field][q_idx][c_idx] for _, c_idx in top])
+        return merged
+
+
+def build_projector(mode: str, dim: int, projector_path: Optional[Path] = None) -> VectorProjector:
+    """Create the projector for a compression mode, loading a saved PCA fit when present."""
+    mode = mode.lower()
+    if mode not in COMPRESSION_MODES - {"none"}:
+        raise ValueError(
+            f"Unsupported vector compression: {mode}. "
+            f"Supported modes: {', '.join(sorted(COMPRESSION_MODES))}"
+        )
+    if mode == "truncate":
+        return TruncationProjector(dim)
+    if projector_path is not None and projector_path.exists():
+        projector = PCAProjector.load(projector_path)
+        if projector.dim != dim:
+            raise ValueError(
+                f"Saved PCA projection at {projector_path} has {projector.dim} dimensions "
+                f"but VECTOR_STORAGE_DIM is {dim}. Re-index into a fresh VECTOR_DB_PATH to change it."
+            )
+        return projector
+    return PCAProjector(dim)
@@ -0,0 +1,799 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Protocol, Sequence, Tuple, runtime_checkable
+
+import numpy as np
+
+from app.infra.metrics import metrics
+
+try:
+    import hnswlib
+
+    HNSWLIB_SUPPORT = True
+except ImportError:
+    HNSWLIB_SUPPORT = False
+
+
+VECTOR_INDEX_BACKENDS = {"chroma", "matrix"}
+MATRIX_SEARCH_MODES = {"exact", "hnsw"}
+DISTANCE_SPACES = {"cosine", "l2", "ip"}
+
+
+def cosine_to_distance(cosine, space: str):
+    """
+    Express cosine similarity between normalized vectors as a distance in `space`.
+
+    Chroma's conventions: cosine = 1 - cos, ip = 1 - dot, l2 = squared L2 = 2 - 2 * cos.
+    """
+    if space == "l2":
+        return 2.0 - 2.0 * cosine
+    return 1.0 - cosine
+
+
+def distance_to_similarity(distance: float, space: str) -> float:
+    """Convert a distance in `space` back to cosine similarity, clipped to [0, 1]."""
+    cosine = 1.0 - float(distance) / 2.0 if space == "l2" else 1.0 - float(distance)
+    return max(0.0, min(1.0, cosine))
+
+
+def collection_space(collection: Any) -> str:
+    """Distance space of a Chroma collection; collections created without metadata use l2."""
+    return (getattr(collection, "metadata", None) or {}).get("hnsw:space", "l2")
+
+
+@runtime_checkable
+class VectorIndex(Protocol):
+    """
+    The vector store operations used by the application.
+
+    Results follow Chroma's shapes: `get` returns flat lists keyed by field and
+    `query` returns one list per query embedding. Distances are expressed in
+    the index's `space` (see `cosine_to_distance`).
+    """
+
+    @property
+    def name(self) -> str: ...
+
+    @property
+    def space(self) -> str: ...
+
+    def count(self) -> int: ...
+
+    def add(self, ids, embeddings, documents=None, metadatas=None) -> None: ...
+
+    def upsert(self, ids, embeddings, documents=None, metadatas=None) -> None: ...
+
+    def get(self, ids=None, where=None, include=None) -> Dict[str, Any]: ...
+
+    def delete(self, ids=None, where=None) -> None: ...
+
+    def query(self, query_embeddings, n_results: int = 10, where=None, include=None) -> Dict[str, Any]: ...
+
+    def stats(self) -> Dict[str, Any]: ...
+
+    def flush(self) -> None: ...
+
+
+class ChromaIndex:
+    """VectorIndex backed by a Chroma collection (or a CompressedCollection wrapping one)."""
+
+    def __init__(self, collection: Any) -> None:
+        self._collection = collection
+
+    @property
+    def name(self) -> str:
+        return self._collection.name
+
+    @property
+    def space(self) -> str:
+        return getattr(self._collection, "space", None) or collection_space(self._collection)
+
+    def count(self) -> int:
+        return self._collection.count()
+
+    def add(self, ids, embeddings, documents=None, metadatas=None) -> None:
+        self._collection.add(ids=ids, embeddings=embeddings, documents=documents, metadatas=metadatas)
+
+    def upsert(self, ids, embeddings, documents=None, metadatas=None) -> None:
+        self._collection.upsert(ids=ids, embeddings=embeddings, documents=documents, metadatas=metadatas)
+
+    def get(self, *args, **kwargs) -> Dict[str, Any]:
+        return self._collection.get(*args, **kwargs)
+
+    def delete(self, ids=None, where=None) -> None:
+        self._collection.delete(ids=ids, where=where)
+
+    def query(self, query_embeddings, n_results: int = 10, where=None, include=None) -> Dict[str, Any]:
+        kwargs: Dict[str, Any] = {"query_embeddings": query_embeddings, "n_results": n_results, "where": where}
+        if include is not None:
+            kwargs["include"] = include
+        return self._collection.query(**kwargs)
+
+    def flush(self) -> None:
+        """Chroma persists every write itself."""
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "backend": "chroma",
+            "collection": self.name,
+            "count": self.count(),
+            "hnsw": {
+                key: value
+                for key, value in (getattr(self._collection, "metadata", None) or {}).items()
+                if key.startswith("hnsw:")
+            },
+        }
+
+
+class MatrixIndex:
+    """
+    In-process VectorIndex over a memory-mapped float32 matrix.
+
+    Row i of `vectors.f32` holds one chunk's embedding; IDs, documents and
+    metadata live in a SQLite sidecar keyed by row. Queries are exact matrix
+    products over the live rows, or go through an hnswlib graph (inner-product
+    space) when `search="hnsw"`. Vectors are expected to be L2-normalized, as
+    produced by the embedding backends; distances are reported in `space`.
+
+    Every worker process maps the same file, so they share the OS page cache.
+    A generation counter in the sidecar lets readers in other processes notice
+    writes and remap; writes should come from one process at a time.
+
+    The hnsw graph is updated in memory on every write and saved by `flush`,
+    which callers run once per ingestion run or delete. The saved file is
+    tagged with the generation it reflects. A process that remaps onto a
+    newer generation than the saved graph searches exactly until the graph
+    is flushed again.
+    """
+
+    _VECTORS_FILE = "vectors.f32"
+    _RECORDS_FILE = "records.sqlite"
+    _GRAPH_FILE = "hnsw.bin"
+    _INITIAL_CAPACITY = 1024
+    _LOOKUP_BATCH = 500
+    # Filtered queries gather candidate rows only when the prefix is at least this many times larger.
+    _GATHER_RATIO = 8
+
+    def __init__(
+        self,
+        path: str,
+        name: str = "documents",
+        search: str = "exact",
+        space: str = "cosine",
+        hnsw_m: int = 16,
+        hnsw_ef_construction: int = 200,
+        hnsw_ef_search: int = 64,
+    ) -> None:
+        search = search.lower()
+        if search not in MATRIX_SEARCH_MODES:
+            raise ValueError(
+                f"Unsupported matrix index search: {search}. "
+                f"Supported modes: {', '.join(sorted(MATRIX_SEARCH_MODES))}"
+            )
+        if space not in DISTANCE_SPACES:
+            raise ValueError(
+                f"Unsupported distance space: {space}. Supported spaces: {', '.join(sorted(DISTANCE_SPACES))}"
+            )
+        if search == "hnsw" and not HNSWLIB_SUPPORT:
+            raise ImportError(
+                "hnswlib is required for MATRIX_INDEX_SEARCH=hnsw. Install it with `pip install hnswlib`."
+            )
+
+        self._dir = Path(path)
+        self._dir.mkdir(parents=True, exist_ok=True)
+        self._name = name
+        self._search = search
+        self._space = space
+        self._hnsw_m = hnsw_m
+        self._hnsw_ef_construction = hnsw_ef_construction
+        self._hnsw_ef_search = hnsw_ef_search
+        self._lock = threading.RLock()
+
+        self._conn = sqlite3.connect(str(self._dir / self._RECORDS_FILE), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        with self._conn:
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS records (
+                    row INTEGER PRIMARY KEY,
+                    id TEXT NOT NULL UNIQUE,
+                    source TEXT,
+                    document TEXT,
+                    metadata TEXT NOT NULL
+                )
+                """
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS records_source ON records (source)")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS index_meta (key TEXT PRIMARY KEY, value INTEGER NOT NULL)"
+            )
+            self._conn.execute("INSERT OR IGNORE INTO index_meta (key, value) VALUES ('generation', 0)")
+
+        self._dim: Optional[int] = None
+        self._matrix: Optional[np.memmap] = None
+        self._live = np.zeros(0, dtype=bool)
+        self._high_water = 0
+        self._free_rows: List[int] = []
+        self._graph = None
+        self._graph_dirty = False
+        self._generation = -1
+        self._load()
+
+    # -- state -----------------------------------------------------------------
+
+    def _meta(self, key: str) -> Optional[int]:
+        row = self._conn.execute("SELECT value FROM index_meta WHERE key = ?", (key,)).fetchone()
+        return int(row[0]) if row else None
+
+    def _load(self) -> None:
+        """(Re)map the matrix and rebuild the live-row mask from the sidecar."""
+        initial = self._generation < 0
+        self._generation = self._meta("generation") or 0
+        self._dim = self._meta("dim")
+        self._matrix = None
+        self._graph = None
+        self._graph_dirty = False
+        if self._dim is None:
+            self._live = np.zeros(0, dtype=bool)
+            self._high_water = 0
+            self._free_rows = []
+            return
+
+        vectors_path = self._dir / self._VECTORS_FILE
+        capacity = vectors_path.stat().st_size // (4 * self._dim) if vectors_path.exists() else 0
+        if capacity:
+            self._matrix = np.memmap(vectors_path, dtype=np.float32, mode="r+", shape=(capacity, self._dim))
+
+        rows = np.array([r for (r,) in self._conn.execute("SELECT row FROM records")], dtype=np.int64)
+        self._live = np.zeros(capacity, dtype=bool)
+        self._live[rows] = True
+        self._high_water = int(rows.max()) + 1 if rows.size else 0
+        self._free_rows = np.flatnonzero(~self._live[:self._high_water]).tolist()
+
+        if self._search == "hnsw" and capacity:
+            graph_path = self._dir / self._GRAPH_FILE
+            if graph_path.exists() and self._meta("graph_generation") == self._generation:
+                graph = hnswlib.Index(space="ip", dim=self._dim)
+                graph.load_index(str(graph_path), max_elements=capacity)
+                graph.set_ef(self._hnsw_ef_search)
+                self._graph = graph
+            elif initial:
+                # No graph saved for this generation (first start, or a writer exited before flushing).
+                self._build_graph()
+
+    def _build_graph(self) -> None:
+        """Build the hnsw graph from the live rows of the matrix."""
+        capacity = self._live.shape[0]
+        rows = np.flatnonzero(self._live)
+        graph = hnswlib.Index(space="ip", dim=self._dim)
+        graph.init_index(max_elements=capacity, M=self._hnsw_m, ef_construction=self._hnsw_ef_construction)
+        if rows.size:
+            graph.add_items(np.asarray(self._matrix[rows]), rows)
+        graph.set_ef(self._hnsw_ef_search)
+        self._graph = graph
+        self._graph_dirty = True
+
+    def _ensure_graph(self) -> None:
+        """Writers need a current graph to update; rebuild it if this process remapped past the saved one."""
+        if self._search == "hnsw" and self._graph is None and self._live.shape[0]:
+            self._build_graph()
+
+    def _refresh(self) -> None:
+        """Remap if another process has written since this one last loaded."""
+        if self._meta("generation") != self._generation:
+            self._load()
+
+    def _commit_generation(self) -> None:
+        self._conn.execute("UPDATE index_meta SET value = value + 1 WHERE key = 'generation'")
+        self._generation += 1
+
+    def _ensure_capacity(self, needed: int) -> None:
+        capacity = self._live.shape[0]
+        if needed <= capacity:
+            return
+        new_capacity = max(needed, capacity * 2, self._INITIAL_CAPACITY)
+        if self._matrix is not None:
+            self._matrix.flush()
+            self._matrix = None
+        vectors_path = self._dir / self._VECTORS_FILE
+        with open(vectors_path, "ab") as handle:
+            handle.truncate(new_capacity * self._dim * 4)
+        self._matrix = np.memmap(vectors_path, dtype=np.float32, mode="r+", shape=(new_capacity, self._dim))
+        self._live = np.concatenate([self._live, np.zeros(new_capacity - capacity, dtype=bool)])
+
+        if self._search == "hnsw":
+            if self._graph is None:
+                self._graph = hnswlib.Index(space="ip", dim=self._dim)
+                self._graph.init_index(
+                    max_elements=new_capacity, M=self._hnsw_m, ef_construction=self._hnsw_ef_construction
+                )
+                self._graph.set_ef(self._hnsw_ef_search)
+            else:
+                self._graph.resize_index(new_capacity)
+
+    def flush(self) -> None:
+        """
+        Save the hnsw graph if writes changed it since it was last saved.
+
+        The graph is written to a temporary file and moved into place with
+        `os.replace`, then tagged with its generation in the same sidecar
+        transaction. The transaction's write lock serializes flushes from
+        several processes. A graph that misses another process's writes is not
+        published.
+        """
+        with self._lock:
+            if self._graph is None or not self._graph_dirty:
+                return
+            graph_path = self._dir / self._GRAPH_FILE
+            temp_path = graph_path.with_name(f"{graph_path.name}.{os.getpid()}.tmp")
+            self._graph.save_index(str(temp_path))
+            try:
+                self._conn.execute("BEGIN IMMEDIATE")
+                try:
+                    if self._meta("generation") == self._generation:
+                        os.replace(temp_path, graph_path)
+                        self._conn.execute(
+                            "INSERT OR REPLACE INTO index_meta (key, value) VALUES ('graph_generation', ?)",
+                            (self._generation,),
+                        )
+                    self._conn.commit()
+                except BaseException:
+                    self._conn.rollback()
+                    raise
+            finally:
+                temp_path.unlink(missing_ok=True)
+            self._graph_dirty = False
+
+    # -- filters and record lookups ----------------------------------------------
+
+    @staticmethod
+    def _where_sql(where: Dict[str, Any]) -> Tuple[str, List[Any]]:
+        """Translate a Chroma-style equality filter (optionally under `$and`) to SQL."""
+        clauses: List[str] = []
+        params: List[Any] = []
+        for key, value in where.items():
+            if key == "$and":
+                for condition in value:
+                    clause, condition_params = MatrixIndex._where_sql(condition)
+                    clauses.append(clause)
+                    params.extend(condition_params)
+                continue
+            if isinstance(value, dict):
+                if set(value) != {"$eq"}:
+                    raise ValueError(f"Unsupported where filter for the matrix index: {where}")
+                value = value["$eq"]
+            if key == "source":
+                clauses.append("source = ?")
+                params.append(value)
+            else:
+                clauses.append("json_extract(metadata, ?) = ?")
+                params.extend([f"$.{key}", value])
+        return " AND ".join(clauses) or "1", params
+
+    def _select(self, columns: str, ids=None, where=None, limit=None, offset=None) -> List[Tuple[Any, ...]]:
+        conditions: List[str] = []
+        params: List[Any] = []
+        if where:
+            clause, params = self._where_sql(where)
+            conditions.append(clause)
+        if ids is None:
+            sql = f"SELECT {columns} FROM records"
+            if conditions:
+                sql += " WHERE " + " AND ".join(conditions)
+            sql += " ORDER BY row"
+            if limit is not None or offset:
+                # Paging is pushed down so page-by-page scans stay linear in the page size.
+                sql += " LIMIT ? OFFSET ?"
+                params = [*params, -1 if limit is None else int(limit), int(offset or 0)]
+            return self._conn.execute(sql, params).fetchall()
+
+        found: List[Tuple[Any, ...]] = []
+        ids = list(dict.fromkeys(ids))
+        for start in range(0, len(ids), self._LOOKUP_BATCH):
+            batch = ids[start:start + self._LOOKUP_BATCH]
+            placeholders = ",".join("?" * len(batch))
+            sql = f"SELECT {columns} FROM records WHERE " + " AND ".join(
+                [f"id IN ({placeholders})", *conditions]
+            )
+            found.extend(self._conn.execute(sql + " ORDER BY row", [*batch, *params]).fetchall())
+        return found
+
+    def _records_by_row(self, rows: Sequence[int]) -> Dict[int, Tuple[str, Optional[str], str]]:
+        found: Dict[int, Tuple[str, Optional[str], str]] = {}
+        rows = list(dict.fromkeys(int(r) for r in rows))
+        for start in range(0, len(rows), self._LOOKUP_BATCH):
+            batch = rows[start:start + self._LOOKUP_BATCH]
+            placeholders = ",".join("?" * len(batch))
+            for row, chunk_id, document, metadata in self._conn.execute(
+                f"SELECT row, id, document, metadata FROM records WHERE row IN ({placeholders})", batch
+            ):
+                found[row] = (chunk_id, document, metadata)
+        return found
+
+    # -- VectorIndex -----------------------------------------------------------------
+
+    @property
+    def name(self) -> str:
+        return self._name
+
+    @property
+    def space(self) -> str:
+        return self._space
+
+    def count(self) -> int:
+        with self._lock:
+            self._refresh()
+            return int(self._live.sum())
+
+    def add(self, ids, embeddings, documents=None, metadatas=None) -> None:
+        self._write(ids, embeddings, documents, metadatas, replace=False)
+
+    def upsert(self, ids, embeddings, documents=None, metadatas=None) -> None:
+        self._write(ids, embeddings, documents, metadatas, replace=True)
+
+    def _write(self, ids, embeddings, documents, metadatas, replace: bool) -> None:
+        ids = list(ids)
+        if not ids:
+            return
+        embeddings = np.atleast_2d(np.asarray(embeddings, dtype=np.float32))
+        documents = list(documents) if documents is not None else [None] * len(ids)
+        metadatas = [md or {} for md in metadatas] if metadatas is not None else [{}] * len(ids)
+
+        with self._lock:
+            self._refresh()
+            if self._dim is None:
+                self._dim = int(embeddings.shape[1])
+                with self._conn:
+                    self._conn.execute("INSERT INTO index_meta (key, value) VALUES ('dim', ?)", (self._dim,))
+            elif embeddings.shape[1] != self._dim:
+                raise ValueError(
+                    f"Embedding dimension {embeddings.shape[1]} does not match the index dimension {self._dim}"
+                )
+
+            existing = {chunk_id: row for row, chunk_id in self._select("row, id", ids=ids)}
+            keep = [i for i, chunk_id in enumerate(ids) if replace or chunk_id not in existing]
+            if not keep:
+                return
+
+            self._ensure_graph()
+            rows: List[int] = []
+            for i in keep:
+                row = existing.get(ids[i])
+                if row is None:
+                    if self._free_rows:
+                        row = self._free_rows.pop()
+                    else:
+                        row = self._high_water
+                        self._high_water += 1
+                    existing[ids[i]] = row
+                rows.append(row)
+
+            self._ensure_capacity(self._high_water)
+            vectors = embeddings[keep]
+            self._matrix[rows] = vectors
+            self._matrix.flush()
+
+            with self._conn:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO records (row, id, source, document, metadata) VALUES (?, ?, ?, ?, ?)",
+                    [
+                        (row, ids[i], metadatas[i].get("source"), documents[i], json.dumps(metadatas[i]))
+                        for row, i in zip(rows, keep)
+                    ],
+                )
+                self._commit_generation()
+            self._live[rows] = True
+
+            if self._graph is not None:
+                self._graph.add_items(vectors, np.asarray(rows, dtype=np.int64))
+                self._graph_dirty = True
+
+    def get(self, ids=None, where=None, include=None, limit=None, offset=None) -> Dict[str, Any]:
+        include = list(include if include is not None else ["metadatas", "documents"])
+        with self._lock:
+            self._refresh()
+            if ids is None:
+                records = self._select("row, id, document, metadata", where=where, limit=limit, offset=offset)
+            else:
+                records = self._select("row, id, document, metadata", ids=ids, where=where)
+                if offset:
+                    records = records[offset:]
+                if limit is not None:
+                    records = records[:limit]
+
+            result: Dict[str, Any] = {"ids": [chunk_id for _, chunk_id, _, _ in records]}
+            if "documents" in include:
+                result["documents"] = [document for _, _, document, _ in records]
+            if "metadatas" in include:
+                result["metadatas"] = [json.loads(metadata) for _, _, _, metadata in records]
+            if "embeddings" in include:
+                rows = [row for row, _, _, _ in records]
+                result["embeddings"] = np.array(self._matrix[rows]) if rows else np.zeros((0, self._dim or 0), dtype=np.float32)
+            return result
+
+    def delete(self, ids=None, where=None) -> None:
+        if ids is None and where is None:
+            return
+        with self._lock:
+            self._refresh()
+            rows = [row for (row,) in self._select("row", ids=ids, where=where)]
+            if not rows:
+                return
+            self._ensure_graph()
+            with self._conn:
+                self._conn.executemany("DELETE FROM records WHERE row = ?", [(row,) for row in rows])
+                self._commit_generation()
+            self._live[rows] = False
+            self._free_rows.extend(rows)
+
+            if self._graph is not None:
+                for row in rows:
+                    self._graph.mark_deleted(row)
+                self._graph_dirty = True
+
+    def query(self, query_embeddings, n_results: int = 10, where=None, include=None) -> Dict[str, Any]:
+        queries = np.atleast_2d(np.asarray(query_embeddings, dtype=np.float32))
+        include = list(include or ["documents", "metadatas", "distances"])
+
+        with self._lock:
+            self._refresh()
+            if where:
+                candidates = np.array([row for (row,) in self._select("row", where=where)], dtype=np.int64)
+                top_rows, top_scores = self._exact_top_k(queries, n_results, candidates)
+            elif self._graph is not None and self._live.any():
+                k = min(n_results, int(self._live.sum()))
+                labels, distances = self._graph.knn_query(queries, k=k)
+                top_rows, top_scores = labels.astype(np.int64), 1.0 - distances
+            else:
+                top_rows, top_scores = self._exact_top_k(queries, n_results)
+            records = self._records_by_row(top_rows.ravel())
+            vectors = (
+                {int(row): np.array(self._matrix[int(row)]) for row in top_rows.ravel()}
+                if "embeddings" in include
+                else {}
+            )
+
+        result: Dict[str, Any] = {"ids": []}
+        for field in include:
+            result[field] = []
+        for q_idx in range(queries.shape[0]):
+            hit_rows = [int(row) for row in top_rows[q_idx] if int(row) in records]
+            hits = [
+                (records[int(row)], float(score))
+                for row, score in zip(top_rows[q_idx], top_scores[q_idx])
+                if int(row) in records
+            ]
+            result["ids"].append([chunk_id for (chunk_id, _, _), _ in hits])
+            if "documents" in include:
+                result["documents"].append([document for (_, document, _), _ in hits])
+            if "metadatas" in include:
+                result["metadatas"].append([json.loads(metadata) for (_, _, metadata), _ in hits])
+            if "distances" in include:
+                result["distances"].append([cosine_to_distance(score, self._space) for _, score in hits])
+            if "embeddings" in include:
+                result["embeddings"].append([vectors[row] for row in hit_rows])
+        return result
+
+    def _exact_top_k(
+        self,
+        queries: np.ndarray,
+        n_results: int,
+        candidates: Optional[np.ndarray] = None,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Score rows with one matrix product and keep the best `n_results` per query.
+
+        The mapped prefix below the high-water mark is scored in place, and rows
+        outside `candidates` (the live rows by default) are masked to -inf.
+        Only a filtered candidate set much smaller than the prefix is gathered,
+        since gathering rows copies them.
+        """
+        if candidates is not None and candidates.size * self._GATHER_RATIO <= self._high_water:
+            if candidates.size == 0:
+                empty = np.zeros((queries.shape[0], 0))
+                return empty.astype(np.int64), empty
+            return self._best(queries @ self._matrix[candidates].T, n_results, candidates.size, candidates)
+
+        if candidates is None:
+            mask = self._live[:self._high_water]
+        else:
+            mask = np.zeros(self._high_water, dtype=bool)
+            mask[candidates] = True
+        valid = int(mask.sum())
+        if valid == 0:
+            empty = np.zeros((queries.shape[0], 0))
+            return empty.astype(np.int64), empty
+        scores = queries @ self._matrix[:self._high_water].T
+        if valid < self._high_water:
+            scores[:, ~mask] = -np.inf
+        return self._best(scores, n_results, valid, None)
+
+    @staticmethod
+    def _best(
+        scores: np.ndarray,
+        n_results: int,
+        valid: int,
+        rows: Optional[np.ndarray],
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Top `n_results` columns of `scores` per query, mapped to matrix rows (`rows`, or the column index)."""
+        k = min(n_results, valid)
+        if k < scores.shape[1]:
+            part = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        else:
+            part = np.tile(np.arange(scores.shape[1]), (scores.shape[0], 1))
+        part_scores = np.take_along_axis(scores, part, axis=1)
+        order = np.argsort(-part_scores, axis=1)
+        best = np.take_along_axis(part, order, axis=1)
+        return (rows[best] if rows is not None else best.astype(np.int64)), np.take_along_axis(part_scores, order, axis=1)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            self._refresh()
+            capacity = int(self._live.shape[0])
+            return {
+                "backend": "matrix",
+                "search": self._search,
+                "space": self._space,
+                "collection": self._name,
+                "count": int(self._live.sum()),
+                "dim": self._dim,
+                "capacity_rows": capacity,
+                "free_rows": len(self._free_rows),
+                "matrix_bytes": capacity * (self._dim or 0) * 4,
+                "generation": self._generation,
+            }
+
+
+def shard_for(value: Any, num_shards: int) -> int:
+    """Stable shard number for a routing value (e.g. a document's source)."""
+    digest = hashlib.sha1(str(value if value is not None else "").encode("utf-8")).hexdigest()
+    return int(digest[:8], 16) % num_shards
+
+
+class ShardedIndex:
+    """
+    VectorIndex spread over N child indexes.
+
+    Chunks are routed by a stable hash of one metadata field (`routing_key`,
+    the document source by default), so all chunks of a document live in one
+    shard. Filters on the routing key go to that shard only; other reads and
+    queries fan out to every shard concurrently, and per-query top-k lists are
+    merged by distance. Each shard's query latency is recorded separately.
+    """
+
+    def __init__(self, shards: Sequence[Any], routing_key: str = "source") -> None:
+        if not shards:
+            raise ValueError("ShardedIndex needs at least one shard")
+        self._shards = list(shards)
+        self._routing_key = routing_key
+        self._executor = ThreadPoolExecutor(max_workers=len(self._shards), thread_name_prefix="vector-shard")
+        self._latency = [
+            metrics.histogram(f"vector_shard_{idx}_query_latency_ms") for idx in range(len(self._shards))
+        ]
+
+    @property
+    def name(self) -> str:
+        return self._shards[0].name
+
+    @property
+    def space(self) -> str:
+        return self._shards[0].space
+
+    @property
+    def shards(self) -> List[Any]:
+        return list(self._shards)
+
+    def _routed_shards(self, where: Optional[Dict[str, Any]]) -> List[int]:
+        """Shards that can hold matches for `where`: one if it pins the routing key, otherwise all."""
+        value = (where or {}).get(self._routing_key)
+        if isinstance(value, dict) and set(value) == {"$eq"}:
+            value = value["$eq"]
+        if value is None or isinstance(value, dict):
+            return list(range(len(self._shards)))
+        return [shard_for(value, len(self._shards))]
+
+    def _fan_out(self, shard_indexes: Sequence[int], call) -> List[Any]:
+        if len(shard_indexes) == 1:
+            return [call(shard_indexes[0])]
+        return list(self._executor.map(call, shard_indexes))
+
+    def count(self) -> int:
+        return sum(self._fan_out(range(len(self._shards)), lambda idx: self._shards[idx].count()))
+
+    def add(self, ids, embeddings, documents=None, metadatas=None) -> None:
+        self._write("add", ids, embeddings, documents, metadatas)
+
+    def upsert(self, ids, embeddings, documents=None, metadatas=None) -> None:
+        self._write("upsert", ids, embeddings, documents, metadatas)
+
+    def _write(self, method: str, ids, embeddings, documents, metadatas) -> None:
+        ids = list(ids)
+        embeddings = np.atleast_2d(np.asarray(embeddings, dtype=np.float32))
+        metadatas = list(metadatas) if metadatas is not None else [{}] * len(ids)
+        groups: Dict[int, List[int]] = {}
+        for position, metadata in enumerate(metadatas):
+            shard = shard_for((metadata or {}).get(self._routing_key), len(self._shards))
+            groups.setdefault(shard, []).append(position)
+
+        for shard, positions in groups.items():
+            getattr(self._shards[shard], method)(
+                ids=[ids[p] for p in positions],
+                embeddings=embeddings[positions],
+                documents=[documents[p] for p in positions] if documents is not None else None,
+                metadatas=[metadatas[p] for p in positions],
+            )
+
+    def get(self, ids=None, where=None, include=None, limit=None, offset=None) -> Dict[str, Any]:
+        kwargs: Dict[str, Any] = {"ids": ids, "where": where}
+        if include is not None:
+            kwargs["include"] = include
+        pages = self._fan_out(self._routed_shards(where), lambda idx: self._shards[idx].get(**kwargs))
+
+        fields = ["ids", *(include if include is not None else ["metadatas", "documents"])]
+        merged: Dict[str, Any] = {field: [] for field in fields}
+        for page in pages:
+            for field in fields:
+                if page.get(field) is not None:
+                    merged[field].extend(list(page[field]))
+        if offset or limit is not None:
+            end = (offset or 0) + limit if limit is not None else None
+            merged = {field: values[offset or 0:end] for field, values in merged.items()}
+        return merged
+
+    def delete(self, ids=None, where=None) -> None:
+        # Chunk IDs do not encode their shard, so deletes by ID go to every shard.
+        self._fan_out(self._routed_shards(where), lambda idx: self._shards[idx].delete(ids=ids, where=where))
+
+    def query(self, query_embeddings, n_results: int = 10, where=None, include=None) -> Dict[str, Any]:
+        queries = np.atleast_2d(np.asarray(query_embeddings, dtype=np.float32))
+        include = list(include or ["documents", "metadatas", "distances"])
+        shard_include = include if "distances" in include else [*include, "distances"]
+
+        def query_shard(idx: int) -> Dict[str, Any]:
+            started = time.perf_counter()
+            try:
+                return self._shards[idx].query(
+                    query_embeddings=queries, n_results=n_results, where=where, include=shard_include
+                )
+            finally:
+                self._latency[idx].observe((time.perf_counter() - started) * 1000.0)
+
+        results = self._fan_out(self._routed_shards(where), query_shard)
+
+        merged: Dict[str, Any] = {"ids": []}
+        for field in include:
+            merged[field] = []
+        for q_idx in range(queries.shape[0]):
+            candidates = [
+                (distance, r_idx, c_idx)
+                for r_idx, result in enumerate(results)
+                for c_idx, distance in enumerate(result["distances"][q_idx])
+            ]
+            candidates.sort()
+            top = candidates[:n_results]
+            merged["ids"].append([results[r]["ids"][q_idx][c] for _, r, c in top])
+            for field in include:
+                merged[field].append([results[r][field][q_idx][c] for _, r, c in top])
+        return merged
+
+    def flush(self) -> None:
+        self._fan_out(range(len(self._shards)), lambda idx: self._shards[idx].flush())
+
+    def stats(self) -> Dict[str, Any]:
+        shard_stats = self._fan_out(range(len(self._shards)), lambda idx: self._shards[idx].stats())
+        return {
+            "backend": "sharded",
+            "routing_key": self._routing_key,
+            "shard_count": len(self._shards),
+            "count": sum(int(s.get("count") or 0) for s in shard_stats),
+            "shards": [
+                {**stats, "query_latency_ms": self._latency[idx].snapshot()}
+                for idx, stats in enumerate(shard_stats)
+            ],
+        }
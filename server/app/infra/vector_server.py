@@ -0,0 +1,106 @@
+import time
+from typing import Any, Dict, Optional
+
+import chromadb
+import httpx
+from chromadb.config import Settings
+
+from app.infra.metrics import metrics
+
+
+RETRYABLE_STATUS_CODES = {502, 503, 504}
+
+
+class RetryingTransport(httpx.HTTPTransport):
+    """
+    Pooled HTTP transport that retries transient failures with exponential backoff.
+
+    Timeouts, dropped connections and 502/503/504 responses are retried up to
+    `retries` times. Every Chroma call the service makes is safe to repeat
+    (chunk IDs are deterministic, writes are upserts or adds of the same IDs,
+    deletes are by ID or filter). Request latency and retries are recorded as
+    metrics.
+    """
+
+    def __init__(self, retries: int = 3, backoff_seconds: float = 0.2, **kwargs: Any) -> None:
+        super().__init__(**kwargs)
+        self._retries = max(int(retries), 0)
+        self._backoff_seconds = max(float(backoff_seconds), 0.0)
+        self._latency = metrics.histogram("vector_server_request_ms")
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        for attempt in range(self._retries + 1):
+            started = time.perf_counter()
+            try:
+                response = super().handle_request(request)
+            except (httpx.TimeoutException, httpx.NetworkError):
+                if attempt == self._retries:
+                    metrics.counter("vector_server_failures").inc()
+                    raise
+            else:
+                self._latency.observe((time.perf_counter() - started) * 1000.0)
+                if response.status_code not in RETRYABLE_STATUS_CODES or attempt == self._retries:
+                    return response
+                response.close()
+            metrics.counter("vector_server_retries").inc()
+            time.sleep(self._backoff_seconds * (2 ** attempt))
+        raise RuntimeError("unreachable")
+
+
+def connect_vector_server(
+    host: str = "localhost",
+    port: int = 8001,
+    ssl: bool = False,
+    headers: Optional[Dict[str, str]] = None,
+    timeout: float = 10.0,
+    connect_timeout: float = 2.0,
+    retries: int = 3,
+    pool_size: int = 32,
+) -> Any:
+    """
+    Connect to a Chroma server over HTTP and return the client.
+
+    Chroma's HTTP client opens one `httpx.Client` with no timeout, and its
+    public settings offer no way to pass a transport, pool limits or
+    timeouts. The client's private session (`client._server._session`) is
+    therefore replaced by one with a keep-alive pool of `pool_size`
+    connections, per-request timeouts and a retrying transport. If a chromadb
+    release no longer has that attribute, this raises at startup rather
+    than running without timeouts or retries. `httpx.Client` is
+    thread-safe, so every thread of a worker shares one pool. Size the pool to
+    at least the number of threads that query concurrently. The server is
+    pinged once so a wrong address fails at startup rather than on the first
+    question.
+    """
+    client = chromadb.HttpClient(
+        host=host,
+        port=int(port),
+        ssl=ssl,
+        headers=headers,
+        settings=Settings(anonymized_telemetry=False),
+    )
+
+    server = getattr(client, "_server", None)
+    session = getattr(server, "_session", None)
+    if not isinstance(session, httpx.Client):
+        raise RuntimeError(
+            f"chromadb {getattr(chromadb, '__version__', 'unknown')} does not expose the HTTP session "
+            "(client._server._session) that VECTOR_DB_MODE=http configures for pooling, timeouts and "
+            "retries; install a chromadb version where it is an httpx.Client"
+        )
+    pool_size = max(int(pool_size), 1)
+    verify = getattr(getattr(server, "_settings", None), "chroma_server_ssl_verify", None)
+    transport = RetryingTransport(
+        retries=retries,
+        limits=httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size),
+        verify=True if verify is None else verify,
+    )
+    server._session = httpx.Client(
+        transport=transport,
+        timeout=httpx.Timeout(timeout, connect=min(connect_timeout, timeout)),
+        headers=session.headers,
+    )
+    session.close()
+
+    client.heartbeat()
+    return client
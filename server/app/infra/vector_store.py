@@ -1,41 +1,460 @@
-from typing import List, Dict, Any
-import uuid
+import hashlib
+import time
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from typing import List, Dict, Any, Callable, Iterable, Iterator, Optional, Sequence, Tuple
 from datetime import datetime, timezone
+from pathlib import Path
 import chromadb
+import numpy as np
 from chromadb.config import Settings
-from app.infra.embeddings import generate_embeddings, generate_embedding
+from app.infra.embeddings import generate_embeddings, generate_embeddings_cached, generate_embedding
+from app.infra.bm25 import BM25Index
+from app.infra.diversity import mmr_select
+from app.infra.document_catalog import DocumentCatalog
+from app.infra.metrics import metrics
+from app.infra.embedding_cache import ChunkEmbeddingCache, QueryEmbeddingCache, content_hash
+from app.infra.vector_compression import CompressedCollection, FullVectorStore, build_projector
+from app.infra.vector_server import connect_vector_server
+from app.infra.vector_index import (
+    DISTANCE_SPACES,
+    VECTOR_INDEX_BACKENDS,
+    ChromaIndex,
+    MatrixIndex,
+    ShardedIndex,
+    VectorIndex,
+    distance_to_similarity,
+)
 
 
-def initialize_vector_store(persist_directory: str = "./vector_db"):
-    """Initialize the vector database."""
-    client = chromadb.PersistentClient(path=persist_directory)
-    collection = client.get_or_create_collection(name="documents")
-    return client, collection
+VECTOR_DB_MODES = {"persistent", "http"}
+
+def initialize_vector_store(
+    persist_directory: str = "./vector_db",
+    compression: str = "none",
+    storage_dim: int = 128,
+    rescore_factor: int = 4,
+    backend: str = "chroma",
+    matrix_search: str = "exact",
+    space: str = "cosine",
+    hnsw_m: int = 16,
+    hnsw_construction_ef: int = 200,
+    hnsw_search_ef: int = 64,
+    migrate: bool = False,
+    shards: int = 1,
+    shard_key: str = "source",
+    mode: str = "persistent",
+    server_host: str = "localhost",
+    server_port: int = 8001,
+    server_ssl: bool = False,
+    server_timeout: float = 10.0,
+    server_retries: int = 3,
+    server_pool_size: int = 32,
+) -> Tuple[Any, VectorIndex]:
+    """
+    Initialize the vector database and return `(client, index)`.
+
+    The "chroma" backend uses a persistent Chroma collection created with an
+    explicit distance `space` and HNSW parameters (see `open_documents_collection`).
+    With `compression` set to "truncate" or "pca", the collection stores
+    `storage_dim`-dimensional vectors and queries are re-scored against full
+    vectors kept in a sidecar next to the database.
+
+    The "matrix" backend keeps a memory-mapped float32 matrix under
+    `persist_directory/matrix_index` and has no client (see `MatrixIndex`).
+
+    With `shards` > 1 the index is split into that many collections (or matrix
+    directories) routed by the `shard_key` metadata field (see `ShardedIndex`).
+
+    With `mode="http"` the chroma backend talks to a separate Chroma server at
+    `server_host:server_port` through a pooled, retrying HTTP client (see
+    `connect_vector_server`) instead of opening `persist_directory` in-process,
+    so any number of workers share one index.
+    """
+    backend = backend.lower()
+    if backend not in VECTOR_INDEX_BACKENDS:
+        raise ValueError(
+            f"Unsupported vector index backend: {backend}. "
+            f"Supported backends: {', '.join(sorted(VECTOR_INDEX_BACKENDS))}"
+        )
+    mode = mode.lower()
+    if mode not in VECTOR_DB_MODES:
+        raise ValueError(
+            f"Unsupported vector database mode: {mode}. Supported modes: {', '.join(sorted(VECTOR_DB_MODES))}"
+        )
+    shards = max(int(shards), 1)
+    shard_names = ["documents"] if shards == 1 else [f"documents_shard_{idx}" for idx in range(shards)]
+
+    if backend == "matrix":
+        if mode == "http":
+            raise ValueError("VECTOR_DB_MODE=http is only supported by the chroma vector index backend")
+        if compression.lower() != "none":
+            raise ValueError("VECTOR_COMPRESSION is only supported by the chroma vector index backend")
+        matrix_root = Path(persist_directory) / "matrix_index"
+        indexes = [
+            MatrixIndex(
+                str(matrix_root if shards == 1 else matrix_root / name),
+                name=name,
+                search=matrix_search,
+                space=space,
+                hnsw_m=hnsw_m,
+                hnsw_ef_construction=hnsw_construction_ef,
+                hnsw_ef_search=hnsw_search_ef,
+            )
+            for name in shard_names
+        ]
+        return None, indexes[0] if shards == 1 else ShardedIndex(indexes, routing_key=shard_key)
+
+    if mode == "http":
+        if compression.lower() != "none":
+            raise ValueError("VECTOR_COMPRESSION keeps full vectors in a local sidecar and is not supported with VECTOR_DB_MODE=http")
+        client = connect_vector_server(
+            host=server_host,
+            port=server_port,
+            ssl=server_ssl,
+            timeout=server_timeout,
+            retries=server_retries,
+            pool_size=server_pool_size,
+        )
+    else:
+        client = chromadb.PersistentClient(path=persist_directory)
+    metadata = hnsw_metadata(space, hnsw_m, hnsw_construction_ef, hnsw_search_ef)
+    collections = [
+        open_documents_collection(client, metadata, name=name, migrate=migrate)
+        for name in shard_names
+    ]
+    if shards > 1:
+        _warn_unsharded_collection(client)
+
+    if compression.lower() != "none":
+        # One projection and one full-vector sidecar serve every shard.
+        projector_path = Path(persist_directory) / "pca_projection.npz"
+        projector = build_projector(compression, storage_dim, projector_path)
+        full_vectors = FullVectorStore(str(Path(persist_directory) / "full_vectors.sqlite"))
+        collections = [
+            CompressedCollection(
+                collection,
+                projector=projector,
+                full_vectors=full_vectors,
+                rescore_factor=rescore_factor,
+                projector_path=projector_path,
+            )
+            for collection in collections
+        ]
+    indexes = [ChromaIndex(collection) for collection in collections]
+    return client, indexes[0] if shards == 1 else ShardedIndex(indexes, routing_key=shard_key)
+
+
+def _warn_unsharded_collection(client) -> None:
+    try:
+        legacy = client.get_collection(name="documents")
+    except Exception:
+        return
+    if legacy.count():
+        print(
+            f"Warning: VECTOR_SHARDS > 1 but the unsharded 'documents' collection still holds "
+            f"{legacy.count()} chunks that sharded queries will not see. Re-index the archive."
+        )
+
+
+def hnsw_metadata(space: str = "cosine", m: int = 16, construction_ef: int = 200, search_ef: int = 64) -> Dict[str, Any]:
+    """Chroma collection metadata selecting the distance space and HNSW parameters."""
+    if space not in DISTANCE_SPACES:
+        raise ValueError(
+            f"Unsupported distance space: {space}. Supported spaces: {', '.join(sorted(DISTANCE_SPACES))}"
+        )
+    return {
+        "hnsw:space": space,
+        "hnsw:M": int(m),
+        "hnsw:construction_ef": int(construction_ef),
+        "hnsw:search_ef": int(search_ef),
+    }
+
+
+def _chroma_major_version() -> int:
+    try:
+        return int(str(chromadb.__version__).split(".")[0])
+    except (AttributeError, ValueError):
+        return 0
+
+
+def _current_search_ef(collection) -> Optional[int]:
+    """The search_ef a collection runs with: its configuration on Chroma >= 1.0, else its metadata."""
+    if _chroma_major_version() >= 1:
+        configuration = getattr(collection, "configuration", None) or {}
+        value = (configuration.get("hnsw") or {}).get("ef_search")
+        if value is not None:
+            return int(value)
+    return (collection.metadata or {}).get("hnsw:search_ef")
+
+
+def _apply_search_ef(collection, search_ef: int) -> None:
+    """
+    Change search_ef in place. Only that setting is sent: Chroma rejects a
+    `modify` that repeats build-time keys such as hnsw:space.
+    """
+    if _chroma_major_version() >= 1:
+        collection.modify(configuration={"hnsw": {"ef_search": int(search_ef)}})
+    else:
+        collection.modify(metadata={"hnsw:search_ef": int(search_ef)})
+
+
+def open_documents_collection(client, metadata: Dict[str, Any], name: str = "documents", migrate: bool = False):
+    """
+    Open (or create) the documents collection with the requested HNSW metadata.
+
+    The space, M and construction_ef of an existing collection are fixed when it
+    is built. If they differ from `metadata`, the collection is rebuilt with
+    `migrate_collection` when `migrate` is set; otherwise it is used as is (its
+    distances are still converted according to its actual space) and a warning
+    is printed. A differing search_ef is applied in place where the Chroma
+    version allows it.
+    """
+    staging_name = f"{name}__migrating"
+    try:
+        collection = client.get_collection(name=name)
+    except Exception:
+        collection = None
+
+    if collection is None:
+        try:
+            # A migration interrupted after the old collection was dropped: finish it.
+            staged = client.get_collection(name=staging_name)
+            staged.modify(name=name)
+            collection = staged
+        except Exception:
+            return client.create_collection(name=name, metadata=metadata)
+
+    current = collection.metadata or {}
+    build_keys = ("hnsw:space", "hnsw:M", "hnsw:construction_ef")
+    defaults = {"hnsw:space": "l2", "hnsw:M": 16, "hnsw:construction_ef": 100}
+    mismatched = [key for key in build_keys if current.get(key, defaults[key]) != metadata[key]]
+    if mismatched:
+        if migrate:
+            return migrate_collection(client, collection, metadata)
+        print(
+            f"Warning: collection '{name}' was built with "
+            f"{ {key: current.get(key, defaults[key]) for key in mismatched} }, "
+            f"configured { {key: metadata[key] for key in mismatched} }. "
+            f"Set VECTOR_HNSW_MIGRATE=true to rebuild it."
+        )
+    elif _current_search_ef(collection) != metadata["hnsw:search_ef"]:
+        try:
+            _apply_search_ef(collection, metadata["hnsw:search_ef"])
+        except Exception as exc:
+            print(
+                f"Warning: collection '{name}' runs with search_ef {_current_search_ef(collection)}, "
+                f"configured {metadata['hnsw:search_ef']}, and it could not be updated in place: {exc}"
+            )
+    return collection
+
+
+def migrate_collection(client, collection, metadata: Dict[str, Any], batch_size: int = 1000):
+    """
+    Rebuild a collection with new HNSW metadata, keeping IDs, embeddings, documents and metadata.
+
+    Records are copied page by page into a staging collection, which replaces
+    the original only once every record has been copied.
+    """
+    name = collection.name
+    staging_name = f"{name}__migrating"
+    try:
+        client.delete_collection(name=staging_name)
+    except Exception:
+        pass
+    staged = client.create_collection(name=staging_name, metadata=metadata)
+
+    offset = 0
+    while True:
+        page = collection.get(
+            include=["embeddings", "documents", "metadatas"], limit=batch_size, offset=offset
+        )
+        ids = page.get("ids") or []
+        if not ids:
+            break
+        staged.add(
+            ids=ids,
+            embeddings=page["embeddings"],
+            documents=page.get("documents"),
+            metadatas=page.get("metadatas"),
+        )
+        offset += len(ids)
+
+    if staged.count() != collection.count():
+        raise RuntimeError(
+            f"Migration of collection '{name}' copied {staged.count()} of {collection.count()} records; "
+            f"the original collection was left unchanged"
+        )
+    client.delete_collection(name=name)
+    staged.modify(name=name)
+    print(f"Migrated collection '{name}' ({offset} records) to {metadata}")
+    return staged
+
+
+def chunk_id(metadata: Dict[str, Any], content: str) -> str:
+    """
+    Derive a deterministic chunk ID from (source, pdf_page_index, chunk_index, content hash).
+
+    Re-indexing an unchanged chunk yields the same ID, so writes are idempotent.
+    """
+    key = "\x1f".join(
+        str(part)
+        for part in (
+            metadata.get("source", ""),
+            metadata.get("pdf_page_index", ""),
+            metadata.get("chunk_index", ""),
+            content_hash(content),
+        )
+    )
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()[:32]
 
 
 def add_documents_to_vector_store(
-    documents: List[Dict[str, Any]],
+    documents: Iterable[Dict[str, Any]],
     collection,
     embedding_model,
-):
-    """Add documents to the vector store."""
-    texts = [doc["content"] for doc in documents]
-    embeddings = generate_embeddings(texts, embedding_model)
-    ids = [str(uuid.uuid4()) for _ in range(len(documents))]
+    embedding_cache: Optional[ChunkEmbeddingCache] = None,
+    length_buckets: Optional[Sequence[Tuple[int, int]]] = None,
+    catalog: Optional[DocumentCatalog] = None,
+    batch_size: int = 256,
+    on_batch: Optional[Callable[[Dict[str, int]], None]] = None,
+    keyword_index: Optional[BM25Index] = None,
+) -> Dict[str, int]:
+    """
+    Add or re-index documents in the vector store.
+
+    `documents` may be any iterable (e.g. a generator of chunks); it is consumed
+    in batches of `batch_size`. Each batch is encoded and upserted as its own
+    committed write, and the next batch is encoded while the previous one is
+    being written, so at most two batches are held in memory. `on_batch` is
+    called with running counts once a batch's write has committed (right away
+    for a batch with nothing to write), in batch order.
+
+    Chunk IDs are deterministic (see `chunk_id`), so for every source only
+    chunks that are not already stored are encoded and upserted, and stored
+    chunks that no longer exist are deleted once the stream is exhausted.
+    Re-indexing an unchanged document therefore writes nothing.
 
+    When an embedding cache is given, only chunks whose content hash is not
+    cached for the current model are sent to the encoder. `length_buckets`
+    enables length-bucketed encoding (see `generate_embeddings`). The keyword
+    index, when given, is updated with every written batch and stale deletion;
+    the document catalog and the index's on-disk search structures (see
+    `VectorIndex.flush`) once all chunks have been written. The catalog version
+    is bumped after every committed write so cached retrieval results expire.
+
+    Returns counts of total, added, unchanged and deleted chunks.
+    """
+    batch_size = max(int(batch_size), 1)
     indexed_at = datetime.now(timezone.utc).isoformat()
-    metadatas: List[Dict[str, Any]] = []
-    for doc in documents:
-        md = doc.get("metadata", {}).copy()
-        md.setdefault("indexed_at", indexed_at)
-        metadatas.append(md)
-
-    collection.add(
-        ids=ids,
-        embeddings=embeddings,
-        documents=texts,
-        metadatas=metadatas,
-    )
+    stored_ids_by_source: Dict[str, set] = {}
+    seen_ids_by_source: Dict[str, set] = {}
+    progress = {"batches": 0, "total": 0, "added": 0, "unchanged": 0, "deleted": 0}
+
+    def select_new(batch: List[Dict[str, Any]], counts: Dict[str, int]) -> List[Tuple[str, Dict[str, Any]]]:
+        new_chunks: List[Tuple[str, Dict[str, Any]]] = []
+        for doc in batch:
+            metadata = doc.get("metadata", {})
+            source = metadata.get("source", "")
+            doc_id = chunk_id(metadata, doc["content"])
+            seen = seen_ids_by_source.setdefault(source, set())
+            if doc_id in seen:
+                continue
+            seen.add(doc_id)
+            counts["total"] += 1
+
+            if source not in stored_ids_by_source:
+                stored_ids_by_source[source] = set(
+                    collection.get(where={"source": source}, include=[]).get("ids") or []
+                )
+            if doc_id in stored_ids_by_source[source]:
+                counts["unchanged"] += 1
+            else:
+                new_chunks.append((doc_id, doc))
+        return new_chunks
+
+    def write(ids: List[str], embeddings, texts: List[str], metadatas: List[Dict[str, Any]]) -> None:
+        collection.upsert(ids=ids, embeddings=embeddings, documents=texts, metadatas=metadatas)
+        if keyword_index is not None:
+            keyword_index.add(ids, texts, [md.get("source") for md in metadatas])
+        if catalog is not None:
+            catalog.bump_version()
+
+    def report(counts: Dict[str, int]) -> None:
+        for key, value in counts.items():
+            progress[key] += value
+        progress["batches"] += 1
+        if on_batch is not None:
+            on_batch(dict(progress))
+
+    with ThreadPoolExecutor(max_workers=1) as writer:
+        # The batch being written and its counts, reported once the write has committed.
+        pending_write = None
+        pending_counts: Dict[str, int] = {}
+        for batch in _batched(documents, batch_size):
+            counts = {"total": 0, "added": 0, "unchanged": 0}
+            new_chunks = select_new(batch, counts)
+            if new_chunks:
+                ids = [doc_id for doc_id, _ in new_chunks]
+                texts = [doc["content"] for _, doc in new_chunks]
+                embeddings = generate_embeddings_cached(
+                    texts, embedding_model, cache=embedding_cache, length_buckets=length_buckets
+                )
+                metadatas: List[Dict[str, Any]] = []
+                for _, doc in new_chunks:
+                    md = doc.get("metadata", {}).copy()
+                    md.setdefault("indexed_at", indexed_at)
+                    metadatas.append(md)
+
+            if pending_write is not None:
+                pending_write.result()
+                report(pending_counts)
+                pending_write = None
+            if new_chunks:
+                counts["added"] = len(ids)
+                pending_write = writer.submit(write, ids, embeddings, texts, metadatas)
+                pending_counts = counts
+            else:
+                report(counts)
+
+        if pending_write is not None:
+            pending_write.result()
+            report(pending_counts)
+
+    stale_ids = [
+        doc_id
+        for source, stored in stored_ids_by_source.items()
+        for doc_id in stored - seen_ids_by_source.get(source, set())
+    ]
+    for start in range(0, len(stale_ids), batch_size):
+        collection.delete(ids=stale_ids[start:start + batch_size])
+        if keyword_index is not None:
+            keyword_index.delete(stale_ids[start:start + batch_size])
+        if catalog is not None:
+            catalog.bump_version()
+    progress["deleted"] = len(stale_ids)
+    if progress["added"] or stale_ids:
+        collection.flush()
+
+    if catalog is not None and (progress["added"] or stale_ids):
+        chunk_counts = {source: len(ids) for source, ids in seen_ids_by_source.items() if source}
+        catalog.record_indexed(chunk_counts, indexed_at)
+
+    return {
+        "total": progress["total"],
+        "added": progress["added"],
+        "unchanged": progress["unchanged"],
+        "deleted": progress["deleted"],
+    }
+
+
+def _batched(items: Iterable[Any], size: int) -> Iterator[List[Any]]:
+    iterator = iter(items)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
 
 
 def search_similar_documents(
@@ -43,31 +462,124 @@ def search_similar_documents(
     collection,
     embedding_model,
     top_k: int = 3,
+    query_cache: Optional[QueryEmbeddingCache] = None,
 ) -> List[Dict[str, Any]]:
-    """Search for similar documents in the vector store."""
-    query_embedding = generate_embedding(query, embedding_model)
+    """
+    Search for similar documents in the vector store.
+
+    When a query cache is given and already holds the query, the encoder is skipped.
+    """
+    query_embedding = generate_embedding(query, embedding_model, cache=query_cache)
     results = collection.query(
-        query_embeddings=[query_embedding],
+        query_embeddings=query_embedding[np.newaxis, :],
         n_results=top_k,
         include=["documents", "metadatas", "distances"],
     )
+    return _format_query_results(results, 0, collection.space)
+
+
+def search_similar_documents_batch(
+    queries: List[str],
+    collection,
+    embedding_model,
+    top_k: int = 3,
+    query_cache: Optional[QueryEmbeddingCache] = None,
+    mmr_lambda: Optional[float] = None,
+    mmr_fetch_factor: int = 3,
+) -> List[List[Dict[str, Any]]]:
+    """
+    Search for several queries at once.
+
+    Queries missing from the cache are encoded in a single `encode` call and all
+    queries are answered by a single multi-embedding `collection.query`.
+
+    With `mmr_lambda` set, `top_k * mmr_fetch_factor` candidates are fetched
+    together with their embeddings and a diverse `top_k` is picked from them
+    (see `diversify_results`).
+    """
+    if not queries:
+        return []
+
+    rows: List[Optional[np.ndarray]] = [
+        query_cache.get(query) if query_cache is not None else None
+        for query in queries
+    ]
+    missing = [idx for idx, embedding in enumerate(rows) if embedding is None]
+    if missing:
+        encoded = generate_embeddings([queries[idx] for idx in missing], embedding_model)
+        for idx, embedding in zip(missing, encoded):
+            rows[idx] = embedding
+            if query_cache is not None:
+                query_cache.put(queries[idx], embedding)
+    query_embeddings = np.vstack(rows).astype(np.float32, copy=False)
+
+    if mmr_lambda is None:
+        results = collection.query(
+            query_embeddings=query_embeddings,
+            n_results=top_k,
+            include=["documents", "metadatas", "distances"],
+        )
+        return [_format_query_results(results, idx, collection.space) for idx in range(len(queries))]
+
+    results = collection.query(
+        query_embeddings=query_embeddings,
+        n_results=top_k * max(int(mmr_fetch_factor), 1),
+        include=["documents", "metadatas", "distances", "embeddings"],
+    )
+    diversified = []
+    for idx in range(len(queries)):
+        candidates = _format_query_results(results, idx, collection.space)
+        embeddings_by_id = dict(zip(results["ids"][idx], results["embeddings"][idx]))
+        diversified.append(diversify_results(candidates, embeddings_by_id, top_k, mmr_lambda))
+    return diversified
+
+
+def diversify_results(
+    candidates: List[Dict[str, Any]],
+    embeddings_by_id: Dict[str, Any],
+    top_k: int,
+    mmr_lambda: float,
+) -> List[Dict[str, Any]]:
+    """
+    Pick a diverse `top_k` from ranked candidates by maximal marginal relevance.
+
+    Relevance is the candidate's similarity, or its fused RRF score scaled to
+    [0, 1] for hybrid results; redundancy is the cosine between chunk embeddings,
+    so overlapping neighbouring chunks of one passage displace each other.
+    """
+    usable = [chunk for chunk in candidates if embeddings_by_id.get(chunk.get("id")) is not None]
+    if len(usable) <= top_k:
+        return candidates[:top_k]
+
+    started = time.perf_counter()
+    if all(chunk.get("similarity") is not None for chunk in usable):
+        relevance = np.array([chunk["similarity"] for chunk in usable], dtype=np.float32)
+    else:
+        relevance = np.array([chunk.get("rrf_score") or 0.0 for chunk in usable], dtype=np.float32)
+        relevance /= max(float(relevance.max()), 1e-12)
+    embeddings = np.vstack([np.asarray(embeddings_by_id[chunk["id"]], dtype=np.float32) for chunk in usable])
+    picked = mmr_select(relevance, embeddings, top_k, mmr_lambda)
+    metrics.histogram("retrieval_mmr_latency_ms").observe((time.perf_counter() - started) * 1000.0)
+    return [usable[idx] for idx in picked]
+
 
+def _format_query_results(results: Dict[str, Any], query_index: int, space: str = "l2") -> List[Dict[str, Any]]:
+    """
+    Format the results of one query embedding from a `collection.query` response.
+
+    `similarity` is the cosine similarity clipped to [0, 1], recovered from the
+    distance according to the index's `space`.
+    """
     formatted_results: List[Dict[str, Any]] = []
-    if results.get("documents") and len(results["documents"]) > 0:
-        documents = results["documents"][0]
-        metadatas = results.get("metadatas", [[]])[0] if results.get("metadatas") else [{}] * len(documents)
-        ids = results.get("ids", [[]])[0] if results.get("ids") else [None] * len(documents)
-        distances = results.get("distances", [[]])[0] if results.get("distances") else [None] * len(documents)
+    if results.get("documents") and len(results["documents"]) > query_index:
+        documents = results["documents"][query_index]
+        metadatas = results["metadatas"][query_index] if results.get("metadatas") else [{}] * len(documents)
+        ids = results["ids"][query_index] if results.get("ids") else [None] * len(documents)
+        distances = results["distances"][query_index] if results.get("distances") else [None] * len(documents)
 
         for doc, metadata, doc_id, distance in zip(documents, metadatas, ids, distances):
-            # Convert distance to similarity (ChromaDB uses cosine distance, similarity = 1 - distance)
-            similarity = None
-            if distance is not None:
-                # ChromaDB returns cosine distance (0 = identical, 2 = opposite)
-                # Convert to similarity score (1 = identical, -1 = opposite)
-                # For evaluation, we want 0-1 range, so: similarity = 1 - (distance / 2)
-                similarity = max(0.0, min(1.0, 1.0 - (float(distance) / 2.0)))
-            
+            similarity = distance_to_similarity(distance, space) if distance is not None else None
+
             formatted_results.append(
                 {
                     "text": doc,
@@ -82,8 +594,159 @@ def search_similar_documents(
     return formatted_results
 
 
-def list_indexed_documents(collection) -> List[Dict[str, Any]]:
-    """List high-level information about indexed documents in the vector store."""
+def search_keyword_documents_batch(
+    queries: List[str],
+    collection,
+    keyword_index: BM25Index,
+    top_k: int = 3,
+) -> List[List[Dict[str, Any]]]:
+    """
+    Rank chunks by BM25 for each query.
+
+    Chunk text and metadata for every hit are fetched from the vector index in
+    one `get`. Results have the same shape as dense results, with a
+    `bm25_score` and no distance.
+    """
+    hits = [keyword_index.search(query, top_k) for query in queries]
+    hit_ids = list(dict.fromkeys(chunk_id for query_hits in hits for chunk_id, _ in query_hits))
+    if not hit_ids:
+        return [[] for _ in queries]
+
+    stored = collection.get(ids=hit_ids, include=["documents", "metadatas"])
+    documents = dict(zip(stored.get("ids") or [], stored.get("documents") or []))
+    metadatas = dict(zip(stored.get("ids") or [], stored.get("metadatas") or []))
+
+    return [
+        [
+            {
+                "text": documents[chunk_id],
+                "content": documents[chunk_id],
+                "metadata": metadatas.get(chunk_id) or {},
+                "id": chunk_id,
+                "distance": None,
+                "similarity": None,
+                "bm25_score": score,
+            }
+            for chunk_id, score in query_hits
+            if chunk_id in documents
+        ]
+        for query_hits in hits
+    ]
+
+
+def reciprocal_rank_fusion(
+    ranked_lists: Sequence[List[Dict[str, Any]]],
+    top_k: int,
+    rrf_k: int = 60,
+) -> List[Dict[str, Any]]:
+    """
+    Merge ranked result lists by reciprocal rank fusion: score = sum(1 / (rrf_k + rank)).
+
+    Chunks are matched by ID; the first list's copy of a chunk (the dense one,
+    with its similarity) is kept and annotated with its `rrf_score`.
+    """
+    fused: Dict[str, Dict[str, Any]] = {}
+    scores: Dict[str, float] = {}
+    for results in ranked_lists:
+        for rank, chunk in enumerate(results, start=1):
+            key = chunk.get("id") or chunk.get("content")
+            fused.setdefault(key, chunk)
+            scores[key] = scores.get(key, 0.0) + 1.0 / (rrf_k + rank)
+
+    ranked = sorted(scores, key=lambda key: scores[key], reverse=True)[:top_k]
+    return [{**fused[key], "rrf_score": scores[key]} for key in ranked]
+
+
+_keyword_search_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="bm25")
+
+
+def _observe_latency(histogram_name: str, search: Callable[..., Any], *args: Any) -> Any:
+    started = time.perf_counter()
+    try:
+        return search(*args)
+    finally:
+        metrics.histogram(histogram_name).observe((time.perf_counter() - started) * 1000.0)
+
+
+def hybrid_search_batch(
+    queries: List[str],
+    collection,
+    embedding_model,
+    keyword_index: BM25Index,
+    top_k: int = 3,
+    query_cache: Optional[QueryEmbeddingCache] = None,
+    candidate_factor: int = 2,
+    rrf_k: int = 60,
+    mmr_lambda: Optional[float] = None,
+    mmr_fetch_factor: int = 3,
+) -> List[List[Dict[str, Any]]]:
+    """
+    Dense + BM25 retrieval merged by reciprocal rank fusion.
+
+    Each retriever returns `top_k * candidate_factor` candidates; the keyword
+    search runs on a worker thread while the dense search runs on this one.
+    Latencies are recorded per retriever. With `mmr_lambda` set, the fused list
+    is cut to `top_k * mmr_fetch_factor` and diversified to `top_k`, using
+    embeddings fetched for all queries in one `get`.
+    """
+    if not queries:
+        return []
+    candidate_k = top_k * max(int(candidate_factor), 1)
+    keyword_future = _keyword_search_executor.submit(
+        _observe_latency,
+        "retrieval_bm25_latency_ms",
+        search_keyword_documents_batch,
+        queries,
+        collection,
+        keyword_index,
+        candidate_k,
+    )
+    dense = _observe_latency(
+        "retrieval_dense_latency_ms",
+        search_similar_documents_batch,
+        queries,
+        collection,
+        embedding_model,
+        candidate_k,
+        query_cache,
+    )
+    keyword = keyword_future.result()
+    fused_k = top_k if mmr_lambda is None else top_k * max(int(mmr_fetch_factor), 1)
+    fused = [
+        reciprocal_rank_fusion([dense_results, keyword_results], fused_k, rrf_k)
+        for dense_results, keyword_results in zip(dense, keyword)
+    ]
+    if mmr_lambda is None:
+        return fused
+
+    fused_ids = list(dict.fromkeys(chunk["id"] for candidates in fused for chunk in candidates if chunk.get("id")))
+    stored = collection.get(ids=fused_ids, include=["embeddings"]) if fused_ids else {"ids": [], "embeddings": []}
+    embeddings_by_id = dict(zip(stored["ids"], stored["embeddings"]))
+    return [diversify_results(candidates, embeddings_by_id, top_k, mmr_lambda) for candidates in fused]
+
+
+def list_indexed_documents(
+    collection,
+    catalog: Optional[DocumentCatalog] = None,
+    offset: int = 0,
+    limit: Optional[int] = None,
+) -> Tuple[List[Dict[str, Any]], int]:
+    """
+    List high-level information about indexed documents in the vector store.
+
+    Returns one page of documents and the total number of documents. With a
+    catalog the page is served from it; otherwise every chunk's metadata is scanned.
+    """
+    if catalog is not None:
+        return catalog.list(offset=offset, limit=limit)
+
+    indexed = sorted(scan_indexed_documents(collection), key=lambda item: item["source"])
+    end = offset + limit if limit is not None else None
+    return indexed[offset:end], len(indexed)
+
+
+def scan_indexed_documents(collection) -> List[Dict[str, Any]]:
+    """Aggregate per-source chunk counts by reading every chunk's metadata."""
     results = collection.get(include=["metadatas"])
 
     indexed: Dict[str, Dict[str, Any]] = {}
@@ -121,31 +784,54 @@ def list_indexed_documents(collection) -> List[Dict[str, Any]]:
     return list(indexed.values())
 
 
-def delete_documents_by_source(collection, source: str) -> int:
-    """Delete all document chunks in the vector store for a given source."""
+def sync_catalog_from_collection(catalog: DocumentCatalog, collection) -> None:
+    """Backfill the catalog from an existing collection the first time it is used."""
+    if not catalog.is_backfilled():
+        catalog.rebuild(scan_indexed_documents(collection))
+
+
+def sync_keyword_index_from_collection(keyword_index: BM25Index, collection) -> None:
+    """Backfill the keyword index from an existing collection the first time it is used."""
+    if keyword_index.is_backfilled():
+        return
+    results = collection.get(include=["documents", "metadatas"])
+    keyword_index.rebuild(
+        (chunk_id, document or "", (metadata or {}).get("source"))
+        for chunk_id, document, metadata in zip(
+            results.get("ids") or [], results.get("documents") or [], results.get("metadatas") or []
+        )
+    )
+
+
+def delete_documents_by_source(
+    collection,
+    source: str,
+    catalog: Optional[DocumentCatalog] = None,
+    keyword_index: Optional[BM25Index] = None,
+) -> int:
+    """
+    Delete all document chunks in the vector store for a given source.
+
+    The source filter is pushed down to the store's metadata index, so the cost
+    is proportional to the document's chunk count rather than the archive size.
+    """
     try:
-        all_results = collection.get(include=["metadatas"])
-        all_ids = all_results.get("ids") or []
-        all_metadatas = all_results.get("metadatas") or []
-        
-        if all_ids and isinstance(all_ids[0], list):
-            all_ids = [id for sublist in all_ids for id in sublist]
-        if all_metadatas and isinstance(all_metadatas[0], list):
-            all_metadatas = [md for sublist in all_metadatas for md in sublist]
-        
-        matching_ids = []
-        for idx, metadata in enumerate(all_metadatas):
-            if isinstance(metadata, dict) and metadata.get("source") == source:
-                if idx < len(all_ids):
-                    matching_ids.append(all_ids[idx])
-        
+        matching = collection.get(where={"source": source}, include=[])
+        matching_ids = matching.get("ids") or []
+
         if matching_ids:
             collection.delete(ids=matching_ids)
-            return len(matching_ids)
-        
-        return 0
+            collection.flush()
+            if catalog is not None:
+                catalog.bump_version()
+
+        if keyword_index is not None:
+            keyword_index.delete_source(source)
+
+        if catalog is not None:
+            catalog.record_deleted(source)
+
+        return len(matching_ids)
     except Exception as e:
         print(f"Error deleting documents by source '{source}': {e}")
         raise
-
-
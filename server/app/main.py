@@ -1,8 +1,20 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 
-from app.api.routes import chat, documents, evaluation
+from app.api.routes import admin, chat, documents, evaluation
 from app.core.config import settings
+from app.core.deps import (
+    get_answer_cache,
+    get_chunk_embedding_cache,
+    get_keyword_index,
+    get_query_embedding_cache,
+    get_reranker,
+    get_retrieval_cache,
+    get_vector_store_collection,
+)
+from app.core.lifespan import lifespan, readiness
+from app.infra.metrics import metrics as metrics_registry
 
 
 def create_app() -> FastAPI:
@@ -10,6 +22,7 @@ def create_app() -> FastAPI:
         title="Historical Archive RAG Chatbot",
         description="A RAG-based Chat bot for querying and analyzing historical documents.",
         version="1.0.0",
+        lifespan=lifespan,
     )
 
     # CORS middleware (allows frontend to call API)
@@ -24,11 +37,13 @@ def create_app() -> FastAPI:
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=["ETag", "X-Total-Count", "X-Catalog-Version"],
     )
 
     app.include_router(chat.router, prefix="/chat", tags=["chat"])
     app.include_router(documents.router, prefix="/documents", tags=["documents"])
     app.include_router(evaluation.router, prefix="/evaluation", tags=["evaluation"])
+    app.include_router(admin.router, prefix="/admin", tags=["admin"])
 
     @app.get("/")
     async def root() -> dict:
@@ -40,9 +55,40 @@ def create_app() -> FastAPI:
 
     @app.get("/health")
     async def health_check() -> dict:
-        """Health check endpoint."""
+        """Health check endpoint (liveness only)."""
         return {"status": "ok"}
 
+    @app.get("/ready")
+    async def readiness_check() -> JSONResponse:
+        """Readiness endpoint with per-component initialization state and timings."""
+        if not settings.WARMUP_ENABLED:
+            return JSONResponse({"status": "ready", "warmup_enabled": False, "components": {}})
+        snapshot = readiness.snapshot()
+        status_code = 200 if snapshot["status"] == "ready" else 503
+        return JSONResponse(snapshot, status_code=status_code)
+
+    @app.get("/metrics")
+    async def metrics() -> dict:
+        """In-process cache and performance counters."""
+        query_cache = get_query_embedding_cache()
+        chunk_cache = get_chunk_embedding_cache()
+        # Only report the index once it is open; /metrics should not trigger loading it.
+        vector_index = get_vector_store_collection() if get_vector_store_collection.cache_info().currsize else None
+        keyword_index = get_keyword_index() if get_keyword_index.cache_info().currsize else None
+        reranker = get_reranker() if get_reranker.cache_info().currsize else None
+        retrieval_cache = get_retrieval_cache() if get_retrieval_cache.cache_info().currsize else None
+        answer_cache = get_answer_cache() if get_answer_cache.cache_info().currsize else None
+        return {
+            "query_embedding_cache": query_cache.stats() if query_cache else None,
+            "chunk_embedding_cache": chunk_cache.stats() if chunk_cache else None,
+            "vector_index": vector_index.stats() if vector_index else None,
+            "keyword_index": keyword_index.stats() if keyword_index else None,
+            "rerank_score_cache": reranker.cache.stats() if reranker and reranker.cache else None,
+            "retrieval_cache": retrieval_cache.stats() if retrieval_cache else None,
+            "answer_cache": answer_cache.stats() if answer_cache else None,
+            **metrics_registry.snapshot(),
+        }
+
     return app
 
 
@@ -0,0 +1,19 @@
+from pydantic import BaseModel
+from typing import Any, Dict, List
+from datetime import datetime
+
+class AnswerCacheEntryInfo(BaseModel):
+    """One cached answer and the standalone question it was generated for."""
+    query: str
+    answer: str
+    sources: List[Dict[str, Any]]
+    generation: int
+    created_at: datetime
+    hits: int
+
+class AnswerCacheInspection(BaseModel):
+    stats: Dict[str, Any]
+    entries: List[AnswerCacheEntryInfo]
+
+class AnswerCacheFlushResponse(BaseModel):
+    dropped: int
@@ -1,5 +1,5 @@
-from pydantic import BaseModel
-from typing import List, Optional
+from pydantic import BaseModel, Field
+from typing import Any, Dict, List, Optional
 from datetime import datetime
 
 class SourceInfo(BaseModel):
@@ -17,4 +17,28 @@ class ChatResponse(BaseModel):
     response: str
     sources: List[SourceInfo]
     conversation_id: str
-    timestamp: Optional[datetime]
\ No newline at end of file
+    timestamp: Optional[datetime]
+
+class ChatBatchQuestion(BaseModel):
+    message: str
+    id: Optional[str] = Field(None, description="Caller-supplied identifier echoed back in the result")
+
+class ChatBatchRequest(BaseModel):
+    questions: List[ChatBatchQuestion] = Field(..., min_length=1)
+    max_concurrency: Optional[int] = Field(None, ge=1, description="Concurrent LLM generations (defaults to CHAT_BATCH_MAX_CONCURRENCY)")
+
+class ChatBatchTimings(BaseModel):
+    """Per-question timings in milliseconds; retrieval is shared by the whole batch."""
+    retrieval_ms: float
+    queue_ms: float
+    generation_ms: float
+    total_ms: float
+
+class ChatBatchResult(BaseModel):
+    """One NDJSON line of a /chat/batch response."""
+    index: int
+    id: Optional[str] = None
+    response: Optional[str] = None
+    sources: List[SourceInfo] = []
+    error: Optional[Dict[str, Any]] = None
+    timings: ChatBatchTimings
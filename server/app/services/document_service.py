@@ -1,3 +1,4 @@
+import asyncio
 from datetime import datetime
 from pathlib import Path
 from typing import List, Dict, Any, Tuple, Optional
@@ -6,10 +7,14 @@ from fastapi import HTTPException, UploadFile
 
 from app.core.config import settings
 from app.infra.document_loader import (
-    process_uploaded_file,
+    iter_uploaded_file_chunks,
     validate_file_upload,
     extract_text_from_pdf,
 )
+from app.infra.bm25 import BM25Index
+from app.infra.document_catalog import DocumentCatalog
+from app.infra.embedding_cache import ChunkEmbeddingCache
+from app.infra.embeddings import parse_length_buckets
 from app.infra.vector_store import (
     add_documents_to_vector_store,
     list_indexed_documents,
@@ -28,10 +33,21 @@ from app.services.storage_service import StorageService
 class DocumentService:
     """Service for document storage and indexing."""
 
-    def __init__(self, storage: StorageService, collection, embedding_model) -> None:
+    def __init__(
+        self,
+        storage: StorageService,
+        collection,
+        embedding_model,
+        embedding_cache: Optional[ChunkEmbeddingCache] = None,
+        catalog: Optional[DocumentCatalog] = None,
+        keyword_index: Optional[BM25Index] = None,
+    ) -> None:
         self._storage = storage
         self._collection = collection
         self._embedding_model = embedding_model
+        self._embedding_cache = embedding_cache
+        self._catalog = catalog
+        self._keyword_index = keyword_index
 
     def list_files(self) -> List[DocumentInfo]:
         """List documents in local storage."""
@@ -56,9 +72,20 @@ class DocumentService:
             )
         return docs
 
-    def list_indexed_documents(self) -> List[IndexedDocumentInfo]:
-        """List indexed documents aggregated by source filename."""
-        raw_indexed = list_indexed_documents(self._collection)
+    @property
+    def catalog_version(self) -> Optional[int]:
+        """Version of the indexed-document catalog, bumped on every index change."""
+        return self._catalog.version if self._catalog is not None else None
+
+    def list_indexed_documents(
+        self,
+        offset: int = 0,
+        limit: Optional[int] = None,
+    ) -> Tuple[List[IndexedDocumentInfo], int]:
+        """List one page of indexed documents aggregated by source filename, plus the total count."""
+        raw_indexed, total = list_indexed_documents(
+            self._collection, catalog=self._catalog, offset=offset, limit=limit
+        )
         indexed_docs: List[IndexedDocumentInfo] = []
 
         for item in raw_indexed:
@@ -75,11 +102,13 @@ class DocumentService:
                 )
             )
 
-        return indexed_docs
+        return indexed_docs, total
 
     def remove_indexed_document(self, source: str) -> IndexedDocumentDeleteResponse:
         """Remove all indexed chunks for a document source."""
-        deleted_chunks = delete_documents_by_source(self._collection, source)
+        deleted_chunks = delete_documents_by_source(
+            self._collection, source, catalog=self._catalog, keyword_index=self._keyword_index
+        )
         return IndexedDocumentDeleteResponse(
             source=source,
             deleted_chunks=deleted_chunks,
@@ -130,29 +159,47 @@ class DocumentService:
             filename=effective_filename,
         )
 
-        documents = process_uploaded_file(
+        documents = iter_uploaded_file_chunks(
             file_content=file_content,
             filename=effective_filename,
             chunk_size=settings.CHUNK_SIZE,
             chunk_overlap=settings.CHUNK_OVERLAP,
         )
 
-        if not documents:
-            raise HTTPException(
-                status_code=400,
-                detail="No content could be extracted from the file",
+        def report_progress(progress: Dict[str, int]) -> None:
+            print(
+                f"Indexing {effective_filename}: batch {progress['batches']} committed "
+                f"({progress['total']} chunks seen, {progress['added']} written)"
             )
 
-        add_documents_to_vector_store(
+        # Chunks are encoded and written batch by batch in a worker thread so the event loop keeps serving requests.
+        write_stats = await asyncio.to_thread(
+            add_documents_to_vector_store,
             documents,
             self._collection,
             self._embedding_model,
+            embedding_cache=self._embedding_cache,
+            length_buckets=parse_length_buckets(settings.EMBEDDING_LENGTH_BUCKETS),
+            catalog=self._catalog,
+            batch_size=settings.VECTOR_WRITE_BATCH_SIZE,
+            on_batch=report_progress,
+            keyword_index=self._keyword_index,
         )
 
+        if not write_stats["total"]:
+            raise HTTPException(
+                status_code=400,
+                detail="No content could be extracted from the file",
+            )
+
         return DocumentIndexResponse(
-            message=f"Successfully indexed {len(documents)} document chunks",
+            message=(
+                f"Successfully indexed {write_stats['total']} document chunks "
+                f"({write_stats['added']} new, {write_stats['unchanged']} unchanged, "
+                f"{write_stats['deleted']} removed)"
+            ),
             filename=effective_filename,
-            chunks_count=len(documents),
+            chunks_count=write_stats["total"],
             file_path=file_path,
         )
 
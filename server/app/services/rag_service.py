@@ -1,9 +1,18 @@
-from dataclasses import dataclass
+import asyncio
+import time
+from dataclasses import dataclass, field
 from datetime import datetime, timezone
-from typing import List, Any, Optional, Dict, Union
+from typing import List, Any, AsyncIterator, Optional, Dict, Union
 
 from app.core.config import settings
-from app.infra.rag_engine import rag_pipeline
+from app.infra.answer_cache import SemanticAnswerCache
+from app.infra.bm25 import BM25Index
+from app.infra.embedding_cache import QueryEmbeddingCache
+from app.infra.embeddings import generate_embedding
+from app.infra.query_batcher import QueryBatcher
+from app.infra.rag_engine import rag_pipeline, retrieve_relevant_context, retrieve_relevant_context_batch
+from app.infra.reranker import CrossEncoderReranker
+from app.infra.retrieval_cache import RetrievalResultCache
 
 
 @dataclass
@@ -14,6 +23,16 @@ class RAGResult:
     timestamp: datetime
 
 
+@dataclass
+class RAGBatchItem:
+    """One answer from `RAGService.answer_many`, or the error that prevented it."""
+
+    index: int
+    result: Optional[RAGResult] = None
+    error: Optional[Exception] = None
+    timings: Dict[str, float] = field(default_factory=dict)
+
+
 class RAGService:
     """Orchestrates the RAG pipeline."""
 
@@ -24,12 +43,33 @@ class RAGService:
         llm_client: Any,
         top_k: int | None = None,
         temperature: float | None = None,
+        query_cache: Optional[QueryEmbeddingCache] = None,
+        query_batcher: Optional[QueryBatcher] = None,
+        keyword_index: Optional[BM25Index] = None,
+        reranker: Optional[CrossEncoderReranker] = None,
+        rerank_candidates: int | None = None,
+        rerank_top_n: int | None = None,
+        retrieval_cache: Optional[RetrievalResultCache] = None,
+        answer_cache: Optional[SemanticAnswerCache] = None,
     ) -> None:
         self._vector_store_collection = vector_store_collection
         self._embedding_model = embedding_model
         self._llm_client = llm_client
         self._top_k = top_k or settings.TOP_K_RETRIEVAL
         self._temperature = temperature or settings.LLM_TEMPERATURE
+        self._query_cache = query_cache
+        self._query_batcher = query_batcher
+        self._keyword_index = keyword_index
+        self._reranker = reranker
+        self._rerank_top_n = rerank_top_n or settings.RERANK_TOP_N
+        self._retrieval_cache = retrieval_cache
+        self._answer_cache = answer_cache
+        # With a reranker, over-fetch candidates and let it pick the chunks that reach the prompt.
+        self._retrieval_k = (rerank_candidates or settings.RERANK_CANDIDATES) if reranker is not None else self._top_k
+
+    @property
+    def answer_cache(self) -> Optional[SemanticAnswerCache]:
+        return self._answer_cache
 
     async def answer_question(
         self, 
@@ -40,6 +80,10 @@ class RAGService:
     ) -> RAGResult:
         """
         Run the RAG pipeline for a query and return a structured result.
+
+        Standalone questions (no conversation history, no context requested)
+        are answered from the semantic answer cache when a near-duplicate was
+        answered since the index last changed.
         
         Args:
             query: The user's question
@@ -47,18 +91,175 @@ class RAGService:
             return_context: If True, includes context_chunks in the result for evaluation
             api_base_url: Base URL for generating source document links
         """
-        result = rag_pipeline(
+        answer_cache = self._answer_cache if not conversation_history and not return_context else None
+        if answer_cache is not None:
+            generation = answer_cache.generation()
+            query_embedding = await asyncio.to_thread(
+                generate_embedding, query, self._embedding_model, self._query_cache
+            )
+            cached = answer_cache.get(query_embedding, api_base_url, generation)
+            if cached is not None:
+                entry, _ = cached
+                return RAGResult(
+                    text=entry.answer,
+                    sources=list(entry.sources),
+                    conversation_id="",
+                    timestamp=datetime.now(timezone.utc),
+                )
+
+        context_chunks = await self._retrieve(query)
+
+        # The pipeline blocks on the LLM call, so keep it off the event loop.
+        result = await asyncio.to_thread(
+            rag_pipeline,
             query=query,
             vector_store_collection=self._vector_store_collection,
             embedding_model=self._embedding_model,
             llm_client=self._llm_client,
-            top_k=self._top_k,
+            top_k=self._retrieval_k,
             temperature=self._temperature,
             conversation_history=conversation_history,
             return_context=return_context,
             api_base_url=api_base_url,
+            query_cache=self._query_cache,
+            context_chunks=context_chunks,
+            keyword_index=self._keyword_index,
+            reranker=self._reranker,
+            rerank_top_n=self._rerank_top_n,
+        )
+
+        rag_result = self._to_rag_result(result, return_context)
+        if answer_cache is not None and rag_result.text:
+            answer_cache.put(query, query_embedding, rag_result.text, rag_result.sources, api_base_url, generation)
+        return rag_result
+
+    async def _retrieve(self, query: str) -> Optional[List[Dict[str, Any]]]:
+        """
+        Retrieve context through the result cache and the query batcher.
+
+        Returns None when neither is configured, leaving retrieval to the pipeline.
+        """
+        cache = self._retrieval_cache
+        if cache is None:
+            if self._query_batcher is not None:
+                return await self._query_batcher.search(query, self._retrieval_k)
+            return None
+
+        generation = cache.generation()
+        cached = cache.get(query, self._retrieval_k, generation)
+        if cached is not None:
+            return cached
+
+        started = time.perf_counter()
+        if self._query_batcher is not None:
+            context_chunks = await self._query_batcher.search(query, self._retrieval_k)
+        else:
+            context_chunks = await asyncio.to_thread(
+                retrieve_relevant_context,
+                query,
+                self._vector_store_collection,
+                self._embedding_model,
+                self._retrieval_k,
+                query_cache=self._query_cache,
+                keyword_index=self._keyword_index,
+            )
+        cache.put(query, self._retrieval_k, generation, context_chunks, (time.perf_counter() - started) * 1000.0)
+        return context_chunks
+
+    async def _retrieve_many(self, queries: List[str]) -> List[List[Dict[str, Any]]]:
+        """Retrieve context for several queries; cache misses share one batched retrieval."""
+        cache = self._retrieval_cache
+        generation = cache.generation() if cache is not None else None
+        contexts: List[Optional[List[Dict[str, Any]]]] = [
+            cache.get(query, self._retrieval_k, generation) if cache is not None else None
+            for query in queries
+        ]
+        missing = [index for index, context in enumerate(contexts) if context is None]
+        if not missing:
+            return contexts
+
+        started = time.perf_counter()
+        retrieved = await asyncio.to_thread(
+            retrieve_relevant_context_batch,
+            [queries[index] for index in missing],
+            self._vector_store_collection,
+            self._embedding_model,
+            self._retrieval_k,
+            query_cache=self._query_cache,
+            keyword_index=self._keyword_index,
         )
+        per_query_ms = (time.perf_counter() - started) * 1000.0 / len(missing)
+        for index, context_chunks in zip(missing, retrieved):
+            contexts[index] = context_chunks
+            if cache is not None:
+                cache.put(queries[index], self._retrieval_k, generation, context_chunks, per_query_ms)
+        return contexts
+
+    async def answer_many(
+        self,
+        queries: List[str],
+        api_base_url: str = "http://localhost:8000",
+        max_concurrency: int | None = None,
+    ) -> AsyncIterator[RAGBatchItem]:
+        """
+        Answer several standalone questions, yielding each result as soon as it completes.
+
+        Questions missing from the retrieval cache are embedded in one call and
+        retrieved with one multi-query vector search (plus BM25 when hybrid
+        search is enabled); LLM generations
+        then run with at most `max_concurrency` in flight. Results arrive in
+        completion order and carry their input index and per-item timings.
+        """
+        if not queries:
+            return
+
+        batch_started = time.perf_counter()
+        contexts = await self._retrieve_many(queries)
+        retrieval_ms = (time.perf_counter() - batch_started) * 1000.0
+        semaphore = asyncio.Semaphore(max(max_concurrency or settings.CHAT_BATCH_MAX_CONCURRENCY, 1))
+
+        async def answer(index: int) -> RAGBatchItem:
+            queued_at = time.perf_counter()
+            async with semaphore:
+                generation_started = time.perf_counter()
+                try:
+                    result = await asyncio.to_thread(
+                        rag_pipeline,
+                        query=queries[index],
+                        vector_store_collection=self._vector_store_collection,
+                        embedding_model=self._embedding_model,
+                        llm_client=self._llm_client,
+                        top_k=self._retrieval_k,
+                        temperature=self._temperature,
+                        api_base_url=api_base_url,
+                        context_chunks=contexts[index],
+                        reranker=self._reranker,
+                        rerank_top_n=self._rerank_top_n,
+                    )
+                    item = RAGBatchItem(index=index, result=self._to_rag_result(result, False))
+                except Exception as exc:
+                    item = RAGBatchItem(index=index, error=exc)
+                finished = time.perf_counter()
+
+            item.timings = {
+                "retrieval_ms": round(retrieval_ms, 2),
+                "queue_ms": round((generation_started - queued_at) * 1000.0, 2),
+                "generation_ms": round((finished - generation_started) * 1000.0, 2),
+                "total_ms": round((finished - batch_started) * 1000.0, 2),
+            }
+            return item
+
+        tasks = [asyncio.create_task(answer(index)) for index in range(len(queries))]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            # Stop outstanding generations if the consumer goes away (e.g. client disconnect).
+            for task in tasks:
+                task.cancel()
 
+    @staticmethod
+    def _to_rag_result(result: Any, return_context: bool) -> RAGResult:
         timestamp = datetime.now(timezone.utc)
         
         # Extract sources - now returns SourceInfo dicts
@@ -75,4 +276,4 @@ class RAGService:
         if return_context and isinstance(result, dict) and "context_chunks" in result:
             rag_result.context_chunks = result["context_chunks"]
         
-        return rag_result
\ No newline at end of file
+        return rag_result
@@ -0,0 +1 @@
+"""Runnable benchmarks and checks for the server (run from the `server` directory)."""
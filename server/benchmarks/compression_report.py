@@ -0,0 +1,156 @@
+"""
+Recall@k versus memory for compressed vector storage options.
+
+Usage (from the `server` directory):
+    python -m benchmarks.compression_report [--chunks 5000] [--queries 200] [--k 12] [--random]
+
+For each option the report gives bytes per stored vector and recall@k against
+exact full-precision search, both without and with re-scoring the top
+k * rescore_factor candidates against the full vectors kept on disk.
+`--random` uses clustered synthetic vectors instead of encoding archive text.
+"""
+import argparse
+import json
+from typing import Callable, Dict, List, Tuple
+
+import numpy as np
+
+from app.core.config import settings
+from app.infra.vector_compression import PCAProjector, TruncationProjector
+
+
+class ScalarQuantizer:
+    """
+    int8 scalar quantization with per-dimension scale and offset, for comparison only.
+
+    Each dimension's observed [min, max] range is mapped onto [-127, 127].
+    """
+
+    def __init__(self) -> None:
+        self.offset = None
+        self.scale = None
+
+    def fit(self, vectors: np.ndarray) -> None:
+        vectors = np.asarray(vectors, dtype=np.float32)
+        low = vectors.min(axis=0)
+        high = vectors.max(axis=0)
+        self.offset = (high + low) / 2.0
+        self.scale = np.clip((high - low) / 254.0, 1e-12, None).astype(np.float32)
+
+    def encode(self, vectors: np.ndarray) -> np.ndarray:
+        codes = np.rint((np.asarray(vectors, dtype=np.float32) - self.offset) / self.scale)
+        return np.clip(codes, -127, 127).astype(np.int8)
+
+    def decode(self, codes: np.ndarray) -> np.ndarray:
+        return (codes.astype(np.float32) * self.scale + self.offset).astype(np.float32)
+
+
+def _clustered_vectors(count: int, dim: int, rng: np.random.Generator) -> np.ndarray:
+    centers = rng.standard_normal((max(count // 50, 1), dim)).astype(np.float32)
+    vectors = centers[rng.integers(0, len(centers), count)] + 0.5 * rng.standard_normal((count, dim)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def _load_vectors(args: argparse.Namespace) -> Tuple[np.ndarray, np.ndarray]:
+    if args.random:
+        rng = np.random.default_rng(0)
+        corpus = _clustered_vectors(args.chunks + args.queries, 384, rng)
+        return corpus[:args.chunks], corpus[args.chunks:]
+
+    from app.infra.embeddings import generate_embeddings, initialize_embedding_model
+    from benchmarks.synthetic import archive_chunks, archive_questions
+
+    model = initialize_embedding_model(settings.EMBEDDING_MODEL, backend=settings.EMBEDDING_BACKEND)
+    corpus = generate_embeddings(archive_chunks(args.chunks), model)
+    queries = generate_embeddings(archive_questions(args.queries, seed=1), model)
+    return corpus, queries
+
+
+def _top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    k = min(k, scores.shape[1])
+    idx = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    order = np.argsort(-np.take_along_axis(scores, idx, axis=1), axis=1)
+    return np.take_along_axis(idx, order, axis=1)
+
+
+def _recall(approx: np.ndarray, exact: np.ndarray) -> float:
+    hits = sum(len(set(a) & set(e)) for a, e in zip(approx, exact))
+    return hits / exact.size
+
+
+def _rescored(candidates: np.ndarray, corpus: np.ndarray, queries: np.ndarray, k: int) -> np.ndarray:
+    out = np.empty((len(queries), k), dtype=np.int64)
+    for q, cand in enumerate(candidates):
+        scores = corpus[cand] @ queries[q]
+        out[q] = cand[np.argsort(-scores)[:k]]
+    return out
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chunks", type=int, default=5000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=settings.TOP_K_RETRIEVAL)
+    parser.add_argument("--rescore-factor", type=int, default=settings.VECTOR_RESCORE_FACTOR)
+    parser.add_argument("--dims", default="64,128,192")
+    parser.add_argument("--random", action="store_true")
+    args = parser.parse_args()
+
+    corpus, queries = _load_vectors(args)
+    dim = corpus.shape[1]
+    k = args.k
+    exact = _top_k(queries @ corpus.T, k)
+
+    options: Dict[str, Tuple[int, Callable[[], Tuple[np.ndarray, np.ndarray]]]] = {}
+
+    quantizer = ScalarQuantizer()
+    quantizer.fit(corpus)
+    options["int8"] = (dim, lambda: (quantizer.decode(quantizer.encode(corpus)), queries))
+
+    for d in (int(x) for x in args.dims.split(",")):
+        if d >= dim:
+            continue
+        trunc = TruncationProjector(d)
+        options[f"truncate-{d}"] = (d * 4, lambda p=trunc: (p.project(corpus), p.project(queries)))
+        pca = PCAProjector(d)
+        pca.fit(corpus)
+        options[f"pca-{d}"] = (d * 4, lambda p=pca: (p.project(corpus), p.project(queries)))
+        pca_q = ScalarQuantizer()
+        projected = pca.project(corpus)
+        pca_q.fit(projected)
+        options[f"pca-{d}+int8"] = (
+            d, lambda p=pca, q=pca_q, c=projected: (q.decode(q.encode(c)), p.project(queries))
+        )
+
+    rows: List[Dict[str, object]] = [{
+        "option": "float32-full",
+        "bytes_per_vector": dim * 4,
+        "index_mb": round(corpus.shape[0] * dim * 4 / 2**20, 2),
+        "recall": 1.0,
+        "recall_rescored": 1.0,
+    }]
+    for name, (bytes_per_vector, build) in options.items():
+        stored, projected_queries = build()
+        scores = projected_queries @ stored.T
+        approx = _top_k(scores, k)
+        candidates = _top_k(scores, k * args.rescore_factor)
+        rows.append({
+            "option": name,
+            "bytes_per_vector": bytes_per_vector,
+            "index_mb": round(corpus.shape[0] * bytes_per_vector / 2**20, 2),
+            "recall": round(_recall(approx, exact), 4),
+            "recall_rescored": round(_recall(_rescored(candidates, corpus, queries, k), exact), 4),
+        })
+
+    print(json.dumps({
+        "chunks": int(corpus.shape[0]),
+        "queries": int(queries.shape[0]),
+        "k": k,
+        "rescore_factor": args.rescore_factor,
+        "full_vectors_on_disk_mb": round(corpus.nbytes / 2**20, 2),
+        "options": rows,
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
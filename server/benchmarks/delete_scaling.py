@@ -0,0 +1,81 @@
+"""
+Show that deleting one document scales with its chunk count, not the archive size.
+
+Usage (from the `server` directory):
+    python -m benchmarks.delete_scaling [--sizes 1000,10000,50000] [--chunks-per-source 100]
+
+For each archive size a throw-away Chroma collection is filled with random
+vectors spread over sources of `--chunks-per-source` chunks, then one source is
+deleted with the full-scan approach (read every metadata row and filter in
+Python) and with `delete_documents_by_source` (filter pushed down to the store).
+"""
+import argparse
+import json
+import shutil
+import tempfile
+import time
+from typing import Any, Dict
+
+import chromadb
+import numpy as np
+
+from app.infra.vector_store import delete_documents_by_source
+
+
+def _full_scan_delete(collection: Any, source: str) -> int:
+    results = collection.get(include=["metadatas"])
+    ids = [
+        chunk_id
+        for chunk_id, metadata in zip(results["ids"], results["metadatas"])
+        if isinstance(metadata, dict) and metadata.get("source") == source
+    ]
+    if ids:
+        collection.delete(ids=ids)
+    return len(ids)
+
+
+def _fill(collection: Any, size: int, chunks_per_source: int, batch: int) -> None:
+    rng = np.random.default_rng(size)
+    for start in range(0, size, batch):
+        end = min(start + batch, size)
+        collection.add(
+            ids=[f"chunk-{i}" for i in range(start, end)],
+            embeddings=rng.standard_normal((end - start, 32), dtype=np.float32),
+            metadatas=[{"source": f"doc-{i // chunks_per_source}.pdf", "chunk_index": i % chunks_per_source} for i in range(start, end)],
+            documents=["chunk text"] * (end - start),
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="1000,10000,50000")
+    parser.add_argument("--chunks-per-source", type=int, default=100)
+    args = parser.parse_args()
+
+    rows = []
+    for size in (int(x) for x in args.sizes.split(",")):
+        directory = tempfile.mkdtemp(prefix="delete-scaling-")
+        try:
+            client = chromadb.PersistentClient(path=directory)
+            collection = client.get_or_create_collection(name="documents")
+            batch = client.get_max_batch_size() if hasattr(client, "get_max_batch_size") else 5000
+            _fill(collection, size, args.chunks_per_source, batch)
+
+            timings: Dict[str, float] = {}
+            for name, delete, source in (
+                ("full_scan_ms", _full_scan_delete, "doc-0.pdf"),
+                ("pushed_down_ms", delete_documents_by_source, "doc-1.pdf"),
+            ):
+                started = time.perf_counter()
+                deleted = delete(collection, source)
+                timings[name] = round((time.perf_counter() - started) * 1000.0, 2)
+                assert deleted == min(args.chunks_per_source, size), (name, deleted)
+            rows.append({"archive_chunks": size, **timings})
+        finally:
+            shutil.rmtree(directory, ignore_errors=True)
+
+    print(json.dumps({"chunks_per_source": args.chunks_per_source, "results": rows}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Compare the memory and latency of handing embeddings to the vector store as
+nested Python lists (the old `.tolist()` path) versus contiguous float32 arrays.
+
+Usage (from the `server` directory):
+    python -m benchmarks.embedding_memory [--chunks 10000] [--dim 384] [--chroma]
+
+By default synthetic normalized vectors are used so no model is needed;
+`--chroma` additionally times `collection.add` into an in-memory Chroma client.
+"""
+import argparse
+import json
+import time
+import tracemalloc
+import uuid
+from typing import Any, Callable, Dict
+
+import numpy as np
+
+
+def _measure(fn: Callable[[], Any]) -> Dict[str, float]:
+    tracemalloc.start()
+    started = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return {"seconds": elapsed, "peak_mb": peak / (1024 * 1024)}
+
+
+def _add_to_chroma(embeddings: Any, count: int) -> None:
+    import chromadb
+
+    client = chromadb.EphemeralClient()
+    collection = client.get_or_create_collection(name=f"bench-{uuid.uuid4().hex}")
+    batch = client.get_max_batch_size() if hasattr(client, "get_max_batch_size") else 5000
+    for start in range(0, count, batch):
+        end = min(start + batch, count)
+        collection.add(
+            ids=[str(i) for i in range(start, end)],
+            embeddings=embeddings[start:end],
+            documents=["chunk"] * (end - start),
+        )
+    client.delete_collection(collection.name)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chunks", type=int, default=10_000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--chroma", action="store_true", help="Also time collection.add for both paths")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    encoder_output = rng.standard_normal((args.chunks, args.dim), dtype=np.float32)
+    encoder_output /= np.linalg.norm(encoder_output, axis=1, keepdims=True)
+
+    report: Dict[str, Any] = {"chunks": args.chunks, "dim": args.dim}
+    report["list_conversion"] = _measure(lambda: encoder_output.tolist())
+    report["array_conversion"] = _measure(lambda: np.ascontiguousarray(encoder_output, dtype=np.float32))
+
+    if args.chroma:
+        as_lists = encoder_output.tolist()
+        report["list_chroma_add"] = _measure(lambda: _add_to_chroma(as_lists, args.chunks))
+        del as_lists
+        report["array_chroma_add"] = _measure(lambda: _add_to_chroma(encoder_output, args.chunks))
+
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
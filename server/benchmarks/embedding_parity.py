@@ -0,0 +1,75 @@
+"""
+Check that the ONNX Runtime embedding backend agrees with the torch path.
+
+Usage (from the `server` directory):
+    python -m benchmarks.embedding_parity [--model all-MiniLM-L6-v2] [--quantize]
+
+Exits with status 1 when the minimum cosine similarity between the two
+backends' vectors falls below the threshold. The same check runs in the
+test suite as tests/test_embedding_parity.py.
+"""
+import argparse
+import sys
+import time
+
+import numpy as np
+
+from app.infra.embeddings import initialize_embedding_model
+
+
+PARITY_THRESHOLD = 0.999
+QUANTIZED_PARITY_THRESHOLD = 0.98
+
+SAMPLE_TEXTS = [
+    "When was the treaty signed?",
+    "what year was the treaty signed",
+    "The Treaty of Wuchale was signed on 2 May 1889 between Italy and Ethiopia.",
+    "Emperor Menelik II led the Ethiopian forces at the Battle of Adwa in 1896.",
+    "Page 52",
+    "The archive contains correspondence from the colonial administration, "
+    "including dispatches, petitions and annotated maps of the frontier regions. " * 4,
+    "Ye olde parish registers record baptisms, marriages and burials from 1538 onward.",
+    "",
+]
+
+
+def cosine_rows(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    a = a / np.clip(np.linalg.norm(a, axis=1, keepdims=True), 1e-12, None)
+    b = b / np.clip(np.linalg.norm(b, axis=1, keepdims=True), 1e-12, None)
+    return (a * b).sum(axis=1)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", default="all-MiniLM-L6-v2")
+    parser.add_argument("--quantize", action="store_true", help="Compare the int8 quantized ONNX variant")
+    parser.add_argument("--threshold", type=float, default=None, help=f"Minimum acceptable cosine (default {PARITY_THRESHOLD}, {QUANTIZED_PARITY_THRESHOLD} with --quantize)")
+    args = parser.parse_args()
+    threshold = args.threshold if args.threshold is not None else (QUANTIZED_PARITY_THRESHOLD if args.quantize else PARITY_THRESHOLD)
+
+    torch_backend = initialize_embedding_model(args.model, backend="torch")
+    onnx_backend = initialize_embedding_model(args.model, backend="onnx", quantize=args.quantize)
+
+    started = time.perf_counter()
+    torch_vectors = np.asarray(torch_backend.encode(SAMPLE_TEXTS), dtype=np.float32)
+    torch_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    onnx_vectors = np.asarray(onnx_backend.encode(SAMPLE_TEXTS), dtype=np.float32)
+    onnx_seconds = time.perf_counter() - started
+
+    cosines = cosine_rows(torch_vectors, onnx_vectors)
+    print(f"torch:  {torch_backend.name} ({torch_seconds * 1000:.1f} ms)")
+    print(f"onnx:   {onnx_backend.name} ({onnx_seconds * 1000:.1f} ms)")
+    print(f"cosine: min={cosines.min():.5f} mean={cosines.mean():.5f} threshold={threshold}")
+
+    if cosines.min() < threshold:
+        worst = int(np.argmin(cosines))
+        print(f"FAIL: text #{worst} disagrees ({cosines[worst]:.5f}): {SAMPLE_TEXTS[worst][:80]!r}")
+        return 1
+    print("OK")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,293 @@
+"""
+Embedding throughput and latency benchmark.
+
+Usage (from the `server` directory):
+    python -m benchmarks.embedding_throughput [--backends torch,onnx] [--batch-sizes 1,16,64]
+        [--threads 1,4] [--lengths 64,500] [--output results.json]
+    python -m benchmarks.embedding_throughput --pool-workers 1,2,4 [--backends onnx]
+    python -m benchmarks.embedding_throughput --compare old.json new.json
+
+Every (backend, threads) configuration runs in a fresh process so thread
+settings and peak RSS are isolated. For each configuration the benchmark
+measures texts/sec of `generate_embeddings` per (text length, batch size) and
+p50/p95 latency of single-query `generate_embedding`. Results are written as
+JSON tagged with the git commit so runs can be compared across commits.
+
+With `--pool-workers`, the ingestion worker pool is also timed on write
+batches of VECTOR_WRITE_BATCH_SIZE for each worker count, and the report flags
+whether throughput at the largest count beat a single worker by at least half
+the ideal speedup. The pool needs the real model in the local cache.
+
+The run is offline: the model must already be in the local Hugging Face cache.
+When it is not, a tiny hashing stand-in model is used and the results are
+marked with "stand_in": true.
+"""
+import argparse
+import hashlib
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List
+
+import numpy as np
+
+from app.core.config import settings
+
+
+class HashingStandInModel:
+    """Deterministic bag-of-hashed-tokens encoder used when no model is cached locally."""
+
+    def __init__(self, dim: int = 384) -> None:
+        self._dim = dim
+        self.name = f"hashing-stand-in-{dim}"
+
+    def encode(self, texts: List[str], batch_size: int = 32) -> np.ndarray:
+        out = np.zeros((len(texts), self._dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for token in text.lower().split():
+                digest = hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest()
+                out[row, int.from_bytes(digest[:4], "little") % self._dim] += 1.0 if digest[4] & 1 else -1.0
+        norms = np.linalg.norm(out, axis=1, keepdims=True)
+        return out / np.clip(norms, 1e-12, None)
+
+    def get_sentence_embedding_dimension(self) -> int:
+        return self._dim
+
+
+def _texts_of_length(count: int, length: int, seed: int) -> List[str]:
+    from benchmarks.synthetic import archive_page
+    import random
+
+    rng = random.Random(seed)
+    texts = []
+    for _ in range(count):
+        text = archive_page(rng, 1, 8)
+        while len(text) < length:
+            text += " " + archive_page(rng, 1, 4)
+        texts.append(text[:length])
+    return texts
+
+
+def _peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is KiB on Linux and bytes on macOS.
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def _run_config(config: Dict[str, Any]) -> Dict[str, Any]:
+    """Run one (backend, threads) configuration; executed in a child process."""
+    os.environ["HF_HUB_OFFLINE"] = "1"
+    os.environ["TRANSFORMERS_OFFLINE"] = "1"
+    from app.infra.embeddings import generate_embedding, generate_embeddings, initialize_embedding_model
+
+    stand_in = False
+    load_started = time.perf_counter()
+    try:
+        model = initialize_embedding_model(
+            config["model"],
+            backend=config["backend"],
+            quantize=config["quantize"],
+            num_threads=config["threads"],
+        )
+    except Exception as exc:
+        if not config["allow_stand_in"]:
+            return {**config, "error": str(exc)}
+        model = HashingStandInModel()
+        stand_in = True
+    load_seconds = time.perf_counter() - load_started
+
+    throughput = []
+    for length in config["lengths"]:
+        texts = _texts_of_length(config["texts"], length, seed=length)
+        generate_embeddings(texts[:4], model)  # warm-up
+        for batch_size in config["batch_sizes"]:
+            started = time.perf_counter()
+            for start in range(0, len(texts), batch_size):
+                generate_embeddings(texts[start:start + batch_size], model)
+            elapsed = time.perf_counter() - started
+            throughput.append({
+                "text_length": length,
+                "batch_size": batch_size,
+                "texts_per_sec": round(len(texts) / elapsed, 2),
+            })
+
+    queries = _texts_of_length(config["latency_queries"], 60, seed=7)
+    latencies = []
+    for query in queries:
+        started = time.perf_counter()
+        generate_embedding(query, model)
+        latencies.append((time.perf_counter() - started) * 1000.0)
+
+    return {
+        **config,
+        "model_id": getattr(model, "name", config["model"]),
+        "stand_in": stand_in,
+        "load_seconds": round(load_seconds, 3),
+        "throughput": throughput,
+        "single_query_ms": {
+            "p50": round(float(np.percentile(latencies, 50)), 3),
+            "p95": round(float(np.percentile(latencies, 95)), 3),
+        },
+        "peak_rss_mb": round(_peak_rss_mb(), 1),
+    }
+
+
+def _run_pool_scaling(
+    model_name: str,
+    backend: str,
+    quantize: bool,
+    worker_counts: List[int],
+    texts: List[str],
+) -> Dict[str, Any]:
+    """Time `EmbeddingWorkerPool` ingestion per worker count, in write batches as document_service sends them."""
+    from app.infra.embedding_pool import EmbeddingWorkerPool
+
+    write_batch = settings.VECTOR_WRITE_BATCH_SIZE
+    rows = []
+    for workers in worker_counts:
+        pool = EmbeddingWorkerPool(
+            model_name,
+            num_workers=workers,
+            backend=backend,
+            quantize=quantize,
+            threads_per_worker=settings.EMBEDDING_WORKER_THREADS,
+            shard_size=settings.EMBEDDING_WORKER_SHARD_SIZE,
+        )
+        try:
+            # Load the model in every worker before timing.
+            pool.encode(texts[:workers * 2])
+            started = time.perf_counter()
+            for start in range(0, len(texts), write_batch):
+                pool.encode(texts[start:start + write_batch])
+            elapsed = time.perf_counter() - started
+        except Exception as exc:
+            return {"error": str(exc), "results": rows}
+        finally:
+            pool.shutdown()
+        rows.append({"workers": workers, "texts_per_sec": round(len(texts) / elapsed, 2)})
+
+    baseline = next((row for row in rows if row["workers"] == 1), rows[0])
+    for row in rows:
+        row["speedup"] = round(row["texts_per_sec"] / baseline["texts_per_sec"], 2)
+    largest = max(rows, key=lambda row: row["workers"])
+    ideal = largest["workers"] / baseline["workers"]
+    scales = ideal <= 1 or largest["speedup"] >= 1 + (ideal - 1) / 2
+    if not scales:
+        print(
+            f"Warning: {largest['workers']} embedding workers reached {largest['speedup']}x "
+            f"of {baseline['workers']} worker(s); the pool is not scaling"
+        )
+    return {"write_batch_size": write_batch, "texts": len(texts), "results": rows, "scales": scales}
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True).strip()
+    except Exception:
+        return "unknown"
+
+
+def _compare(old_path: str, new_path: str) -> None:
+    with open(old_path) as f:
+        old = json.load(f)
+    with open(new_path) as f:
+        new = json.load(f)
+
+    def index(report: Dict[str, Any]) -> Dict[tuple, Dict[str, Any]]:
+        rows = {}
+        for result in report["results"]:
+            key = (result["backend"], result["quantize"], result["threads"])
+            for row in result.get("throughput", []):
+                rows[key + ("tps", row["text_length"], row["batch_size"])] = row["texts_per_sec"]
+            if "single_query_ms" in result:
+                rows[key + ("p50_ms",)] = result["single_query_ms"]["p50"]
+                rows[key + ("p95_ms",)] = result["single_query_ms"]["p95"]
+        return rows
+
+    old_rows, new_rows = index(old), index(new)
+    print(f"{old['commit']} -> {new['commit']}")
+    for key in sorted(set(old_rows) & set(new_rows), key=str):
+        before, after = old_rows[key], new_rows[key]
+        change = (after - before) / before * 100 if before else 0.0
+        print(f"{'/'.join(str(part) for part in key):50s} {before:>10.2f} -> {after:>10.2f} ({change:+.1f}%)")
+
+
+def _csv_ints(value: str) -> List[int]:
+    return [int(x) for x in value.split(",") if x.strip()]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", default=settings.EMBEDDING_MODEL)
+    parser.add_argument("--backends", default="torch", help="Comma-separated: torch, onnx, onnx-int8")
+    parser.add_argument("--batch-sizes", default="1,16,64")
+    parser.add_argument("--threads", default=str(os.cpu_count() or 1))
+    parser.add_argument("--lengths", default="64,500", help="Synthetic text lengths in characters")
+    parser.add_argument("--texts", type=int, default=256, help="Texts per throughput run")
+    parser.add_argument("--latency-queries", type=int, default=100)
+    parser.add_argument("--pool-workers", default="", help="Comma-separated worker counts for the pool scaling check")
+    parser.add_argument("--no-stand-in", action="store_true", help="Fail instead of using the stand-in model")
+    parser.add_argument("--output", default=None, help="JSON output path (default: print only)")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"))
+    args = parser.parse_args()
+
+    if args.compare:
+        _compare(*args.compare)
+        return
+
+    configs = []
+    for backend in args.backends.split(","):
+        backend = backend.strip()
+        for threads in _csv_ints(args.threads):
+            configs.append({
+                "model": args.model,
+                "backend": "onnx" if backend.startswith("onnx") else backend,
+                "quantize": backend == "onnx-int8",
+                "threads": threads,
+                "batch_sizes": _csv_ints(args.batch_sizes),
+                "lengths": _csv_ints(args.lengths),
+                "texts": args.texts,
+                "latency_queries": args.latency_queries,
+                "allow_stand_in": not args.no_stand_in,
+            })
+
+    results = []
+    context = multiprocessing.get_context("spawn")
+    for config in configs:
+        with context.Pool(1) as pool:
+            results.append(pool.apply(_run_config, (config,)))
+
+    report = {
+        "commit": _git_commit(),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "machine": {
+            "platform": platform.platform(),
+            "python": platform.python_version(),
+            "cpu_count": os.cpu_count(),
+        },
+        "results": results,
+    }
+    if args.pool_workers:
+        backend = args.backends.split(",")[0].strip()
+        report["pool_scaling"] = _run_pool_scaling(
+            args.model,
+            "onnx" if backend.startswith("onnx") else backend,
+            backend == "onnx-int8",
+            _csv_ints(args.pool_workers),
+            _texts_of_length(max(args.texts, 4 * settings.VECTOR_WRITE_BATCH_SIZE), max(_csv_ints(args.lengths)), seed=11),
+        )
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""
+Recall/latency sweep over HNSW parameters for the documents collection.
+
+Usage (from the `server` directory):
+    python -m benchmarks.hnsw_sweep [--chunks 50000] [--queries 200] [--k 12]
+        [--m 8,16,32] [--construction-ef 100,200] [--search-ef 16,32,64,128] [--space cosine]
+        [--from-db] [--output sweep.json]
+
+Chroma's local index is hnswlib (shipped with chromadb as `chroma-hnswlib`),
+so the sweep drives hnswlib directly: one graph is built per (M,
+construction_ef) pair and queried at every search_ef. Each row reports build
+time, recall@k against exact search and p50/p95 single-query latency. Vectors
+are clustered random unit vectors, or the embeddings already stored in
+VECTOR_DB_PATH with `--from-db`. Pick the smallest search_ef that meets the
+recall target and set VECTOR_HNSW_* accordingly.
+"""
+import argparse
+import json
+import time
+from typing import Any, Dict, List
+
+import hnswlib
+import numpy as np
+
+from app.core.config import settings
+
+
+_HNSWLIB_SPACES = {"cosine": "cosine", "ip": "ip", "l2": "l2"}
+
+
+def _clustered_vectors(count: int, dim: int, rng: np.random.Generator) -> np.ndarray:
+    centers = rng.standard_normal((max(count // 50, 1), dim)).astype(np.float32)
+    vectors = centers[rng.integers(0, len(centers), count)] + 0.5 * rng.standard_normal((count, dim)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def _stored_vectors(limit: int) -> np.ndarray:
+    import chromadb
+
+    client = chromadb.PersistentClient(path=settings.VECTOR_DB_PATH)
+    collection = client.get_collection(name="documents")
+    embeddings = collection.get(include=["embeddings"], limit=limit)["embeddings"]
+    return np.asarray(embeddings, dtype=np.float32)
+
+
+def _sweep(corpus: np.ndarray, queries: np.ndarray, args: argparse.Namespace) -> List[Dict[str, Any]]:
+    scores = queries @ corpus.T
+    exact = np.argpartition(-scores, args.k - 1, axis=1)[:, :args.k]
+    exact_sets = [set(row.tolist()) for row in exact]
+
+    rows = []
+    for m in (int(x) for x in args.m.split(",")):
+        for construction_ef in (int(x) for x in args.construction_ef.split(",")):
+            graph = hnswlib.Index(space=_HNSWLIB_SPACES[args.space], dim=corpus.shape[1])
+            started = time.perf_counter()
+            graph.init_index(max_elements=len(corpus), M=m, ef_construction=construction_ef)
+            graph.add_items(corpus, np.arange(len(corpus)))
+            build_seconds = time.perf_counter() - started
+
+            for search_ef in (int(x) for x in args.search_ef.split(",")):
+                graph.set_ef(max(search_ef, args.k))
+                latencies = []
+                hits = 0
+                for q_idx, query in enumerate(queries):
+                    started = time.perf_counter()
+                    labels, _ = graph.knn_query(query, k=args.k)
+                    latencies.append((time.perf_counter() - started) * 1000)
+                    hits += len(set(labels[0].tolist()) & exact_sets[q_idx])
+                row = {
+                    "M": m,
+                    "construction_ef": construction_ef,
+                    "search_ef": search_ef,
+                    "build_seconds": round(build_seconds, 2),
+                    f"recall@{args.k}": round(hits / (len(queries) * args.k), 4),
+                    "p50_ms": round(float(np.percentile(latencies, 50)), 3),
+                    "p95_ms": round(float(np.percentile(latencies, 95)), 3),
+                }
+                rows.append(row)
+                print(row)
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chunks", type=int, default=50000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--k", type=int, default=settings.TOP_K_RETRIEVAL)
+    parser.add_argument("--m", default="8,16,32")
+    parser.add_argument("--construction-ef", default="100,200")
+    parser.add_argument("--search-ef", default="16,32,64,128")
+    parser.add_argument("--space", default=settings.VECTOR_HNSW_SPACE, choices=sorted(_HNSWLIB_SPACES))
+    parser.add_argument("--from-db", action="store_true", help="use embeddings stored in VECTOR_DB_PATH")
+    parser.add_argument("--output", help="write the report as JSON to this path")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    if args.from_db:
+        vectors = _stored_vectors(args.chunks + args.queries)
+        rng.shuffle(vectors)
+        corpus, queries = vectors[args.queries:], vectors[:args.queries]
+    else:
+        vectors = _clustered_vectors(args.chunks + args.queries, args.dim, rng)
+        corpus, queries = vectors[:args.chunks], vectors[args.chunks:]
+
+    report = {
+        "chunks": len(corpus),
+        "queries": len(queries),
+        "dim": int(corpus.shape[1]),
+        "k": args.k,
+        "space": args.space,
+        "results": _sweep(corpus, queries, args),
+    }
+    if args.output:
+        with open(args.output, "w") as handle:
+            json.dump(report, handle, indent=2)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Measure padding waste and throughput of length-bucketed chunk encoding.
+
+Usage (from the `server` directory):
+    python -m benchmarks.length_bucketing [--chunks 2000] [--buckets "128:128,320:64,640:32"]
+
+Three strategies are compared on synthetic, ingestion-chunked archive text:
+  input_order  fixed-size batches in document order (no length sorting at all)
+  global_sort  one encode call; the encoder sorts by length internally
+  bucketed     generate_embeddings with length buckets and per-bucket batch sizes
+
+Padding waste is the share of token slots in each batch that are padding.
+"""
+import argparse
+import json
+import time
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+
+from app.core.config import settings
+from app.infra.embeddings import generate_embeddings, initialize_embedding_model, parse_length_buckets
+from benchmarks.synthetic import archive_chunks
+
+
+def _token_lengths(texts: List[str], model_name: str) -> np.ndarray:
+    from transformers import AutoTokenizer
+
+    repo_id = model_name if "/" in model_name else f"sentence-transformers/{model_name}"
+    tokenizer = AutoTokenizer.from_pretrained(repo_id)
+    encoded = tokenizer(texts, truncation=True, max_length=256)
+    return np.array([len(ids) for ids in encoded["input_ids"]])
+
+
+def _padding_waste(lengths: np.ndarray, batches: Sequence[Sequence[int]]) -> float:
+    slots = sum(int(lengths[list(batch)].max()) * len(batch) for batch in batches if len(batch))
+    return 1.0 - float(lengths.sum()) / slots if slots else 0.0
+
+
+def _fixed_batches(order: Sequence[int], batch_size: int) -> List[List[int]]:
+    order = list(order)
+    return [order[i:i + batch_size] for i in range(0, len(order), batch_size)]
+
+
+def _bucket_batches(texts: List[str], buckets: List[Tuple[int, int]]) -> List[List[int]]:
+    bounds = [max_chars for max_chars, _ in buckets]
+    groups: List[List[int]] = [[] for _ in buckets]
+    for idx, text in enumerate(texts):
+        groups[min(int(np.searchsorted(bounds, len(text))), len(bounds) - 1)].append(idx)
+    batches: List[List[int]] = []
+    for (_, batch_size), indices in zip(buckets, groups):
+        indices.sort(key=lambda i: len(texts[i]))
+        batches.extend(_fixed_batches(indices, batch_size))
+    return batches
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chunks", type=int, default=2000)
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--buckets", default=settings.EMBEDDING_LENGTH_BUCKETS)
+    parser.add_argument("--model", default=settings.EMBEDDING_MODEL)
+    parser.add_argument("--backend", default=settings.EMBEDDING_BACKEND)
+    args = parser.parse_args()
+
+    texts = archive_chunks(args.chunks, chunk_size=settings.CHUNK_SIZE, chunk_overlap=settings.CHUNK_OVERLAP)
+    buckets = parse_length_buckets(args.buckets)
+    lengths = _token_lengths(texts, args.model)
+    model = initialize_embedding_model(args.model, backend=args.backend)
+    model.encode(texts[:8])  # warm-up
+
+    by_length = sorted(range(len(texts)), key=lambda i: -len(texts[i]))
+    strategies: Dict[str, Tuple[List[List[int]], callable]] = {
+        "input_order": (
+            _fixed_batches(range(len(texts)), args.batch_size),
+            lambda: [model.encode([texts[i] for i in batch], batch_size=len(batch))
+                     for batch in _fixed_batches(range(len(texts)), args.batch_size)],
+        ),
+        "global_sort": (
+            _fixed_batches(by_length, args.batch_size),
+            lambda: generate_embeddings(texts, model),
+        ),
+        "bucketed": (
+            _bucket_batches(texts, buckets),
+            lambda: generate_embeddings(texts, model, length_buckets=buckets),
+        ),
+    }
+
+    report = {
+        "chunks": len(texts),
+        "tokens": int(lengths.sum()),
+        "model": model.name,
+        "buckets": args.buckets,
+        "strategies": {},
+    }
+    for name, (batches, run) in strategies.items():
+        started = time.perf_counter()
+        run()
+        elapsed = time.perf_counter() - started
+        report["strategies"][name] = {
+            "seconds": round(elapsed, 4),
+            "tokens_per_sec": round(float(lengths.sum()) / elapsed, 1),
+            "padding_waste": round(_padding_waste(lengths, batches), 4),
+        }
+
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+"""
+Prompt tokens saved by maximal-marginal-relevance diversification.
+
+Usage (from the `server` directory):
+    python -m benchmarks.mmr_prompt_tokens [--pages 400] [--queries 100] [--k 12]
+        [--fetch-factor 3] [--lambdas 1.0,0.85,0.7,0.5] [--output mmr.json]
+
+Synthetic archive pages are chunked the way ingestion does (CHUNK_SIZE /
+CHUNK_OVERLAP), so neighbouring chunks overlap like they do in the real
+collection. For every query the top `k * fetch_factor` chunks by cosine are
+taken as candidates; the baseline prompt uses the first `k`, the MMR prompt
+uses `diversify_results` over the candidates. Coverage is the number of
+distinct word 5-shingles in the selected chunks. For each lambda the report
+gives coverage and prompt tokens at equal `k`, and the prompt tokens of the
+shortest MMR selection that reaches the baseline's coverage ("tokens saved at
+equal coverage"). Tokens are estimated as prompt characters / 4.
+
+The run is offline: the embedding model must already be in the local Hugging
+Face cache, otherwise the hashing stand-in model is used and the report is
+marked with "stand_in": true.
+"""
+import argparse
+import json
+import os
+import random
+from typing import Any, Dict, List, Set, Tuple
+
+import numpy as np
+
+from app.core.config import settings
+from app.infra.document_loader import split_text_into_chunks
+from app.infra.prompts import format_prompt_with_context
+from app.infra.vector_store import diversify_results
+from benchmarks.embedding_throughput import HashingStandInModel
+from benchmarks.synthetic import archive_page, archive_questions
+
+
+def _load_model() -> Tuple[Any, bool]:
+    os.environ["HF_HUB_OFFLINE"] = "1"
+    os.environ["TRANSFORMERS_OFFLINE"] = "1"
+    try:
+        from app.infra.embeddings import initialize_embedding_model
+
+        return initialize_embedding_model(settings.EMBEDDING_MODEL), False
+    except Exception as exc:
+        print(f"Embedding model unavailable ({exc}); using the hashing stand-in")
+        return HashingStandInModel(), True
+
+
+def _build_chunks(pages: int, seed: int) -> List[Dict[str, Any]]:
+    rng = random.Random(seed)
+    chunks: List[Dict[str, Any]] = []
+    for page in range(pages):
+        text = archive_page(rng, min_sentences=8, max_sentences=30)
+        for piece in split_text_into_chunks(text, settings.CHUNK_SIZE, settings.CHUNK_OVERLAP):
+            chunks.append({
+                "id": f"chunk-{len(chunks)}",
+                "content": piece,
+                "metadata": {"source": "synthetic.pdf", "page": page + 1},
+            })
+    return chunks
+
+
+def _shingles(text: str, size: int = 5) -> Set[Tuple[str, ...]]:
+    words = text.lower().split()
+    return {tuple(words[i:i + size]) for i in range(max(len(words) - size + 1, 1))}
+
+
+def _coverage(chunks: List[Dict[str, Any]], shingles_by_id: Dict[str, Set[Tuple[str, ...]]]) -> int:
+    covered: Set[Tuple[str, ...]] = set()
+    for chunk in chunks:
+        covered |= shingles_by_id[chunk["id"]]
+    return len(covered)
+
+
+def _prompt_tokens(query: str, chunks: List[Dict[str, Any]]) -> int:
+    messages = format_prompt_with_context(query, chunks)
+    return sum(len(message["content"]) for message in messages) // 4
+
+
+def _tokens_at_coverage(
+    query: str,
+    ranked: List[Dict[str, Any]],
+    target: int,
+    shingles_by_id: Dict[str, Set[Tuple[str, ...]]],
+) -> Tuple[int, int]:
+    """Return (chunks, prompt tokens) of the shortest prefix of `ranked` covering `target` shingles."""
+    covered: Set[Tuple[str, ...]] = set()
+    for count, chunk in enumerate(ranked, 1):
+        covered |= shingles_by_id[chunk["id"]]
+        if len(covered) >= target:
+            return count, _prompt_tokens(query, ranked[:count])
+    return len(ranked), _prompt_tokens(query, ranked)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=400)
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--k", type=int, default=settings.TOP_K_RETRIEVAL)
+    parser.add_argument("--fetch-factor", type=int, default=settings.MMR_FETCH_FACTOR)
+    parser.add_argument("--lambdas", default="1.0,0.85,0.7,0.5")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write the report as JSON to this path")
+    args = parser.parse_args()
+
+    model, stand_in = _load_model()
+    chunks = _build_chunks(args.pages, args.seed)
+    queries = archive_questions(args.queries, seed=args.seed + 1)
+
+    chunk_vectors = np.asarray(model.encode([chunk["content"] for chunk in chunks], batch_size=64), dtype=np.float32)
+    chunk_vectors /= np.clip(np.linalg.norm(chunk_vectors, axis=1, keepdims=True), 1e-12, None)
+    query_vectors = np.asarray(model.encode(queries, batch_size=64), dtype=np.float32)
+    query_vectors /= np.clip(np.linalg.norm(query_vectors, axis=1, keepdims=True), 1e-12, None)
+    embeddings_by_id = {chunk["id"]: chunk_vectors[idx] for idx, chunk in enumerate(chunks)}
+    shingles_by_id = {chunk["id"]: _shingles(chunk["content"]) for chunk in chunks}
+
+    fetch_k = min(args.k * args.fetch_factor, len(chunks))
+    scores = query_vectors @ chunk_vectors.T
+    candidates_per_query = []
+    for q_idx in range(len(queries)):
+        order = np.argsort(-scores[q_idx])[:fetch_k]
+        candidates_per_query.append([
+            {**chunks[idx], "similarity": float(np.clip(scores[q_idx, idx], 0.0, 1.0))} for idx in order
+        ])
+
+    baseline = []
+    for query, candidates in zip(queries, candidates_per_query):
+        selected = candidates[:args.k]
+        baseline.append({
+            "coverage": _coverage(selected, shingles_by_id),
+            "tokens": _prompt_tokens(query, selected),
+        })
+
+    rows = []
+    for lambda_mult in (float(x) for x in args.lambdas.split(",")):
+        coverage, tokens, saved, chunks_needed = [], [], [], []
+        for query, candidates, base in zip(queries, candidates_per_query, baseline):
+            ranked = diversify_results(candidates, embeddings_by_id, len(candidates), lambda_mult)
+            selected = ranked[:args.k]
+            coverage.append(_coverage(selected, shingles_by_id))
+            tokens.append(_prompt_tokens(query, selected))
+            count, equal_coverage_tokens = _tokens_at_coverage(query, ranked, base["coverage"], shingles_by_id)
+            chunks_needed.append(count)
+            saved.append(base["tokens"] - equal_coverage_tokens)
+        row = {
+            "lambda": lambda_mult,
+            "coverage_at_k": round(float(np.mean(coverage)), 1),
+            "prompt_tokens_at_k": round(float(np.mean(tokens)), 1),
+            "chunks_for_baseline_coverage": round(float(np.mean(chunks_needed)), 2),
+            "tokens_saved_at_equal_coverage": round(float(np.mean(saved)), 1),
+        }
+        rows.append(row)
+        print(row)
+
+    report = {
+        "stand_in": stand_in,
+        "chunks": len(chunks),
+        "queries": len(queries),
+        "k": args.k,
+        "fetch_k": fetch_k,
+        "chunk_size": settings.CHUNK_SIZE,
+        "chunk_overlap": settings.CHUNK_OVERLAP,
+        "baseline": {
+            "coverage_at_k": round(float(np.mean([row["coverage"] for row in baseline])), 1),
+            "prompt_tokens_at_k": round(float(np.mean([row["tokens"] for row in baseline])), 1),
+        },
+        "mmr": rows,
+    }
+    if args.output:
+        with open(args.output, "w") as handle:
+            json.dump(report, handle, indent=2)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""Synthetic archive-like text for benchmarks (deterministic for a given seed)."""
+import random
+from typing import List
+
+from app.infra.document_loader import split_text_into_chunks
+
+
+_NAMES = [
+    "Menelik", "Taytu", "Yohannes", "Tewodros", "Haile Selassie", "Ras Alula",
+    "Count Antonelli", "Lord Napier", "Ras Makonnen", "Iyasu", "Zewditu",
+]
+_PLACES = [
+    "Adwa", "Magdala", "Harar", "Gondar", "Aksum", "Massawa", "Addis Ababa",
+    "Shewa", "Tigray", "Wuchale", "Ankober", "Dogali",
+]
+_EVENTS = [
+    "the treaty", "the battle", "the coronation", "the famine", "the campaign",
+    "the embassy", "the concession", "the railway survey", "the boundary commission",
+]
+_VERBS = [
+    "was signed at", "was recorded in", "was reported from", "took place near",
+    "was debated in", "was proclaimed at", "was negotiated at",
+]
+_FILLER = [
+    "according to the dispatches of the period", "as the chroniclers relate",
+    "in the correspondence preserved in this volume", "which the annals describe at length",
+    "though later accounts differ", "as noted in the marginalia",
+]
+
+
+def archive_sentence(rng: random.Random) -> str:
+    year = rng.randint(1800, 1960)
+    return (
+        f"{rng.choice(_EVENTS).capitalize()} {rng.choice(_VERBS)} {rng.choice(_PLACES)} "
+        f"in {year}, {rng.choice(_FILLER)}, when {rng.choice(_NAMES)} "
+        f"wrote to {rng.choice(_NAMES)} concerning {rng.choice(_PLACES)}."
+    )
+
+
+def archive_page(rng: random.Random, min_sentences: int = 1, max_sentences: int = 30) -> str:
+    return " ".join(archive_sentence(rng) for _ in range(rng.randint(min_sentences, max_sentences)))
+
+
+def archive_chunks(
+    count: int,
+    seed: int = 0,
+    chunk_size: int = 500,
+    chunk_overlap: int = 200,
+) -> List[str]:
+    """Chunk synthetic pages the same way ingestion does, yielding a realistic mix of full and tail chunks."""
+    rng = random.Random(seed)
+    chunks: List[str] = []
+    while len(chunks) < count:
+        chunks.extend(split_text_into_chunks(archive_page(rng), chunk_size, chunk_overlap))
+    return chunks[:count]
+
+
+def archive_questions(count: int, seed: int = 0) -> List[str]:
+    rng = random.Random(seed)
+    templates = [
+        "When was {event} at {place}?",
+        "Who wrote to {name} about {place}?",
+        "What happened at {place} in {year}?",
+        "what year was {event} signed",
+        "Describe the role of {name} in {event}.",
+    ]
+    return [
+        rng.choice(templates).format(
+            event=rng.choice(_EVENTS),
+            place=rng.choice(_PLACES),
+            name=rng.choice(_NAMES),
+            year=rng.randint(1800, 1960),
+        )
+        for _ in range(count)
+    ]
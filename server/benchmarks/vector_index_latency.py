@@ -0,0 +1,96 @@
+"""
+Query latency and recall of the vector index backends.
+
+Usage (from the `server` directory):
+    python -m benchmarks.vector_index_latency [--chunks 200000] [--queries 200] [--k 12] [--skip-chroma]
+
+A throw-away index of each backend is filled with the same clustered, normalized
+random vectors, then queried one embedding at a time (the request path). The
+report gives p50/p95 query latency and recall@k against exact search. The HNSW
+matrix variant is included when hnswlib is installed.
+"""
+import argparse
+import json
+import shutil
+import tempfile
+import time
+from typing import Any, Dict
+
+import numpy as np
+
+from app.infra.vector_index import HNSWLIB_SUPPORT, MatrixIndex
+from app.infra.vector_store import initialize_vector_store
+
+
+def _clustered_vectors(count: int, dim: int, rng: np.random.Generator) -> np.ndarray:
+    centers = rng.standard_normal((max(count // 50, 1), dim)).astype(np.float32)
+    vectors = centers[rng.integers(0, len(centers), count)] + 0.5 * rng.standard_normal((count, dim)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def _run(index: Any, corpus: np.ndarray, queries: np.ndarray, k: int, exact_ids, batch: int) -> Dict[str, Any]:
+    started = time.perf_counter()
+    for start in range(0, len(corpus), batch):
+        end = min(start + batch, len(corpus))
+        index.add(
+            ids=[f"chunk-{i}" for i in range(start, end)],
+            embeddings=corpus[start:end],
+            documents=["chunk text"] * (end - start),
+            metadatas=[{"source": f"doc-{i // 100}.pdf"} for i in range(start, end)],
+        )
+    build_seconds = time.perf_counter() - started
+
+    latencies = []
+    hits = 0
+    for q_idx, query in enumerate(queries):
+        started = time.perf_counter()
+        result = index.query(query_embeddings=query[np.newaxis, :], n_results=k)
+        latencies.append((time.perf_counter() - started) * 1000)
+        if exact_ids is not None:
+            hits += len(set(result["ids"][0]) & exact_ids[q_idx])
+
+    return {
+        "build_seconds": round(build_seconds, 2),
+        "p50_ms": round(float(np.percentile(latencies, 50)), 3),
+        "p95_ms": round(float(np.percentile(latencies, 95)), 3),
+        f"recall@{k}": round(hits / (len(queries) * k), 4) if exact_ids is not None else None,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chunks", type=int, default=200000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--k", type=int, default=12)
+    parser.add_argument("--batch", type=int, default=2000)
+    parser.add_argument("--skip-chroma", action="store_true")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    vectors = _clustered_vectors(args.chunks + args.queries, args.dim, rng)
+    corpus, queries = vectors[:args.chunks], vectors[args.chunks:]
+    scores = queries @ corpus.T
+    top = np.argpartition(-scores, args.k - 1, axis=1)[:, :args.k]
+    exact_ids = [{f"chunk-{i}" for i in row} for row in top]
+
+    variants = {"matrix-exact": lambda d: MatrixIndex(d, search="exact")}
+    if HNSWLIB_SUPPORT:
+        variants["matrix-hnsw"] = lambda d: MatrixIndex(d, search="hnsw")
+    if not args.skip_chroma:
+        variants["chroma"] = lambda d: initialize_vector_store(persist_directory=d, backend="chroma")[1]
+
+    report = {}
+    for name, build in variants.items():
+        directory = tempfile.mkdtemp(prefix="vector-index-")
+        try:
+            report[name] = _run(build(directory), corpus, queries, args.k, exact_ids, args.batch)
+        finally:
+            shutil.rmtree(directory, ignore_errors=True)
+        print(f"{name}: {report[name]}")
+
+    print(json.dumps({"chunks": args.chunks, "dim": args.dim, "k": args.k, "results": report}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
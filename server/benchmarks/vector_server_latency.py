@@ -0,0 +1,152 @@
+"""
+Query latency and throughput of the HTTP vector server mode against a local Chroma server.
+
+Usage (from the `server` directory):
+    python -m benchmarks.vector_server_latency [--chunks 20000] [--queries 400] [--k 12]
+        [--threads 1,4,16] [--pool-size 32] [--output server.json]
+
+A throw-away Chroma server (`chroma run`) is started on a temporary directory
+and a free port. Two clients are opened with `initialize_vector_store(mode="http")`
+the way two uvicorn workers would be. The first fills the index and the second
+must see every chunk. Both then run the query workload from 1..N threads. The
+same workload runs against an in-process PersistentClient for comparison. The
+report gives p50/p95 single-query latency and queries/sec per thread count,
+plus the retry count recorded by the pooled transport. Session setup and the
+retry path are covered without a server by tests/test_vector_server.py.
+"""
+import argparse
+import json
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List
+
+import numpy as np
+
+from app.infra.metrics import metrics
+from app.infra.vector_store import initialize_vector_store
+
+
+def _clustered_vectors(count: int, dim: int, rng: np.random.Generator) -> np.ndarray:
+    centers = rng.standard_normal((max(count // 50, 1), dim)).astype(np.float32)
+    vectors = centers[rng.integers(0, len(centers), count)] + 0.5 * rng.standard_normal((count, dim)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _start_server(path: str, port: int, timeout: float = 60.0) -> subprocess.Popen:
+    process = subprocess.Popen(
+        [sys.executable, "-m", "chromadb.cli.cli", "run", "--path", path, "--host", "127.0.0.1", "--port", str(port)],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"chroma server exited with code {process.returncode}")
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=0.5):
+                return process
+        except OSError:
+            time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError(f"chroma server did not start on port {port} within {timeout:.0f}s")
+
+
+def _fill(index: Any, corpus: np.ndarray, batch: int = 2000) -> float:
+    started = time.perf_counter()
+    for start in range(0, len(corpus), batch):
+        end = min(start + batch, len(corpus))
+        index.add(
+            ids=[f"chunk-{i}" for i in range(start, end)],
+            embeddings=corpus[start:end],
+            documents=["chunk text"] * (end - start),
+            metadatas=[{"source": f"doc-{i // 100}.pdf"} for i in range(start, end)],
+        )
+    return time.perf_counter() - started
+
+
+def _query_load(index: Any, queries: np.ndarray, k: int, threads: int) -> Dict[str, Any]:
+    def one(query: np.ndarray) -> float:
+        started = time.perf_counter()
+        index.query(query_embeddings=query[np.newaxis, :], n_results=k)
+        return (time.perf_counter() - started) * 1000
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        latencies = list(executor.map(one, queries))
+    elapsed = time.perf_counter() - started
+    return {
+        "threads": threads,
+        "p50_ms": round(float(np.percentile(latencies, 50)), 3),
+        "p95_ms": round(float(np.percentile(latencies, 95)), 3),
+        "queries_per_second": round(len(queries) / elapsed, 1),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chunks", type=int, default=20000)
+    parser.add_argument("--queries", type=int, default=400)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--k", type=int, default=12)
+    parser.add_argument("--threads", default="1,4,16")
+    parser.add_argument("--pool-size", type=int, default=32)
+    parser.add_argument("--output", help="write the report as JSON to this path")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    vectors = _clustered_vectors(args.chunks + args.queries, args.dim, rng)
+    corpus, queries = vectors[:args.chunks], vectors[args.chunks:]
+    thread_counts: List[int] = [int(x) for x in args.threads.split(",")]
+
+    server_dir = tempfile.mkdtemp(prefix="bench_vector_server_")
+    local_dir = tempfile.mkdtemp(prefix="bench_vector_local_")
+    port = _free_port()
+    server = _start_server(server_dir, port)
+    try:
+        http_options = {"mode": "http", "server_host": "127.0.0.1", "server_port": port, "server_pool_size": args.pool_size}
+        _, writer = initialize_vector_store(persist_directory=server_dir, **http_options)
+        _, reader = initialize_vector_store(persist_directory=server_dir, **http_options)
+        http_fill = _fill(writer, corpus)
+        if reader.count() != len(corpus):
+            raise RuntimeError(f"second client sees {reader.count()} of {len(corpus)} chunks")
+        http_rows = [_query_load(reader, queries, args.k, threads) for threads in thread_counts]
+
+        _, local = initialize_vector_store(persist_directory=local_dir)
+        local_fill = _fill(local, corpus)
+        local_rows = [_query_load(local, queries, args.k, threads) for threads in thread_counts]
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+        shutil.rmtree(server_dir, ignore_errors=True)
+        shutil.rmtree(local_dir, ignore_errors=True)
+
+    report = {
+        "chunks": len(corpus),
+        "queries": len(queries),
+        "dim": args.dim,
+        "k": args.k,
+        "pool_size": args.pool_size,
+        "shared_index_visible": True,
+        "http": {"fill_seconds": round(http_fill, 2), "results": http_rows},
+        "persistent": {"fill_seconds": round(local_fill, 2), "results": local_rows},
+        "retries": metrics.counter("vector_server_retries").value,
+    }
+    if args.output:
+        with open(args.output, "w") as handle:
+            json.dump(report, handle, indent=2)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
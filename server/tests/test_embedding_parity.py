@@ -0,0 +1,59 @@
+"""
+ONNX Runtime and PyTorch embedding backends must produce the same vectors.
+
+Skipped when onnxruntime or sentence-transformers is not installed, or when
+the model can be neither loaded from the local Hugging Face cache nor downloaded.
+"""
+import pytest
+
+pytest.importorskip("numpy")
+pytest.importorskip("sentence_transformers")
+pytest.importorskip("onnxruntime")
+
+import numpy as np
+
+from app.infra.embeddings import initialize_embedding_model
+from benchmarks.embedding_parity import (
+    PARITY_THRESHOLD,
+    QUANTIZED_PARITY_THRESHOLD,
+    SAMPLE_TEXTS,
+    cosine_rows,
+)
+
+
+MODEL_NAME = "all-MiniLM-L6-v2"
+
+
+def _load(backend: str, quantize: bool = False):
+    try:
+        return initialize_embedding_model(MODEL_NAME, backend=backend, quantize=quantize)
+    except Exception as exc:
+        pytest.skip(f"{MODEL_NAME} ({backend}) is unavailable: {exc}")
+
+
+@pytest.fixture(scope="module")
+def torch_vectors() -> np.ndarray:
+    return np.asarray(_load("torch").encode(SAMPLE_TEXTS), dtype=np.float32)
+
+
+@pytest.mark.parametrize(
+    "quantize, threshold",
+    [(False, PARITY_THRESHOLD), (True, QUANTIZED_PARITY_THRESHOLD)],
+    ids=["fp32", "int8"],
+)
+def test_onnx_matches_torch(torch_vectors: np.ndarray, quantize: bool, threshold: float) -> None:
+    onnx_backend = _load("onnx", quantize=quantize)
+    onnx_vectors = np.asarray(onnx_backend.encode(SAMPLE_TEXTS), dtype=np.float32)
+
+    assert onnx_vectors.shape == torch_vectors.shape
+    cosines = cosine_rows(torch_vectors, onnx_vectors)
+    worst = int(np.argmin(cosines))
+    assert cosines[worst] >= threshold, (
+        f"{onnx_backend.name} disagrees with torch on text #{worst} "
+        f"(cosine {cosines[worst]:.5f} < {threshold}): {SAMPLE_TEXTS[worst][:80]!r}"
+    )
+
+
+def test_onnx_vectors_are_normalized() -> None:
+    vectors = np.asarray(_load("onnx").encode(SAMPLE_TEXTS), dtype=np.float32)
+    assert np.allclose(np.linalg.norm(vectors, axis=1), 1.0, atol=1e-4)
@@ -0,0 +1,126 @@
+"""
+HTTP vector server mode: the pooled, retrying session installed on Chroma's client.
+
+The transport is exercised against a stubbed `httpx.HTTPTransport.handle_request`
+and `chromadb.HttpClient` is replaced by a stand-in, so no Chroma server is needed.
+"""
+from types import SimpleNamespace
+
+import pytest
+
+httpx = pytest.importorskip("httpx")
+pytest.importorskip("chromadb")
+
+from app.infra import vector_server
+from app.infra.metrics import metrics
+from app.infra.vector_server import RetryingTransport, connect_vector_server
+
+
+def _scripted_transport(monkeypatch, outcomes):
+    """Make the base transport return (or raise) `outcomes` in order; return the list of requests seen."""
+    seen = []
+    remaining = list(outcomes)
+
+    def handle_request(self, request):
+        seen.append(request)
+        outcome = remaining.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return httpx.Response(outcome, request=request)
+
+    monkeypatch.setattr(httpx.HTTPTransport, "handle_request", handle_request)
+    return seen
+
+
+def _request():
+    return httpx.Request("GET", "http://vector-server.test/api/v1/heartbeat")
+
+
+def test_retries_transient_status_codes(monkeypatch):
+    seen = _scripted_transport(monkeypatch, [503, 502, 200])
+    retries_before = metrics.counter("vector_server_retries").value
+
+    response = RetryingTransport(retries=3, backoff_seconds=0).handle_request(_request())
+
+    assert response.status_code == 200
+    assert len(seen) == 3
+    assert metrics.counter("vector_server_retries").value - retries_before == 2
+
+
+def test_retries_timeouts_then_raises(monkeypatch):
+    request = _request()
+    seen = _scripted_transport(monkeypatch, [httpx.ConnectTimeout("timed out", request=request)] * 3)
+    failures_before = metrics.counter("vector_server_failures").value
+
+    with pytest.raises(httpx.ConnectTimeout):
+        RetryingTransport(retries=2, backoff_seconds=0).handle_request(request)
+
+    assert len(seen) == 3
+    assert metrics.counter("vector_server_failures").value - failures_before == 1
+
+
+def test_returns_last_transient_response_when_retries_run_out(monkeypatch):
+    seen = _scripted_transport(monkeypatch, [503, 503])
+
+    response = RetryingTransport(retries=1, backoff_seconds=0).handle_request(_request())
+
+    assert response.status_code == 503
+    assert len(seen) == 2
+
+
+def test_does_not_retry_other_errors(monkeypatch):
+    seen = _scripted_transport(monkeypatch, [500])
+
+    response = RetryingTransport(retries=3, backoff_seconds=0).handle_request(_request())
+
+    assert response.status_code == 500
+    assert len(seen) == 1
+
+
+class _StubHttpClient:
+    """Stands in for chromadb.HttpClient: holds an httpx session the way the real client does."""
+
+    def __init__(self, **kwargs):
+        self.kwargs = kwargs
+        self.heartbeats = 0
+        self.original_session = httpx.Client(headers={"X-Chroma-Token": "secret"})
+        self._server = SimpleNamespace(
+            _session=self.original_session,
+            _settings=SimpleNamespace(chroma_server_ssl_verify=None),
+        )
+
+    def heartbeat(self):
+        self.heartbeats += 1
+        return 0
+
+
+def test_connect_installs_pooled_retrying_session(monkeypatch):
+    monkeypatch.setattr(vector_server.chromadb, "HttpClient", _StubHttpClient)
+
+    client = connect_vector_server(
+        host="vector-server.test", port=8001, timeout=7.5, connect_timeout=1.0, retries=4, pool_size=8
+    )
+
+    session = client._server._session
+    assert isinstance(session, httpx.Client)
+    assert session.timeout.read == 7.5
+    assert session.timeout.connect == 1.0
+    assert session.headers["X-Chroma-Token"] == "secret"
+    transport = session._transport
+    assert isinstance(transport, RetryingTransport)
+    assert transport._retries == 4
+    assert client.kwargs["host"] == "vector-server.test"
+    assert client.heartbeats == 1
+    assert client.original_session.is_closed
+
+
+def test_connect_fails_without_http_session(monkeypatch):
+    class _NoSessionClient(_StubHttpClient):
+        def __init__(self, **kwargs):
+            super().__init__(**kwargs)
+            self._server = SimpleNamespace()
+
+    monkeypatch.setattr(vector_server.chromadb, "HttpClient", _NoSessionClient)
+
+    with pytest.raises(RuntimeError, match="does not expose the HTTP session"):
+        connect_vector_server(host="vector-server.test")